@@ -0,0 +1,162 @@
+"""
+Access Log Sink: Batched, asynchronous AccessLog writes
+Request handlers call log_access(); rows are inserted with bulk_create by a
+background thread instead of one INSERT (and transaction) per request.
+Whitelist access counts are coalesced the same way by
+record_whitelist_access().
+"""
+
+import atexit
+import threading
+from typing import Optional
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import connection, transaction
+from django.utils import timezone
+
+from firewall_gateway.core.access_counter import AccessCounter
+from firewall_gateway.core.batch_writer import AsyncBatchWriter
+from firewall_gateway.models.firewall_models import AccessLog, IPWhitelist
+
+_writer: Optional[AsyncBatchWriter] = None
+_writer_lock = threading.Lock()
+
+_access_counter: Optional[AccessCounter] = None
+_access_counter_lock = threading.Lock()
+
+
+def _write_access_logs(entries) -> None:
+    try:
+        AccessLog.objects.bulk_create(entries)
+    finally:
+        # The writer thread outlives requests, so nothing else closes its connection
+        connection.close()
+
+
+def get_access_log_writer() -> Optional[AsyncBatchWriter]:
+    """
+    Process-wide access log writer, or None when logging is synchronous.
+
+    Configured by COLLATZ_FIREWALL_LOG_ASYNC, COLLATZ_FIREWALL_LOG_BATCH_SIZE,
+    COLLATZ_FIREWALL_LOG_FLUSH_MS, COLLATZ_FIREWALL_LOG_QUEUE_SIZE,
+    COLLATZ_FIREWALL_LOG_OVERFLOW and COLLATZ_FIREWALL_LOG_SAMPLE_EVERY.
+    """
+    global _writer
+    if not getattr(settings, 'COLLATZ_FIREWALL_LOG_ASYNC', True):
+        return None
+    if _writer is None:
+        with _writer_lock:
+            if _writer is None:
+                _writer = AsyncBatchWriter(
+                    _write_access_logs,
+                    batch_size=getattr(settings, 'COLLATZ_FIREWALL_LOG_BATCH_SIZE',
+                                       AsyncBatchWriter.DEFAULT_BATCH_SIZE),
+                    flush_interval=getattr(settings, 'COLLATZ_FIREWALL_LOG_FLUSH_MS',
+                                           AsyncBatchWriter.DEFAULT_FLUSH_INTERVAL * 1000) / 1000,
+                    max_queue=getattr(settings, 'COLLATZ_FIREWALL_LOG_QUEUE_SIZE',
+                                      AsyncBatchWriter.DEFAULT_MAX_QUEUE),
+                    overflow=getattr(settings, 'COLLATZ_FIREWALL_LOG_OVERFLOW', 'drop'),
+                    sample_every=getattr(settings, 'COLLATZ_FIREWALL_LOG_SAMPLE_EVERY',
+                                         AsyncBatchWriter.DEFAULT_SAMPLE_EVERY),
+                    name='access-log-writer',
+                )
+                atexit.register(shutdown_access_log_writer)
+    return _writer
+
+
+def log_access(**fields) -> None:
+    """Record an access attempt (AccessLog field values as keyword arguments)."""
+    entry = AccessLog(**fields)
+    writer = get_access_log_writer()
+    if writer is None:
+        entry.save()
+    else:
+        writer.submit(entry)
+
+
+async def alog_access(**fields) -> None:
+    """log_access for async code: never blocks the event loop."""
+    entry = AccessLog(**fields)
+    writer = get_access_log_writer()
+    if writer is None:
+        await entry.asave()
+    elif writer.overflow == 'block':
+        await sync_to_async(writer.submit, thread_sensitive=False)(entry)
+    else:
+        writer.submit(entry)
+
+
+def shutdown_access_log_writer() -> None:
+    """Write queued entries and stop the writer thread (atexit, gunicorn worker_exit)."""
+    global _writer
+    with _writer_lock:
+        writer, _writer = _writer, None
+    if writer is not None:
+        writer.close()
+
+
+def _write_access_counts(counts) -> None:
+    try:
+        # One transaction, so the flush takes the SQLite write lock once
+        with transaction.atomic():
+            for pk, (count, last_verified) in counts.items():
+                IPWhitelist.record_access(pk, count=count, when=last_verified)
+    finally:
+        # The final flush may run on a request thread inside a transaction
+        if not connection.in_atomic_block:
+            connection.close()
+
+
+def get_access_counter() -> Optional[AccessCounter]:
+    """
+    Process-wide whitelist access counter, or None when accesses are written immediately.
+
+    Flushes every COLLATZ_FIREWALL_ACCESS_FLUSH_SECONDS (0 disables coalescing).
+    """
+    global _access_counter
+    flush_interval = getattr(settings, 'COLLATZ_FIREWALL_ACCESS_FLUSH_SECONDS',
+                             AccessCounter.DEFAULT_FLUSH_INTERVAL)
+    if not flush_interval:
+        return None
+    if _access_counter is None:
+        with _access_counter_lock:
+            if _access_counter is None:
+                _access_counter = AccessCounter(_write_access_counts, flush_interval,
+                                                name='whitelist-access-counter')
+                atexit.register(shutdown_access_counter)
+    return _access_counter
+
+
+def record_whitelist_access(pk: int, when=None) -> None:
+    """
+    Count one successful access to whitelist entry pk.
+
+    The entry's access_count and last_verified are updated at the next
+    counter flush, so they are eventually consistent.
+    """
+    when = when or timezone.now()
+    counter = get_access_counter()
+    if counter is None:
+        IPWhitelist.record_access(pk, when=when)
+    else:
+        counter.record(pk, when)
+
+
+async def arecord_whitelist_access(pk: int, when=None) -> None:
+    """record_whitelist_access for async code."""
+    when = when or timezone.now()
+    counter = get_access_counter()
+    if counter is None:
+        await sync_to_async(IPWhitelist.record_access)(pk, when=when)
+    else:
+        counter.record(pk, when)
+
+
+def shutdown_access_counter() -> None:
+    """Flush pending access counts and stop the counter thread."""
+    global _access_counter
+    with _access_counter_lock:
+        counter, _access_counter = _access_counter, None
+    if counter is not None:
+        counter.close()
@@ -8,16 +8,18 @@ from django.views.decorators.http import require_http_methods
 from django.views.decorators.csrf import csrf_exempt
 from django.utils import timezone
 from django.db import transaction
+from django.conf import settings
 import json
 import logging
 
+from firewall_gateway.access_log import log_access
 from firewall_gateway.core.firewall_engine import FirewallEngine
 from firewall_gateway.models.firewall_models import IPWhitelist, AccessLog, FirewallStats
 
 logger = logging.getLogger(__name__)
 
 # Initialize firewall engine
-firewall_engine = FirewallEngine()
+firewall_engine = FirewallEngine.from_settings(settings)
 
 
 @csrf_exempt
@@ -169,7 +171,7 @@ def verify_ip(request):
             )
 
             # Log the blocked attempt
-            AccessLog.objects.create(
+            log_access(
                 ip_address=ip_address,
                 status=AccessLog.STATUS_BLOCKED,
                 error_message='IP not in whitelist'
@@ -188,7 +190,7 @@ def verify_ip(request):
             whitelist_entry.update_access_timestamp()
 
             # Log allowed access
-            AccessLog.objects.create(
+            log_access(
                 ip_address=ip_address,
                 computed_hash=verify_result.hash_value,
                 status=AccessLog.STATUS_ALLOWED,
@@ -211,7 +213,7 @@ def verify_ip(request):
             )
         else:
             # Log blocked access
-            AccessLog.objects.create(
+            log_access(
                 ip_address=ip_address,
                 computed_hash=verify_result.hash_value,
                 status=AccessLog.STATUS_BLOCKED,
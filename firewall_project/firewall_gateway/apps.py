@@ -0,0 +1,10 @@
+from django.apps import AppConfig
+
+
+class FirewallGatewayConfig(AppConfig):
+    name = 'firewall_gateway'
+    verbose_name = 'Collatz Firewall Gateway'
+
+    def ready(self):
+        # Connect whitelist change signals (cache invalidation)
+        from . import signals  # noqa: F401
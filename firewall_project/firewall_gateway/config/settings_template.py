@@ -27,6 +27,19 @@ COLLATZ_FIREWALL_ENFORCE = False
 # Log all access attempts (both allowed and blocked)
 COLLATZ_FIREWALL_LOG_ALL = True
 
+# Access log writes: batched by a background thread unless LOG_ASYNC is False.
+# When the queue is full, OVERFLOW decides: 'drop' new entries, 'sample'
+# (keep every SAMPLE_EVERY-th entry once half full) or 'block' the request
+COLLATZ_FIREWALL_LOG_ASYNC = True
+COLLATZ_FIREWALL_LOG_BATCH_SIZE = 500       # Rows per bulk insert
+COLLATZ_FIREWALL_LOG_FLUSH_MS = 200         # Max delay before a partial batch is written
+COLLATZ_FIREWALL_LOG_QUEUE_SIZE = 10000     # Max queued entries per process
+COLLATZ_FIREWALL_LOG_OVERFLOW = 'drop'
+COLLATZ_FIREWALL_LOG_SAMPLE_EVERY = 10
+COLLATZ_FIREWALL_ACCESS_FLUSH_SECONDS = 2.0  # Coalesce whitelist access counts (0: write each access)
+COLLATZ_FIREWALL_ASYNC_WORKERS = 4         # Verification threads of AsyncCollatzFirewallMiddleware
+COLLATZ_FIREWALL_RULES_ENABLED = True      # Enforce active FirewallRule rows before the whitelist
+
 # Paths to skip firewall verification
 # Add health checks, registration endpoints, admin panel, etc.
 COLLATZ_FIREWALL_SKIP_PATHS = [
@@ -53,6 +66,9 @@ COLLATZ_FIREWALL_LOG_LEVEL = 'INFO'  # DEBUG, INFO, WARNING, ERROR
 # Performance optimization
 COLLATZ_FIREWALL_CACHE_ENABLED = False      # Cache verification results
 COLLATZ_FIREWALL_CACHE_TTL = 300            # Cache time-to-live (seconds)
+COLLATZ_FIREWALL_CACHE_MAX_ENTRIES = 10000  # Max cached (ip, hash) decisions
+COLLATZ_FIREWALL_STREAMING = False          # Hash trajectories chunk by chunk
+COLLATZ_FIREWALL_SNAPSHOT_REFRESH = 5.0     # Max age of the in-memory whitelist and rules (seconds)
 
 # Security hardening
 COLLATZ_FIREWALL_STRICT_MODE = False        # Reject on any error
@@ -79,6 +95,10 @@ Follow these steps to install the Collatz Firewall:
        
    ]
 
+   Under ASGI (uvicorn firewall_project_main.asgi:application) use
+   'firewall_gateway.middleware.firewall_middleware.AsyncCollatzFirewallMiddleware'
+   instead; it reads the same settings plus COLLATZ_FIREWALL_ASYNC_WORKERS.
+
 3. Add firewall settings to settings.py (copy from above)
 
 4. Add to ROOT_URLCONF (urls.py):
@@ -153,6 +173,7 @@ COLLATZ_FIREWALL_ENFORCE = FIREWALL_CONFIG.get('enforce', False)
 COLLATZ_FIREWALL_LOG_ALL = FIREWALL_CONFIG.get('log_all', True)
 COLLATZ_FIREWALL_RATE_LIMIT_ENABLED = FIREWALL_CONFIG.get('rate_limit', False)
 COLLATZ_FIREWALL_CACHE_ENABLED = FIREWALL_CONFIG.get('cache', False)
+COLLATZ_FIREWALL_CACHE_TTL = FIREWALL_CONFIG.get('cache_ttl', COLLATZ_FIREWALL_CACHE_TTL)
 
 # ============================================================================
 # MONITORING & ALERTING
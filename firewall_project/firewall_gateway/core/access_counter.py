@@ -0,0 +1,140 @@
+"""
+Access Counter: In-memory aggregation of whitelist access bookkeeping
+Coalesces per-entry access increments and latest access times, and hands
+them to a flush function periodically instead of writing on every request.
+"""
+
+import logging
+import os
+import threading
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+class AccessCounter:
+    """
+    Per-key access counts flushed every flush_interval seconds.
+
+    record() adds one access for a key and remembers the latest access time.
+    A daemon thread swaps the pending counts out and passes them to
+    flush_counts as {key: (count, latest access time)}. If flush_counts
+    raises, the counts are merged back and retried on the next flush, so a
+    crash loses at most one flush interval of accesses.
+
+    The thread starts on the first record() and is restarted in a forked
+    child, which also drops counts inherited from the parent. Accesses
+    recorded after close() are dropped and counted.
+    """
+
+    DEFAULT_FLUSH_INTERVAL = 2.0  # Seconds
+
+    def __init__(self, flush_counts: Callable[[Dict[Hashable, Tuple[int, Any]]], Any],
+                 flush_interval: float = DEFAULT_FLUSH_INTERVAL,
+                 name: str = 'access-counter'):
+        if flush_interval <= 0:
+            raise ValueError("flush_interval must be positive")
+
+        self.flush_counts = flush_counts
+        self.flush_interval = flush_interval
+        self.name = name
+
+        self._pending: Dict[Hashable, Tuple[int, Any]] = {}
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._pid: Optional[int] = None
+
+        self.recorded = 0
+        self.flushed = 0
+        self.flushes = 0
+        self.failures = 0
+        self.dropped = 0
+
+    def _ensure_thread(self) -> None:
+        # Called with self._lock held
+        if self._pid != os.getpid():
+            self._pending = {}
+            self._thread = None
+            self._pid = os.getpid()
+        if self._thread is None and not self._stop.is_set():
+            self._thread = threading.Thread(target=self._run, name=self.name, daemon=True)
+            self._thread.start()
+
+    def record(self, key: Hashable, when: Any, count: int = 1) -> None:
+        """
+        Add count accesses for key at time when.
+
+        After close() nothing would flush them any more, so they are
+        counted as dropped instead (a request thread may still hold the
+        counter during shutdown).
+        """
+        with self._lock:
+            if self._stop.is_set():
+                self.dropped += count
+                return
+            self._ensure_thread()
+            pending_count, latest = self._pending.get(key, (0, when))
+            self._pending[key] = (pending_count + count, max(latest, when))
+            self.recorded += count
+
+    def _merge(self, counts: Dict[Hashable, Tuple[int, Any]]) -> None:
+        with self._lock:
+            for key, (count, when) in counts.items():
+                pending_count, latest = self._pending.get(key, (0, when))
+                self._pending[key] = (pending_count + count, max(latest, when))
+
+    def flush(self) -> int:
+        """
+        Hand all pending counts to flush_counts now.
+
+        Returns:
+            Number of keys flushed (0 if nothing was pending or the flush failed)
+        """
+        with self._flush_lock:
+            with self._lock:
+                counts, self._pending = self._pending, {}
+            if not counts:
+                return 0
+            try:
+                self.flush_counts(counts)
+            except Exception:
+                logger.exception("%s: failed to flush counts for %d keys", self.name, len(counts))
+                self.failures += 1
+                self._merge(counts)
+                return 0
+            self.flushes += 1
+            self.flushed += sum(count for count, _ in counts.values())
+            return len(counts)
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.flush_interval):
+            self.flush()
+
+    def close(self, timeout: float = 5.0) -> None:
+        """Stop the thread and flush what is pending."""
+        self._stop.set()
+        thread = self._thread
+        if thread is not None and self._pid == os.getpid():
+            thread.join(timeout)
+        self.flush()
+
+    def pending(self) -> Dict[Hashable, Tuple[int, Any]]:
+        """Copy of the counts not yet flushed."""
+        with self._lock:
+            return dict(self._pending)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get pending keys and flush counters."""
+        with self._lock:
+            return {
+                'pending_keys': len(self._pending),
+                'pending_accesses': sum(count for count, _ in self._pending.values()),
+                'flush_interval_seconds': self.flush_interval,
+                'recorded': self.recorded,
+                'flushed': self.flushed,
+                'flushes': self.flushes,
+                'failures': self.failures,
+                'dropped': self.dropped,
+            }
@@ -0,0 +1,204 @@
+"""
+Batch Writer: Bounded queue drained in batches by a background thread
+Lets request threads hand off rows (access log entries) without waiting
+for the database.
+"""
+
+import logging
+import os
+import queue
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class AsyncBatchWriter:
+    """
+    Background writer that groups submitted items into batches.
+
+    Items are queued by submit() and written by write_batch from a daemon
+    thread, every batch_size items or flush_interval seconds, whichever
+    comes first. The queue is bounded; when it fills up the overflow
+    policy decides what happens to new items:
+
+    - 'drop':   discard them
+    - 'sample': from half full on, keep only every sample_every-th item;
+                discard the rest (and anything that still does not fit)
+    - 'block':  wait for room
+
+    Items submitted after close() are dropped (and counted) like overflow.
+    A failing write_batch is logged and its items are counted as failed;
+    the thread keeps running. The thread starts on the first submit and is
+    restarted in a forked child, so a writer created before a pre-fork
+    server forks still works in its workers.
+    """
+
+    OVERFLOW_POLICIES = ('drop', 'sample', 'block')
+
+    DEFAULT_BATCH_SIZE = 500
+    DEFAULT_FLUSH_INTERVAL = 0.2  # Seconds
+    DEFAULT_MAX_QUEUE = 10000
+    DEFAULT_SAMPLE_EVERY = 10
+
+    def __init__(self, write_batch: Callable[[List[Any]], Any],
+                 batch_size: int = DEFAULT_BATCH_SIZE,
+                 flush_interval: float = DEFAULT_FLUSH_INTERVAL,
+                 max_queue: int = DEFAULT_MAX_QUEUE,
+                 overflow: str = 'drop',
+                 sample_every: int = DEFAULT_SAMPLE_EVERY,
+                 name: str = 'batch-writer'):
+        if batch_size < 1:
+            raise ValueError("batch_size must be at least 1")
+        if flush_interval <= 0:
+            raise ValueError("flush_interval must be positive")
+        if max_queue < 1:
+            raise ValueError("max_queue must be at least 1")
+        if overflow not in self.OVERFLOW_POLICIES:
+            raise ValueError(f"overflow must be one of {', '.join(self.OVERFLOW_POLICIES)}")
+        if sample_every < 1:
+            raise ValueError("sample_every must be at least 1")
+
+        self.write_batch = write_batch
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_queue = max_queue
+        self.overflow = overflow
+        self.sample_every = sample_every
+        self.name = name
+
+        self._queue: "queue.Queue[Any]" = queue.Queue(maxsize=max_queue)
+        self._thread: Optional[threading.Thread] = None
+        self._pid: Optional[int] = None
+        self._closing = False
+        self._lock = threading.Lock()
+
+        self.submitted = 0
+        self.written = 0
+        self.failed = 0
+        self.dropped = 0
+        self.sampled_out = 0
+        self.batches = 0
+        self._overflow_count = 0
+
+    def _ensure_thread(self) -> None:
+        if self._pid == os.getpid() and self._thread is not None:
+            return
+        with self._lock:
+            if self._pid != os.getpid():
+                # Forked: the parent's thread and queued items are not ours
+                self._queue = queue.Queue(maxsize=self.max_queue)
+                self._thread = None
+                self._pid = os.getpid()
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name=self.name, daemon=True)
+                self._thread.start()
+
+    def submit(self, item: Any) -> bool:
+        """
+        Queue an item for writing.
+
+        Never raises on a closed writer: a request thread may still hold
+        it during shutdown, so the item is dropped and counted instead.
+
+        Returns:
+            True if the item was queued, False if the overflow policy (or
+            a closed writer) discarded it
+        """
+        if self._closing:
+            with self._lock:
+                self.dropped += 1
+            return False
+        self._ensure_thread()
+
+        if self.overflow == 'block':
+            self._queue.put(item)
+        else:
+            if self.overflow == 'sample' and self._queue.qsize() >= self.max_queue // 2:
+                with self._lock:
+                    self._overflow_count += 1
+                    keep = self._overflow_count % self.sample_every == 0
+                    if not keep:
+                        self.sampled_out += 1
+                if not keep:
+                    return False
+            try:
+                self._queue.put_nowait(item)
+            except queue.Full:
+                with self._lock:
+                    self.dropped += 1
+                return False
+
+        with self._lock:
+            self.submitted += 1
+        return True
+
+    def _next_batch(self) -> List[Any]:
+        """Wait for up to batch_size items, or flush_interval after the first."""
+        try:
+            batch = [self._queue.get(timeout=self.flush_interval)]
+        except queue.Empty:
+            return []
+        deadline = time.monotonic() + self.flush_interval
+        while len(batch) < self.batch_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(self._queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return batch
+
+    def _run(self) -> None:
+        while True:
+            batch = self._next_batch()
+            if not batch:
+                if self._closing:
+                    return
+                continue
+            try:
+                self.write_batch(batch)
+                with self._lock:
+                    self.written += len(batch)
+                    self.batches += 1
+            except Exception:
+                logger.exception("%s: failed to write %d items", self.name, len(batch))
+                with self._lock:
+                    self.failed += len(batch)
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+
+    def flush(self) -> None:
+        """Wait until every queued item has been written (or has failed)."""
+        if self._pid == os.getpid():
+            self._queue.join()
+
+    def close(self, timeout: float = 5.0) -> None:
+        """Write what is queued and stop the thread."""
+        self._closing = True
+        thread = self._thread
+        if thread is not None and self._pid == os.getpid():
+            thread.join(timeout)
+
+    def __len__(self) -> int:
+        return self._queue.qsize()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get queue occupancy and write counters."""
+        with self._lock:
+            return {
+                'queued': self._queue.qsize(),
+                'max_queue': self.max_queue,
+                'batch_size': self.batch_size,
+                'flush_interval_seconds': self.flush_interval,
+                'overflow': self.overflow,
+                'submitted': self.submitted,
+                'written': self.written,
+                'batches': self.batches,
+                'failed': self.failed,
+                'dropped': self.dropped,
+                'sampled_out': self.sampled_out,
+            }
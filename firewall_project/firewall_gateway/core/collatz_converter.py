@@ -4,26 +4,46 @@ Converts IP addresses to Collatz sequences for cryptographic firewall operations
 """
 
 import ipaddress
-from typing import List, Tuple, Optional
+import sys
+from array import array
+from typing import Iterator, List, Sequence, Tuple, Optional, Union
 from dataclasses import dataclass
 
+from .trajectory_cache import TrajectoryCache, CachedTrajectory
+
+# Optional NumPy for batch (lockstep) trajectory generation
+_NUMPY_ENABLED = False
+try:
+    import numpy as np
+    _NUMPY_ENABLED = True
+except ImportError:
+    _NUMPY_ENABLED = False
+
 
 @dataclass
 class CollatzResult:
     """Result of Collatz sequence generation"""
     ip_address: str
     ip_integer: int
-    sequence: List[int]
+    sequence: Sequence[int]  # Tuple shared with the trajectory cache on a cache hit
     sequence_length: int
     steps_to_one: int
     max_value: int
-    trajectory_bytes: bytes
+    trajectory_bytes: memoryview  # Big-endian uint64 words, format 'B'
 
     def __repr__(self):
         return (f"CollatzResult(ip={self.ip_address}, length={self.sequence_length}, "
                 f"steps={self.steps_to_one}, max={self.max_value})")
 
 
+@dataclass
+class TrajectoryStats:
+    """Running statistics of a streamed Collatz trajectory"""
+    sequence_length: int = 0
+    steps_to_one: int = 0
+    max_value: int = 0
+
+
 class CollatzConverter:
     """
     Converts IP addresses to Collatz sequences.
@@ -39,6 +59,16 @@ class CollatzConverter:
     MIN_IP_INTEGER = 0
     MAX_IP_INTEGER = 2**32 - 1  # IPv4 max
 
+    # Words (8 bytes each) per chunk emitted by iter_trajectory_chunks
+    STREAM_CHUNK_WORDS = 512
+
+    # Largest start handled by the uint64 lockstep batch path
+    _LOCKSTEP_MAX_START = 2**64 - 1
+
+    # Shared across instances: trajectories are a pure function of the IP.
+    # Set to None to disable caching.
+    trajectory_cache: Optional[TrajectoryCache] = TrajectoryCache()
+
     @staticmethod
     def ip_to_integer(ip_address: str) -> int:
         """
@@ -114,6 +144,148 @@ class CollatzConverter:
         steps_to_one = len(sequence) - 1
         return sequence, steps_to_one, max_value
 
+    @staticmethod
+    def sequence_to_buffer(sequence: Sequence[int]) -> memoryview:
+        """
+        Serialize a Collatz sequence into a byte view without extra copies.
+
+        The numbers are written once into a preallocated array of unsigned
+        64-bit words, byte-swapped in place to big-endian if needed, and
+        exposed as a flat memoryview that hashers can consume directly.
+
+        Args:
+            sequence: Integers from a Collatz sequence
+
+        Returns:
+            memoryview (format 'B') over 8 big-endian bytes per number
+
+        Raises:
+            OverflowError: If a number does not fit in 64 bits
+        """
+        words = array('Q', sequence)
+        if sys.byteorder == 'little':
+            words.byteswap()
+        return memoryview(words).cast('B')
+
+    @staticmethod
+    def trajectory_length(n: int, max_length: int = MAX_SEQUENCE_LENGTH) -> int:
+        """
+        Count the numbers in the Collatz trajectory of n in constant memory.
+
+        Walks the same steps as generate_collatz_sequence but keeps only the
+        current value, so streaming callers can declare the serialized size
+        (8 bytes per number) before the first chunk is produced.
+
+        Args:
+            n: Positive starting number
+            max_length: Maximum sequence length (safety limit)
+
+        Returns:
+            Number of values in the trajectory, including n and the final 1
+
+        Raises:
+            ValueError: If n is not positive
+        """
+        if n <= 0:
+            raise ValueError("Starting number must be positive")
+
+        length = 1
+        while n != 1 and length < max_length:
+            if n % 2 == 0:
+                n = n // 2
+            else:
+                n = 3 * n + 1
+            length += 1
+        return length
+
+    @staticmethod
+    def iter_trajectory_chunks(
+        n: int,
+        stats: Optional[TrajectoryStats] = None,
+        chunk_words: int = STREAM_CHUNK_WORDS,
+        max_length: int = MAX_SEQUENCE_LENGTH
+    ) -> Iterator[memoryview]:
+        """
+        Stream the serialized Collatz trajectory of n in fixed-size chunks.
+
+        Produces the same bytes as sequence_to_bytes(generate_collatz_sequence(n))
+        without ever building the sequence list: values are written into one
+        reusable array of chunk_words 64-bit words, which is yielded as a
+        big-endian memoryview each time it fills up. Length, steps and maximum
+        are tracked on the fly in stats.
+
+        Each chunk is only valid until the next one is requested; consumers
+        must copy or hash it immediately. Arguments are checked when the call
+        is made, before the first chunk is requested.
+
+        Args:
+            n: Positive starting number
+            stats: Optional TrajectoryStats updated as the walk progresses
+            chunk_words: Number of 8-byte words per chunk
+            max_length: Maximum sequence length (safety limit)
+
+        Yields:
+            memoryview (format 'B') chunks of the trajectory bytes
+
+        Raises:
+            ValueError: If n is not positive
+            OverflowError: If a value does not fit in 64 bits
+        """
+        if n <= 0:
+            raise ValueError("Starting number must be positive")
+        if chunk_words < 1:
+            raise ValueError("chunk_words must be at least 1")
+        if stats is None:
+            stats = TrajectoryStats()
+        return CollatzConverter._trajectory_chunks(n, stats, chunk_words, max_length)
+
+    @staticmethod
+    def _trajectory_chunks(
+        n: int,
+        stats: TrajectoryStats,
+        chunk_words: int,
+        max_length: int
+    ) -> Iterator[memoryview]:
+        """Generator behind iter_trajectory_chunks (arguments already validated)."""
+        words = array('Q', bytes(8 * chunk_words))
+        swap = sys.byteorder == 'little'
+        view = memoryview(words).cast('B')
+        filled = 0
+        length = 0
+        max_value = n
+        value = n
+
+        while True:
+            words[filled] = value
+            filled += 1
+            length += 1
+            if value > max_value:
+                max_value = value
+
+            if value == 1 or length >= max_length:
+                break
+
+            if value % 2 == 0:
+                value = value // 2
+            else:
+                value = 3 * value + 1
+
+            if filled == chunk_words:
+                stats.sequence_length = length
+                stats.steps_to_one = length - 1
+                stats.max_value = max_value
+                if swap:
+                    words.byteswap()
+                yield view
+                filled = 0
+
+        stats.sequence_length = length
+        stats.steps_to_one = length - 1
+        stats.max_value = max_value
+        if swap:
+            words.byteswap()
+        yield view[:filled * 8]
+
     @staticmethod
     def sequence_to_bytes(sequence: List[int]) -> bytes:
         """
@@ -127,10 +299,152 @@ class CollatzConverter:
         Returns:
             Bytes representation suitable for hashing
         """
-        sequence_bytes = b''
-        for num in sequence:
-            sequence_bytes += num.to_bytes(8, byteorder='big')
-        return sequence_bytes
+        return CollatzConverter.sequence_to_buffer(sequence).tobytes()
+
+    @classmethod
+    def generate_collatz_batch(
+        cls,
+        values: Sequence[int],
+        max_length: int = MAX_SEQUENCE_LENGTH
+    ) -> List[Tuple[bytes, int, int]]:
+        """
+        Generate serialized Collatz trajectories for many starting numbers.
+
+        With NumPy available, all values advance in lockstep as lanes of a
+        uint64 array; a per-lane done-mask freezes lanes that reached 1 (or
+        max_length) so they simply repeat their final value. Lanes whose next
+        3n+1 step would overflow 64 bits are finished with the scalar walk.
+
+        Output is identical to generate_collatz_sequence + sequence_to_bytes
+        for each value.
+
+        Args:
+            values: Positive starting numbers
+            max_length: Maximum sequence length (safety limit)
+
+        Returns:
+            List of (trajectory_bytes, steps_to_one, max_value), one per value.
+            On the NumPy path trajectory_bytes is a memoryview into the shared
+            lane matrix rather than a bytes copy.
+
+        Raises:
+            ValueError: If any starting number is not positive
+        """
+        if any(n <= 0 for n in values):
+            raise ValueError("Starting number must be positive")
+        if not values:
+            return []
+
+        if not _NUMPY_ENABLED or max(values) > cls._LOCKSTEP_MAX_START:
+            results = []
+            for n in values:
+                sequence, steps, max_val = cls.generate_collatz_sequence(n, max_length)
+                results.append((cls.sequence_to_bytes(sequence), steps, max_val))
+            return results
+
+        current = np.array(values, dtype=np.uint64)
+        lengths = np.ones(current.size, dtype=np.int64)
+        done = current == 1
+        overflow = np.zeros(current.size, dtype=bool)
+        rows = [current]
+        overflow_limit = np.uint64((2**64 - 2) // 3)
+        one = np.uint64(1)
+        three = np.uint64(3)
+
+        while len(rows) < max_length and not done.all():
+            odd = (current & one).astype(bool)
+            lane_overflow = odd & ~done & (current > overflow_limit)
+            if lane_overflow.any():
+                overflow |= lane_overflow
+                done |= lane_overflow
+
+            stepped = np.where(odd, current * three + one, current >> one)
+            current = np.where(done, current, stepped)
+            lengths += ~done
+            done |= current == 1
+            rows.append(current)
+
+        # Lanes x steps, big-endian, so each lane is one contiguous row
+        matrix = np.stack(rows, axis=1).astype('>u8')
+        # Frozen lanes repeat their last value, so a full-row max is exact
+        max_values = matrix.max(axis=1)
+
+        results = []
+        for lane, n in enumerate(values):
+            if overflow[lane]:
+                sequence, steps, max_val = cls.generate_collatz_sequence(n, max_length)
+                results.append((cls.sequence_to_bytes(sequence), steps, max_val))
+                continue
+            length = int(lengths[lane])
+            results.append((
+                memoryview(matrix[lane, :length]).cast('B'),
+                length - 1,
+                int(max_values[lane])
+            ))
+        return results
+
+    @classmethod
+    def _cached_trajectory(cls, n: int) -> CachedTrajectory:
+        """
+        Get the trajectory of n (up to MAX_SEQUENCE_LENGTH) via the cache.
+
+        On a miss the walk stops at the first value whose tail is already
+        cached and splices that tail in, then stores the result.
+
+        Args:
+            n: Positive starting number
+
+        Returns:
+            CachedTrajectory for n
+        """
+        cache = cls.trajectory_cache
+        entry = cache.get(n)
+        if entry is not None:
+            return entry
+
+        limit = cls.MAX_SEQUENCE_LENGTH
+        prefix = []
+        tail: Tuple[int, ...] = ()
+        tail_bytes: Union[bytes, memoryview] = b''
+        value = n
+
+        while len(prefix) < limit:
+            if value == 1:
+                tail = (1,)
+                tail_bytes = (1).to_bytes(8, byteorder='big')
+                break
+
+            known = cache.find_suffix(value)
+            if known is not None:
+                owner_sequence, owner_bytes, offset = known
+                tail = owner_sequence[offset:]
+                tail_bytes = owner_bytes[offset * 8:]
+                break
+
+            prefix.append(value)
+            if value % 2 == 0:
+                value = value // 2
+            else:
+                value = 3 * value + 1
+
+        sequence = (tuple(prefix) + tail)[:limit]
+        # Prefix words go into one array, swapped to big-endian in place, and
+        # the (already big-endian) tail is appended to it; no joined bytes
+        words = array('Q', prefix)
+        if sys.byteorder == 'little':
+            words.byteswap()
+        words.frombytes(tail_bytes[:(limit - len(words)) * 8])
+        # Read-only: the view is shared by every caller that hits this entry
+        trajectory_bytes = memoryview(words).cast('B').toreadonly()
+
+        entry = CachedTrajectory(
+            sequence=sequence,
+            steps_to_one=len(sequence) - 1,
+            max_value=max(sequence),
+            trajectory_bytes=trajectory_bytes
+        )
+        cache.put(n, entry)
+        return entry
 
     @classmethod
     def convert_ip_to_collatz(
@@ -141,6 +455,11 @@ class CollatzConverter:
         """
         Complete IP to Collatz conversion pipeline.
 
+        Results are served from the shared trajectory cache when it is
+        enabled; the output is equal to an uncached conversion. On a cache
+        hit sequence is the cached tuple and trajectory_bytes a read-only
+        view of the cached words, neither copied.
+
         Args:
             ip_address: IPv4 address string
             max_sequence_length: Maximum sequence length
@@ -154,14 +473,28 @@ class CollatzConverter:
         # Step 1: Validate and convert IP to integer
         ip_integer = cls.ip_to_integer(ip_address)
 
-        # Step 2: Generate Collatz sequence
-        sequence, steps, max_val = cls.generate_collatz_sequence(
-            ip_integer,
-            max_sequence_length
-        )
-
-        # Step 3: Convert sequence to bytes
-        trajectory_bytes = cls.sequence_to_bytes(sequence)
+        if (cls.trajectory_cache is not None
+                and 0 < ip_integer
+                and 0 < max_sequence_length <= cls.MAX_SEQUENCE_LENGTH):
+            # Steps 2-3 from cache (truncation of a trajectory is its prefix)
+            cached = cls._cached_trajectory(ip_integer)
+            if len(cached.sequence) <= max_sequence_length:
+                sequence = cached.sequence
+                steps, max_val = cached.steps_to_one, cached.max_value
+                trajectory_bytes = cached.trajectory_bytes
+            else:
+                sequence = cached.sequence[:max_sequence_length]
+                steps, max_val = len(sequence) - 1, max(sequence)
+                trajectory_bytes = cached.trajectory_bytes[:max_sequence_length * 8]
+        else:
+            # Step 2: Generate Collatz sequence
+            sequence, steps, max_val = cls.generate_collatz_sequence(
+                ip_integer,
+                max_sequence_length
+            )
+
+            # Step 3: Serialize sequence for the hasher
+            trajectory_bytes = cls.sequence_to_buffer(sequence)
 
         return CollatzResult(
             ip_address=ip_address,
@@ -173,6 +506,13 @@ class CollatzConverter:
             trajectory_bytes=trajectory_bytes
         )
 
+    @classmethod
+    def get_cache_stats(cls) -> dict:
+        """Get trajectory cache statistics (empty if caching is disabled)."""
+        if cls.trajectory_cache is None:
+            return {'enabled': False}
+        return {'enabled': True, **cls.trajectory_cache.get_stats()}
+
     @staticmethod
     def get_sequence_fingerprint(sequence: List[int]) -> dict:
         """
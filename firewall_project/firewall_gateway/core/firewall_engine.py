@@ -4,12 +4,13 @@ Handles IP registration, verification, and access control.
 """
 
 import time
-from typing import Tuple, Dict, Optional, Any
-from dataclasses import dataclass, field
+from typing import Tuple, Dict, Iterable, List, Optional, Any
+from dataclasses import dataclass, field, replace
 from enum import Enum
 
-from .collatz_converter import CollatzConverter, CollatzResult
+from .collatz_converter import CollatzConverter, CollatzResult, TrajectoryStats
 from .sha1e3_integrator import SHA1E3Integrator, HashResult
+from .verification_cache import VerificationCache
 
 
 class VerificationStatus(Enum):
@@ -56,6 +57,17 @@ class RegistrationResult:
         return f"{status} Registration: {self.ip_address} (hash_len={self.sequence_length})"
 
 
+@dataclass
+class _BatchOutcome:
+    """Per-IP outcome of a batched conversion + hash"""
+    hash_result: Optional[HashResult] = None
+    sequence_length: int = 0
+    steps_to_one: int = 0
+    max_value: int = 0
+    error_message: Optional[str] = None
+    invalid_ip: bool = False
+
+
 class FirewallEngine:
     """
     Core Collatz Firewall Engine.
@@ -70,15 +82,92 @@ class FirewallEngine:
     Performance: 50+ MB/s with Numba JIT implementation
     """
 
-    def __init__(self):
+    # IPs per lockstep Collatz batch in register_many/verify_many
+    BATCH_SIZE = 4096
+
+    def __init__(
+        self,
+        cache_enabled: bool = False,
+        cache_ttl: float = VerificationCache.DEFAULT_TTL,
+        cache_max_entries: int = VerificationCache.DEFAULT_MAX_ENTRIES,
+        streaming: bool = False
+    ):
         """
         Initialize the firewall engine.
 
+        Args:
+            cache_enabled: Cache verification decisions per (ip, stored hash)
+            cache_ttl: Lifetime of a cached decision in seconds
+            cache_max_entries: Maximum number of cached decisions
+            streaming: Stream trajectories into the hasher chunk by chunk
+                instead of materializing them (bypasses the trajectory cache)
+
         Raises:
             ImportError: If SHA1-E3 is not available
         """
         self.collatz_converter = CollatzConverter()
         self.hash_integrator = SHA1E3Integrator()
+        self.verification_cache = (
+            VerificationCache(ttl=cache_ttl, max_entries=cache_max_entries)
+            if cache_enabled else None
+        )
+        self.streaming = streaming
+
+    @classmethod
+    def from_settings(cls, settings) -> 'FirewallEngine':
+        """
+        Build an engine configured from Django-style settings.
+
+        Reads COLLATZ_FIREWALL_CACHE_ENABLED, COLLATZ_FIREWALL_CACHE_TTL,
+        COLLATZ_FIREWALL_CACHE_MAX_ENTRIES and COLLATZ_FIREWALL_STREAMING,
+        falling back to the defaults.
+        """
+        return cls(
+            cache_enabled=getattr(settings, 'COLLATZ_FIREWALL_CACHE_ENABLED', False),
+            cache_ttl=getattr(settings, 'COLLATZ_FIREWALL_CACHE_TTL', VerificationCache.DEFAULT_TTL),
+            cache_max_entries=getattr(
+                settings, 'COLLATZ_FIREWALL_CACHE_MAX_ENTRIES', VerificationCache.DEFAULT_MAX_ENTRIES
+            ),
+            streaming=getattr(settings, 'COLLATZ_FIREWALL_STREAMING', False),
+        )
+
+    def _convert_and_hash(self, ip_address: str) -> Tuple[TrajectoryStats, HashResult]:
+        """
+        Convert an IP to its Collatz trajectory and hash it.
+
+        In streaming mode the trajectory length is counted first, then the
+        trajectory is fed to a length-declared hasher in chunks and never
+        exists as a list or buffer; otherwise the (cached) CollatzResult is used.
+
+        Returns:
+            Tuple of (trajectory statistics, HashResult)
+
+        Raises:
+            ValueError: If IP address is invalid
+        """
+        if self.streaming:
+            converter = self.collatz_converter
+            ip_integer = converter.ip_to_integer(ip_address)
+            stats = TrajectoryStats()
+            # Validates ip_integer and declares the size so the hasher folds
+            # each chunk instead of buffering the whole trajectory
+            length = converter.trajectory_length(ip_integer)
+            hash_result = self.hash_integrator.hash_collatz_stream(
+                converter.iter_trajectory_chunks(ip_integer, stats),
+                length=8 * length
+            )
+            return stats, hash_result
+
+        collatz_result = self.collatz_converter.convert_ip_to_collatz(ip_address)
+        hash_result = self.hash_integrator.hash_collatz_sequence(
+            collatz_result.trajectory_bytes
+        )
+        stats = TrajectoryStats(
+            sequence_length=collatz_result.sequence_length,
+            steps_to_one=collatz_result.steps_to_one,
+            max_value=collatz_result.max_value,
+        )
+        return stats, hash_result
 
     def register_ip(
         self,
@@ -104,19 +193,14 @@ class FirewallEngine:
             RegistrationResult with all details
         """
         try:
-            # Step 1: Convert IP to Collatz sequence
-            collatz_result = self.collatz_converter.convert_ip_to_collatz(ip_address)
-
-            # Step 2: Hash the Collatz sequence
-            hash_result = self.hash_integrator.hash_collatz_sequence(
-                collatz_result.trajectory_bytes
-            )
+            # Steps 1-2: Convert IP to Collatz sequence and hash it
+            trajectory, hash_result = self._convert_and_hash(ip_address)
 
             return RegistrationResult(
                 ip_address=ip_address,
                 success=True,
                 collatz_hash=hash_result.hash_value,
-                sequence_length=collatz_result.sequence_length,
+                sequence_length=trajectory.sequence_length,
             )
 
         except ValueError as e:
@@ -151,6 +235,9 @@ class FirewallEngine:
         4. Compare with stored hash
         5. Return result with timing
 
+        With the verification cache enabled, a repeat of a recent
+        (ip, stored hash) decision skips steps 1-4.
+
         Args:
             ip_address: IPv4 address to verify
             expected_hash: Stored hash to compare against
@@ -160,14 +247,18 @@ class FirewallEngine:
         """
         start_time = time.time()
 
-        try:
-            # Step 1: Validate and convert IP to Collatz
-            collatz_result = self.collatz_converter.convert_ip_to_collatz(ip_address)
+        if self.verification_cache is not None:
+            cached = self.verification_cache.get(ip_address, expected_hash)
+            if cached is not None:
+                return replace(
+                    cached,
+                    response_time_ms=(time.time() - start_time) * 1000,
+                    details={**cached.details, 'cache_hit': True}
+                )
 
-            # Step 2: Hash the Collatz sequence
-            hash_result = self.hash_integrator.hash_collatz_sequence(
-                collatz_result.trajectory_bytes
-            )
+        try:
+            # Steps 1-2: Validate, convert IP to Collatz and hash the sequence
+            trajectory, hash_result = self._convert_and_hash(ip_address)
 
             # Step 3: Compare hashes
             hash_match = hash_result.hash_value.lower() == expected_hash.lower()
@@ -176,19 +267,25 @@ class FirewallEngine:
 
             response_time = (time.time() - start_time) * 1000  # Convert to ms
 
-            return VerificationResult(
+            result = VerificationResult(
                 ip_address=ip_address,
                 status=status,
                 hash_value=hash_result.hash_value,
-                sequence_length=collatz_result.sequence_length,
+                sequence_length=trajectory.sequence_length,
                 response_time_ms=response_time,
                 details={
                     'hash_type': hash_result.hash_type,
-                    'collatz_steps': collatz_result.steps_to_one,
-                    'collatz_max': collatz_result.max_value,
+                    'collatz_steps': trajectory.steps_to_one,
+                    'collatz_max': trajectory.max_value,
                 }
             )
 
+            # Only definitive decisions are cached, never errors
+            if self.verification_cache is not None:
+                self.verification_cache.put(ip_address, expected_hash, result)
+
+            return result
+
         except ValueError as e:
             response_time = (time.time() - start_time) * 1000
             return VerificationResult(
@@ -210,6 +307,173 @@ class FirewallEngine:
                 error_message=f"Internal error: {str(e)}"
             )
 
+    def _compute_many(
+        self,
+        ip_addresses: List[str]
+    ) -> List[_BatchOutcome]:
+        """
+        Convert and hash one batch of IPs.
+
+        Trajectories for all valid IPs are generated together with
+        CollatzConverter.generate_collatz_batch, then hashed one after another.
+
+        Returns:
+            One _BatchOutcome per IP, in input order
+        """
+        outcomes: List[Optional[_BatchOutcome]] = [None] * len(ip_addresses)
+        valid_indices = []
+        valid_integers = []
+
+        for idx, ip_address in enumerate(ip_addresses):
+            try:
+                ip_integer = self.collatz_converter.ip_to_integer(ip_address)
+                if ip_integer <= 0:
+                    raise ValueError("Starting number must be positive")
+            except ValueError as e:
+                outcomes[idx] = _BatchOutcome(error_message=str(e), invalid_ip=True)
+                continue
+            valid_indices.append(idx)
+            valid_integers.append(ip_integer)
+
+        try:
+            trajectories = self.collatz_converter.generate_collatz_batch(valid_integers)
+        except Exception as e:
+            for idx in valid_indices:
+                outcomes[idx] = _BatchOutcome(error_message=f"Internal error: {str(e)}")
+            return outcomes
+
+        for idx, (trajectory_bytes, steps, max_val) in zip(valid_indices, trajectories):
+            try:
+                hash_result = self.hash_integrator.hash_collatz_sequence(trajectory_bytes)
+                outcomes[idx] = _BatchOutcome(
+                    hash_result=hash_result,
+                    sequence_length=steps + 1,
+                    steps_to_one=steps,
+                    max_value=max_val
+                )
+            except Exception as e:
+                outcomes[idx] = _BatchOutcome(error_message=f"Internal error: {str(e)}")
+
+        return outcomes
+
+    def register_many(
+        self,
+        ip_addresses: Iterable[str],
+        batch_size: int = BATCH_SIZE
+    ) -> List[RegistrationResult]:
+        """
+        Register many IP addresses using batched Collatz generation.
+
+        Produces the same hashes as register_ip, in input order.
+
+        Args:
+            ip_addresses: IPv4 addresses to register
+            batch_size: Number of IPs per lockstep batch
+
+        Returns:
+            List of RegistrationResult objects
+        """
+        ip_addresses = list(ip_addresses)
+        results = []
+
+        for start in range(0, len(ip_addresses), batch_size):
+            batch = ip_addresses[start:start + batch_size]
+            for ip_address, outcome in zip(batch, self._compute_many(batch)):
+                if outcome.error_message is not None:
+                    results.append(RegistrationResult(
+                        ip_address=ip_address,
+                        success=False,
+                        collatz_hash="",
+                        sequence_length=0,
+                        error_message=outcome.error_message
+                    ))
+                    continue
+                results.append(RegistrationResult(
+                    ip_address=ip_address,
+                    success=True,
+                    collatz_hash=outcome.hash_result.hash_value,
+                    sequence_length=outcome.sequence_length,
+                ))
+
+        return results
+
+    def verify_many(
+        self,
+        pairs: Iterable[Tuple[str, str]],
+        batch_size: int = BATCH_SIZE
+    ) -> List[VerificationResult]:
+        """
+        Verify many (ip_address, expected_hash) pairs at once.
+
+        Equivalent to calling verify_ip for each pair, but trajectories are
+        generated in lockstep batches. Cached decisions are reused and new
+        ones stored when the verification cache is enabled. The reported
+        response time is the batch time divided evenly over its IPs.
+
+        Args:
+            pairs: Iterable of (ip_address, expected_hash)
+            batch_size: Number of IPs per lockstep batch
+
+        Returns:
+            List of VerificationResult objects, in input order
+        """
+        pairs = list(pairs)
+        results: List[Optional[VerificationResult]] = [None] * len(pairs)
+        pending = []
+
+        for idx, (ip_address, expected_hash) in enumerate(pairs):
+            if self.verification_cache is not None:
+                cached = self.verification_cache.get(ip_address, expected_hash)
+                if cached is not None:
+                    results[idx] = replace(
+                        cached,
+                        response_time_ms=0.0,
+                        details={**cached.details, 'cache_hit': True}
+                    )
+                    continue
+            pending.append(idx)
+
+        for start in range(0, len(pending), batch_size):
+            batch = pending[start:start + batch_size]
+            start_time = time.time()
+            outcomes = self._compute_many([pairs[idx][0] for idx in batch])
+            response_time = (time.time() - start_time) * 1000 / len(batch)
+
+            for idx, outcome in zip(batch, outcomes):
+                ip_address, expected_hash = pairs[idx]
+
+                if outcome.error_message is not None:
+                    results[idx] = VerificationResult(
+                        ip_address=ip_address,
+                        status=(VerificationStatus.INVALID_IP if outcome.invalid_ip
+                                else VerificationStatus.INTERNAL_ERROR),
+                        hash_value="",
+                        sequence_length=0,
+                        response_time_ms=response_time,
+                        error_message=outcome.error_message
+                    )
+                    continue
+
+                hash_result = outcome.hash_result
+                hash_match = hash_result.hash_value.lower() == expected_hash.lower()
+                result = VerificationResult(
+                    ip_address=ip_address,
+                    status=VerificationStatus.ALLOWED if hash_match else VerificationStatus.BLOCKED,
+                    hash_value=hash_result.hash_value,
+                    sequence_length=outcome.sequence_length,
+                    response_time_ms=response_time,
+                    details={
+                        'hash_type': hash_result.hash_type,
+                        'collatz_steps': outcome.steps_to_one,
+                        'collatz_max': outcome.max_value,
+                    }
+                )
+                if self.verification_cache is not None:
+                    self.verification_cache.put(ip_address, expected_hash, result)
+                results[idx] = result
+
+        return results
+
     def batch_register_ips(
         self,
         ip_list: list
@@ -223,31 +487,27 @@ class FirewallEngine:
         Returns:
             List of RegistrationResult objects
         """
-        results = []
+        ip_addresses = []
 
         for item in ip_list:
             if isinstance(item, str):
-                result = self.register_ip(item)
+                ip_addresses.append(item)
             elif isinstance(item, dict):
                 ip = item.get('ip')
                 if ip is not None:
-                    result = self.register_ip(
-                        ip,
-                        name=item.get('name'),
-                        description=item.get('description')
-                    )
-                else:
-                    continue
-            else:
-                continue
+                    ip_addresses.append(ip)
 
-            results.append(result)
-
-        return results
+        return self.register_many(ip_addresses)
 
     def get_engine_info(self) -> Dict[str, Any]:
         """Get information about firewall engine configuration."""
         return {
             'hash_config': self.hash_integrator.get_hash_info(),
             'collatz_max_length': self.collatz_converter.MAX_SEQUENCE_LENGTH,
+            'streaming': self.streaming,
+            'trajectory_cache': self.collatz_converter.get_cache_stats(),
+            'verification_cache': (
+                {'enabled': True, **self.verification_cache.get_stats()}
+                if self.verification_cache is not None else {'enabled': False}
+            ),
         }
@@ -0,0 +1,298 @@
+"""
+Rule Index: Compiled CIDR matching of firewall rules
+Resolves the winning FirewallRule for an IPv4 address with a single binary
+search over precomputed intervals, instead of testing every rule.
+"""
+
+import ipaddress
+import logging
+import threading
+import time
+from bisect import bisect_right
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+# Process-wide rule version. Bumped whenever a FirewallRule row changes
+# (see firewall_gateway.signals); a RuleSnapshot rebuilds its index on the
+# next lookup after a bump.
+_rule_version = 0
+_version_lock = threading.Lock()
+
+
+def get_rule_version() -> int:
+    """Get the current rule version."""
+    return _rule_version
+
+
+def bump_rule_version() -> int:
+    """
+    Invalidate every compiled rule index.
+
+    Returns:
+        The new rule version
+    """
+    global _rule_version
+    with _version_lock:
+        _rule_version += 1
+        return _rule_version
+
+
+@dataclass(frozen=True)
+class CompiledRule:
+    """Active firewall rule with its parsed IPv4 network"""
+    pk: int
+    name: str
+    rule_type: str
+    network: int
+    prefix_len: int
+    priority: int = 0
+    rate_limit_requests: Optional[int] = None
+    rate_limit_window_seconds: Optional[int] = None
+
+    @classmethod
+    def from_row(cls, pk: int, name: str, rule_type: str, ip_range: str, priority: int,
+                 rate_limit_requests: Optional[int] = None,
+                 rate_limit_window_seconds: Optional[int] = None) -> 'CompiledRule':
+        """
+        Parse a FirewallRule row.
+
+        Raises:
+            ValueError: If ip_range is not an IPv4 address or CIDR network
+        """
+        try:
+            network = ipaddress.IPv4Network(ip_range.strip(), strict=False)
+        except (ipaddress.AddressValueError, ipaddress.NetmaskValueError, ValueError) as e:
+            raise ValueError(f"Invalid IPv4 range: {ip_range}") from e
+        return cls(pk, name, rule_type, int(network.network_address), network.prefixlen,
+                   priority, rate_limit_requests, rate_limit_window_seconds)
+
+    def __contains__(self, ip_integer: int) -> bool:
+        return ip_integer >> (32 - self.prefix_len) == self.network >> (32 - self.prefix_len)
+
+
+class RuleIndex:
+    """
+    Immutable index of firewall rules over the IPv4 address space.
+
+    Rules are inserted into a binary radix trie on the network bits. Where
+    several rules cover an address, the one with the highest priority wins,
+    then the most specific (longest prefix), then the first one given
+    (callers pass rules in FirewallRule.Meta ordering).
+
+    The trie is then flattened into sorted, disjoint address intervals, each
+    labelled with its winning rule, so match() is one bisect over at most
+    2 * len(rules) + 1 boundaries.
+    """
+
+    def __init__(self, rules: Iterable[CompiledRule] = ()):
+        self.rules: Tuple[CompiledRule, ...] = tuple(rules)
+
+        # Trie node: [zero child, one child, best rule ending here]
+        root: List[Any] = [None, None, None]
+        for order, rule in enumerate(self.rules):
+            node = root
+            for depth in range(rule.prefix_len):
+                bit = (rule.network >> (31 - depth)) & 1
+                if node[bit] is None:
+                    node[bit] = [None, None, None]
+                node = node[bit]
+            node[2] = self._better(node[2], (rule, order))
+
+        starts: List[int] = []
+        winners: List[Optional[CompiledRule]] = []
+
+        def emit(start: int, best) -> None:
+            rule = best[0] if best is not None else None
+            if winners and winners[-1] is rule:
+                return
+            starts.append(start)
+            winners.append(rule)
+
+        def flatten(node, start: int, depth: int, inherited) -> None:
+            best = self._better(inherited, node[2])
+            span = 1 << (32 - depth)
+            if node[0] is None and node[1] is None:
+                emit(start, best)
+                return
+            half = span >> 1
+            for bit in (0, 1):
+                child_start = start + bit * half
+                if node[bit] is None:
+                    emit(child_start, best)
+                else:
+                    flatten(node[bit], child_start, depth + 1, best)
+
+        flatten(root, 0, 0, None)
+        self._starts = starts
+        self._winners = winners
+
+    @staticmethod
+    def _better(current, candidate):
+        """Winner of two (rule, order) pairs, either of which may be None."""
+        if current is None:
+            return candidate
+        if candidate is None:
+            return current
+        rule, order = candidate
+        best, best_order = current
+        if (rule.priority, rule.prefix_len, -order) > (best.priority, best.prefix_len, -best_order):
+            return candidate
+        return current
+
+    def match(self, ip_integer: int) -> Optional[CompiledRule]:
+        """Winning rule for ip_integer, or None if no rule covers it."""
+        return self._winners[bisect_right(self._starts, ip_integer) - 1]
+
+    def __len__(self) -> int:
+        return len(self.rules)
+
+    @property
+    def intervals(self) -> int:
+        """Number of compiled address intervals."""
+        return len(self._starts)
+
+
+class RuleSnapshot:
+    """
+    In-process RuleIndex of the active firewall rules.
+
+    The loader returns (pk, name, rule_type, ip_range, priority,
+    rate_limit_requests, rate_limit_window_seconds) rows, highest priority
+    first. Rows whose ip_range is not IPv4 are skipped with a warning. The
+    index is rebuilt, and swapped in as a whole, on the first lookup after
+    the rule version changes (signals in this process) or after
+    refresh_interval seconds (changes made by other workers), the same way
+    WhitelistSnapshot refreshes.
+
+    Thread-safe: the middleware calls it from every worker thread.
+    """
+
+    DEFAULT_REFRESH_INTERVAL = 5.0  # Seconds
+
+    def __init__(self, loader: Callable[[], Iterable[Tuple]],
+                 refresh_interval: float = DEFAULT_REFRESH_INTERVAL):
+        if refresh_interval <= 0:
+            raise ValueError("refresh_interval must be positive")
+
+        self.loader = loader
+        self.refresh_interval = refresh_interval
+
+        self._index = RuleIndex()
+        self._version: Optional[int] = None
+        self._expires_at = 0.0
+        self._refresh_lock = threading.Lock()
+
+        self.lookups = 0
+        self.refreshes = 0
+        self.skipped = 0
+
+    def refresh(self) -> None:
+        """Recompile all active rules now."""
+        version = get_rule_version()
+        rules = []
+        skipped = 0
+        for row in self.loader():
+            try:
+                rules.append(CompiledRule.from_row(*row))
+            except ValueError as e:
+                logger.warning(f"Skipping firewall rule {row[1]!r}: {e}")
+                skipped += 1
+        # Publish the index before the version so readers never pair the
+        # new version with the old index
+        self._index = RuleIndex(rules)
+        self._version = version
+        self._expires_at = time.monotonic() + self.refresh_interval
+        self.skipped = skipped
+        self.refreshes += 1
+
+    def invalidate(self) -> None:
+        """Force a rebuild on the next lookup."""
+        self._version = None
+
+    def is_stale(self) -> bool:
+        return (self._version != get_rule_version()
+                or time.monotonic() >= self._expires_at)
+
+    def is_loaded(self) -> bool:
+        return self._version is not None
+
+    def ensure_fresh(self) -> None:
+        """Rebuild if stale, unless another thread already is (then keep serving the old index)."""
+        if not self.is_stale():
+            return
+        if self._version is None:
+            # Nothing to serve yet: wait for the first build
+            with self._refresh_lock:
+                if self._version is None:
+                    self.refresh()
+        elif self._refresh_lock.acquire(blocking=False):
+            try:
+                self.refresh()
+            finally:
+                self._refresh_lock.release()
+
+    def get(self, ip_integer: int) -> Optional[CompiledRule]:
+        """Match ip_integer against the current index, without refreshing it."""
+        self.lookups += 1
+        return self._index.match(ip_integer)
+
+    def lookup(self, ip_integer: int) -> Optional[CompiledRule]:
+        """Return the winning active rule for ip_integer, or None."""
+        self.ensure_fresh()
+        return self.get(ip_integer)
+
+    def __len__(self) -> int:
+        return len(self._index)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get index size, version and counters."""
+        index = self._index
+        return {
+            'rules': len(index),
+            'intervals': index.intervals,
+            'skipped_rules': self.skipped,
+            'rule_version': self._version,
+            'refresh_interval_seconds': self.refresh_interval,
+            'lookups': self.lookups,
+            'refreshes': self.refreshes,
+        }
+
+
+class RateLimiter:
+    """
+    Fixed-window request counter for rate_limit rules.
+
+    Counts requests per (rule pk, client ip) in windows of the rule's
+    rate_limit_window_seconds. Counts are per process, like the other
+    in-process firewall caches.
+    """
+
+    def __init__(self, max_keys: int = 100000):
+        self.max_keys = max_keys
+        self._windows: Dict[Tuple[int, str], Tuple[float, int]] = {}
+        self._lock = threading.Lock()
+
+    def allow(self, rule: CompiledRule, client_ip: str) -> bool:
+        """Count one request; False once the rule's limit is exceeded."""
+        if not rule.rate_limit_requests or not rule.rate_limit_window_seconds:
+            return True
+        now = time.monotonic()
+        key = (rule.pk, client_ip)
+        with self._lock:
+            window_end, count = self._windows.get(key, (0.0, 0))
+            if now >= window_end:
+                if len(self._windows) >= self.max_keys:
+                    self._prune(now)
+                window_end, count = now + rule.rate_limit_window_seconds, 0
+            count += 1
+            self._windows[key] = (window_end, count)
+        return count <= rule.rate_limit_requests
+
+    def _prune(self, now: float) -> None:
+        # Called with self._lock held
+        self._windows = {key: value for key, value in self._windows.items() if value[0] > now}
+        if len(self._windows) >= self.max_keys:
+            self._windows.clear()
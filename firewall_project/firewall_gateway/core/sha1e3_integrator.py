@@ -5,7 +5,7 @@ Uses the high-performance SHA1-E3 implementation from storage.utils
 
 import sys
 import os
-from typing import Dict, Any
+from typing import Dict, Any, Iterable, Optional
 from dataclasses import dataclass
 
 
@@ -44,6 +44,7 @@ class SHA1E3Integrator:
             ImportError: If SHA1-E3 is not available
         """
         self.hash_function = None
+        self.hasher_class = None
         self._initialize_hash_function()
 
     def _initialize_hash_function(self):
@@ -55,8 +56,11 @@ class SHA1E3Integrator:
             firewall_root = os.path.dirname(os.path.dirname(os.path.dirname(__file__)))  # firewall_project
             securehash_path = os.path.join(firewall_root, 'securehash_project')
             sys.path.insert(0, securehash_path)
-            from storage.utils.sha1_enhanced_v3 import enhanced_sha1_with_content
+            from storage.utils.sha1_enhanced_v3 import (
+                enhanced_sha1_with_content, EnhancedSHA1Hasher
+            )
             self.hash_function = enhanced_sha1_with_content
+            self.hasher_class = EnhancedSHA1Hasher
         except (ImportError, ModuleNotFoundError, AttributeError) as e:
             raise ImportError(
                 f"SHA1-E3 not available from storage.utils.sha1_enhanced_v3\n"
@@ -69,7 +73,7 @@ class SHA1E3Integrator:
         Compute hash of data using SHA1-E3.
 
         Args:
-            data: Bytes to hash
+            data: Bytes to hash (any bytes-like object, e.g. a memoryview)
 
         Returns:
             Hex string representation of hash
@@ -94,7 +98,7 @@ class SHA1E3Integrator:
         Hash a Collatz sequence (trajectory) bytes.
 
         Args:
-            trajectory_bytes: Bytes from Collatz sequence
+            trajectory_bytes: Bytes (or memoryview) from Collatz sequence
 
         Returns:
             HashResult with computed hash
@@ -102,12 +106,80 @@ class SHA1E3Integrator:
         hash_value = self.compute_hash(trajectory_bytes)
 
         return HashResult(
-            input_hash=trajectory_bytes.hex()[:32] + "...",
+            input_hash=bytes(trajectory_bytes[:16]).hex() + "...",
             hash_value=hash_value,
             hash_length=len(hash_value),
             hash_type=self.HASH_TYPE
         )
 
+    def new_hasher(self, length: Optional[int] = None):
+        """
+        Create an incremental SHA1-E3 hasher (update/copy/digest/hexdigest).
+
+        Args:
+            length: Total input size, if known. Keeps the hasher's state
+                bounded; otherwise input is buffered until the digest.
+
+        Returns:
+            Hasher object producing the same value as compute_hash
+
+        Raises:
+            RuntimeError: If SHA1-E3 is not initialized
+        """
+        if self.hasher_class is None:
+            raise RuntimeError("SHA1-E3 not initialized")
+        return self.hasher_class(length=length)
+
+    def hash_collatz_stream(self, chunks: Iterable, length: Optional[int] = None) -> HashResult:
+        """
+        Hash a Collatz trajectory delivered as a stream of byte chunks.
+
+        Equivalent to hash_collatz_sequence on the concatenated chunks, but
+        each chunk is fed to the hasher as soon as it is produced.
+
+        Args:
+            chunks: Iterable of bytes-like trajectory chunks
+            length: Total trajectory size in bytes, if known
+
+        Returns:
+            HashResult with computed hash
+        """
+        hasher = self.new_hasher(length)
+        preview = bytearray()
+
+        try:
+            for chunk in chunks:
+                if len(preview) < 16:
+                    preview += chunk[:16 - len(preview)]
+                hasher.update(chunk)
+            hash_value = hasher.hexdigest()
+        except (ValueError, OverflowError) as e:
+            raise RuntimeError(f"SHA1-E3 hash computation failed: {str(e)}") from e
+
+        return HashResult(
+            input_hash=bytes(preview).hex() + "...",
+            hash_value=hash_value,
+            hash_length=len(hash_value),
+            hash_type=self.HASH_TYPE
+        )
+
+    def hash_file(self, file_path: str, chunk_size: int = 1024 * 1024) -> HashResult:
+        """
+        Hash a file without loading it into memory.
+
+        Args:
+            file_path: Path of the file to hash
+            chunk_size: Bytes read per call
+
+        Returns:
+            HashResult with computed hash
+        """
+        length = os.path.getsize(file_path)
+        with open(file_path, 'rb') as f:
+            return self.hash_collatz_stream(
+                iter(lambda: f.read(chunk_size), b''), length=length
+            )
+
     def verify_hash(self, data: bytes, expected_hash: str) -> bool:
         """
         Verify if computed hash matches expected hash.
@@ -0,0 +1,168 @@
+"""
+Trajectory Cache: Bounded memoization of Collatz trajectories
+Keeps recently converted IP trajectories in memory and shares their tails.
+"""
+
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Dict, Optional, Tuple, Any
+
+
+@dataclass(frozen=True)
+class CachedTrajectory:
+    """Immutable cached trajectory for a single starting value"""
+    sequence: Tuple[int, ...]
+    steps_to_one: int
+    max_value: int
+    trajectory_bytes: memoryview  # Read-only, big-endian uint64 words
+
+    @property
+    def estimated_size(self) -> int:
+        """Rough memory footprint in bytes (tuple slots, ints, bytes, index)."""
+        return len(self.sequence) * TrajectoryCache.BYTES_PER_STEP
+
+
+class TrajectoryCache:
+    """
+    LRU cache of Collatz trajectories keyed by starting integer.
+
+    A trajectory is a pure function of the starting value, so repeated
+    conversions of the same IP can be answered from memory. On top of the
+    per-IP cache, every value of a cached trajectory is indexed so that a
+    new walk stops as soon as it meets a known value and reuses that tail
+    instead of recomputing it down to 1.
+
+    The cache is bounded both by entry count and by an estimated memory
+    budget; the least recently used trajectories are evicted first, along
+    with their suffix index entries.
+
+    Thread-safe: the middleware calls it from every worker thread.
+    """
+
+    DEFAULT_MAX_ENTRIES = 8192
+    DEFAULT_MAX_BYTES = 64 * 1024 * 1024  # 64 MiB
+
+    # Tuple slot + int object + 8 serialized bytes + suffix index entry
+    BYTES_PER_STEP = 8 + 32 + 8 + 104
+
+    def __init__(
+        self,
+        max_entries: int = DEFAULT_MAX_ENTRIES,
+        max_bytes: int = DEFAULT_MAX_BYTES
+    ):
+        if max_entries < 1:
+            raise ValueError("max_entries must be at least 1")
+        if max_bytes < 1:
+            raise ValueError("max_bytes must be at least 1")
+
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+
+        self._entries: "OrderedDict[int, CachedTrajectory]" = OrderedDict()
+        # value -> (owning start value, offset of value in owner's sequence)
+        self._suffix_index: Dict[int, Tuple[int, int]] = {}
+        self._current_bytes = 0
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+        self.suffix_hits = 0
+        self.evictions = 0
+
+    def get(self, start: int) -> Optional[CachedTrajectory]:
+        """Return the cached trajectory for start, refreshing its LRU slot."""
+        with self._lock:
+            entry = self._entries.get(start)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(start)
+            self.hits += 1
+            return entry
+
+    def find_suffix(self, value: int) -> Optional[Tuple[Tuple[int, ...], memoryview, int]]:
+        """
+        Look up a known tail starting at value.
+
+        Returns:
+            Tuple of (owner sequence, owner trajectory bytes, offset) or None
+        """
+        with self._lock:
+            location = self._suffix_index.get(value)
+            if location is None:
+                return None
+            owner, offset = location
+            entry = self._entries[owner]
+            self.suffix_hits += 1
+            return entry.sequence, entry.trajectory_bytes, offset
+
+    def put(self, start: int, entry: CachedTrajectory) -> None:
+        """
+        Insert a trajectory and index its values for suffix reuse.
+
+        Only complete trajectories (ending at 1) are indexed, since a
+        truncated one does not describe the real tail of its values.
+        """
+        size = entry.estimated_size
+        if size > self.max_bytes:
+            return
+
+        with self._lock:
+            if start in self._entries:
+                self._entries.move_to_end(start)
+                return
+
+            self._entries[start] = entry
+            self._current_bytes += size
+
+            if entry.sequence and entry.sequence[-1] == 1:
+                index = self._suffix_index
+                for offset, value in enumerate(entry.sequence):
+                    if value not in index:
+                        index[value] = (start, offset)
+
+            while (len(self._entries) > self.max_entries
+                   or self._current_bytes > self.max_bytes):
+                self._evict_oldest()
+
+    def _evict_oldest(self) -> None:
+        """Drop the least recently used trajectory. Caller holds the lock."""
+        start, entry = self._entries.popitem(last=False)
+        self._current_bytes -= entry.estimated_size
+        self.evictions += 1
+
+        index = self._suffix_index
+        for value in entry.sequence:
+            location = index.get(value)
+            if location is not None and location[0] == start:
+                del index[value]
+
+    def clear(self) -> None:
+        """Remove all cached trajectories and reset counters."""
+        with self._lock:
+            self._entries.clear()
+            self._suffix_index.clear()
+            self._current_bytes = 0
+            self.hits = 0
+            self.misses = 0
+            self.suffix_hits = 0
+            self.evictions = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get cache occupancy and hit/miss counters."""
+        with self._lock:
+            return {
+                'entries': len(self._entries),
+                'max_entries': self.max_entries,
+                'estimated_bytes': self._current_bytes,
+                'max_bytes': self.max_bytes,
+                'indexed_values': len(self._suffix_index),
+                'hits': self.hits,
+                'misses': self.misses,
+                'suffix_hits': self.suffix_hits,
+                'evictions': self.evictions,
+            }
@@ -0,0 +1,133 @@
+"""
+Verification Cache: TTL cache of firewall verification decisions
+Maps (ip, stored hash) to a previous VerificationResult.
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+
+# Process-wide whitelist version. Bumped whenever an IPWhitelist row changes
+# (see firewall_gateway.signals); cached decisions from an older version are
+# treated as misses.
+_whitelist_version = 0
+_version_lock = threading.Lock()
+
+
+def get_whitelist_version() -> int:
+    """Get the current whitelist version."""
+    return _whitelist_version
+
+
+def bump_whitelist_version() -> int:
+    """
+    Invalidate everything derived from the whitelist.
+
+    Returns:
+        The new whitelist version
+    """
+    global _whitelist_version
+    with _version_lock:
+        _whitelist_version += 1
+        return _whitelist_version
+
+
+class VerificationCache:
+    """
+    Bounded TTL cache of verification decisions.
+
+    Keys are (ip_address, lowercased stored hash). Each entry remembers the
+    whitelist version it was computed under, so a whitelist change invalidates
+    the whole cache without having to walk it.
+
+    The cache is per process: with several workers, a change made in one
+    worker reaches the others through TTL expiry.
+    """
+
+    DEFAULT_TTL = 300            # Seconds
+    DEFAULT_MAX_ENTRIES = 10000
+
+    def __init__(self, ttl: float = DEFAULT_TTL, max_entries: int = DEFAULT_MAX_ENTRIES):
+        if ttl <= 0:
+            raise ValueError("ttl must be positive")
+        if max_entries < 1:
+            raise ValueError("max_entries must be at least 1")
+
+        self.ttl = ttl
+        self.max_entries = max_entries
+
+        # key -> (expires_at, whitelist_version, result)
+        self._entries: "OrderedDict[Tuple[str, str], Tuple[float, int, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+        self.expirations = 0
+        self.invalidations = 0
+        self.evictions = 0
+
+    @staticmethod
+    def make_key(ip_address: str, stored_hash: str) -> Tuple[str, str]:
+        return ip_address, stored_hash.lower()
+
+    def get(self, ip_address: str, stored_hash: str) -> Optional[Any]:
+        """Return the cached result, or None if absent, expired or stale."""
+        key = self.make_key(ip_address, stored_hash)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+
+            expires_at, version, result = entry
+            if version != _whitelist_version:
+                del self._entries[key]
+                self.invalidations += 1
+                self.misses += 1
+                return None
+            if expires_at <= time.monotonic():
+                del self._entries[key]
+                self.expirations += 1
+                self.misses += 1
+                return None
+
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return result
+
+    def put(self, ip_address: str, stored_hash: str, result: Any) -> None:
+        """Store a result under the current whitelist version."""
+        key = self.make_key(ip_address, stored_hash)
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl, _whitelist_version, result)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self) -> None:
+        """Drop all cached decisions."""
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get cache occupancy and hit/miss counters."""
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                'entries': len(self._entries),
+                'max_entries': self.max_entries,
+                'ttl_seconds': self.ttl,
+                'whitelist_version': _whitelist_version,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': (self.hits / total * 100) if total > 0 else 0.0,
+                'expirations': self.expirations,
+                'invalidations': self.invalidations,
+                'evictions': self.evictions,
+            }
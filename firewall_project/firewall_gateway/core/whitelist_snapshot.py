@@ -0,0 +1,114 @@
+"""
+Whitelist Snapshot: In-process copy of the active IP whitelist
+Maps ip_integer to the entry's id and stored hash so requests are checked
+without a database round trip.
+"""
+
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Iterable, Optional, Tuple
+
+from .verification_cache import get_whitelist_version
+
+
+@dataclass(frozen=True)
+class SnapshotEntry:
+    """Active whitelist entry as seen by the firewall middleware"""
+    pk: int
+    collatz_hash: str
+
+
+class WhitelistSnapshot:
+    """
+    Dictionary of active whitelist entries keyed by ip_integer.
+
+    The loader returns (ip_integer, pk, collatz_hash) rows for every active
+    entry. The snapshot is rebuilt on the first lookup after the whitelist
+    version changes (signals in this process) or after refresh_interval
+    seconds (changes made by other workers). Lookups never wait for a
+    rebuild done by another thread; they read the previous dictionary.
+
+    Thread-safe: the middleware calls it from every worker thread.
+    """
+
+    DEFAULT_REFRESH_INTERVAL = 5.0  # Seconds
+
+    def __init__(self, loader: Callable[[], Iterable[Tuple[int, int, str]]],
+                 refresh_interval: float = DEFAULT_REFRESH_INTERVAL):
+        if refresh_interval <= 0:
+            raise ValueError("refresh_interval must be positive")
+
+        self.loader = loader
+        self.refresh_interval = refresh_interval
+
+        self._entries: Dict[int, SnapshotEntry] = {}
+        self._version: Optional[int] = None
+        self._expires_at = 0.0
+        self._refresh_lock = threading.Lock()
+
+        self.lookups = 0
+        self.refreshes = 0
+
+    def refresh(self) -> None:
+        """Reload all active entries now."""
+        version = get_whitelist_version()
+        entries = {
+            ip_integer: SnapshotEntry(pk, collatz_hash)
+            for ip_integer, pk, collatz_hash in self.loader()
+        }
+        # Publish the dictionary before the version so readers never pair
+        # the new version with the old entries
+        self._entries = entries
+        self._version = version
+        self._expires_at = time.monotonic() + self.refresh_interval
+        self.refreshes += 1
+
+    def invalidate(self) -> None:
+        """Force a reload on the next lookup."""
+        self._version = None
+
+    def is_stale(self) -> bool:
+        return (self._version != get_whitelist_version()
+                or time.monotonic() >= self._expires_at)
+
+    def is_loaded(self) -> bool:
+        return self._version is not None
+
+    def ensure_fresh(self) -> None:
+        """Reload if stale, unless another thread already is (then keep serving the old copy)."""
+        if not self.is_stale():
+            return
+        if self._version is None:
+            # Nothing to serve yet: wait for the first load
+            with self._refresh_lock:
+                if self._version is None:
+                    self.refresh()
+        elif self._refresh_lock.acquire(blocking=False):
+            try:
+                self.refresh()
+            finally:
+                self._refresh_lock.release()
+
+    def get(self, ip_integer: int) -> Optional[SnapshotEntry]:
+        """Look ip_integer up in the current copy, without refreshing it."""
+        self.lookups += 1
+        return self._entries.get(ip_integer)
+
+    def lookup(self, ip_integer: int) -> Optional[SnapshotEntry]:
+        """Return the active entry for ip_integer, or None if not whitelisted."""
+        self.ensure_fresh()
+        return self.get(ip_integer)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get snapshot size, version and counters."""
+        return {
+            'entries': len(self._entries),
+            'whitelist_version': self._version,
+            'refresh_interval_seconds': self.refresh_interval,
+            'lookups': self.lookups,
+            'refreshes': self.refreshes,
+        }
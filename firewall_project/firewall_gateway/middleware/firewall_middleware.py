@@ -3,17 +3,46 @@ Firewall Middleware: Automatic request filtering using Collatz Firewall
 Intercepts incoming requests and verifies IPs against whitelist.
 """
 
+import asyncio
 import logging
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+
+from asgiref.sync import sync_to_async
 from django.http import JsonResponse
 from django.utils.deprecation import MiddlewareMixin
 from django.conf import settings
 
+from firewall_gateway.access_log import (
+    alog_access, arecord_whitelist_access, log_access, record_whitelist_access
+)
+from firewall_gateway.core.collatz_converter import CollatzConverter
 from firewall_gateway.core.firewall_engine import FirewallEngine
-from firewall_gateway.models.firewall_models import IPWhitelist, AccessLog
+from firewall_gateway.core.rule_index import RateLimiter, RuleSnapshot
+from firewall_gateway.core.whitelist_snapshot import WhitelistSnapshot
+from firewall_gateway.models.firewall_models import IPWhitelist, AccessLog, FirewallRule
 
 logger = logging.getLogger(__name__)
 
 
+def load_active_whitelist():
+    """(ip_integer, id, collatz_hash) rows of every active whitelist entry."""
+    return IPWhitelist.objects.filter(is_active=True).values_list(
+        'ip_integer', 'pk', 'collatz_hash'
+    )
+
+
+def load_active_rules(rule_types=None):
+    """Rows of every active firewall rule (of rule_types, if given), highest priority first."""
+    rules = FirewallRule.objects.filter(is_active=True)
+    if rule_types is not None:
+        rules = rules.filter(rule_type__in=rule_types)
+    return rules.values_list(
+        'pk', 'name', 'rule_type', 'ip_range', 'priority',
+        'rate_limit_requests', 'rate_limit_window_seconds'
+    )
+
+
 class CollatzFirewallMiddleware(MiddlewareMixin):
     """
     Django middleware for Collatz Firewall protection.
@@ -23,13 +52,22 @@ class CollatzFirewallMiddleware(MiddlewareMixin):
     - Allow/block based on firewall status
     - Log all access attempts
     - Skip certain paths (e.g., health checks)
+
+    Whitelist lookups are served from an in-process WhitelistSnapshot, so
+    the database is only read when the snapshot is refreshed.
+
+    Active FirewallRule rows are compiled into a RuleSnapshot and checked
+    before the whitelist: a matching block rule denies, an allow rule
+    admits without the Collatz check, and a rate_limit rule denies with
+    429 over its limit. rate_limit rules are only compiled when
+    COLLATZ_FIREWALL_RATE_LIMIT_ENABLED is set.
     """
 
     def __init__(self, get_response):
         """Initialize middleware with firewall engine."""
         super().__init__(get_response)
         self.get_response = get_response
-        self.firewall_engine = FirewallEngine()
+        self.firewall_engine = FirewallEngine.from_settings(settings)
 
         # Configuration from Django settings
         self.enabled = getattr(settings, 'COLLATZ_FIREWALL_ENABLED', True)
@@ -41,6 +79,28 @@ class CollatzFirewallMiddleware(MiddlewareMixin):
             '/firewall/verify/',
         ])
         self.log_all = getattr(settings, 'COLLATZ_FIREWALL_LOG_ALL', True)
+        self.whitelist = WhitelistSnapshot(
+            load_active_whitelist,
+            refresh_interval=getattr(settings, 'COLLATZ_FIREWALL_SNAPSHOT_REFRESH',
+                                     WhitelistSnapshot.DEFAULT_REFRESH_INTERVAL)
+        )
+        self.rate_limiter = None
+        if getattr(settings, 'COLLATZ_FIREWALL_RATE_LIMIT_ENABLED', False):
+            self.rate_limiter = RateLimiter()
+        self.rules = None
+        if getattr(settings, 'COLLATZ_FIREWALL_RULES_ENABLED', True):
+            loader = load_active_rules
+            if self.rate_limiter is None:
+                # Unenforced rate_limit rules must not shadow lower-priority
+                # allow/block rules for the same range
+                loader = partial(load_active_rules, rule_types=(
+                    FirewallRule.RULE_TYPE_ALLOW, FirewallRule.RULE_TYPE_BLOCK
+                ))
+            self.rules = RuleSnapshot(
+                loader,
+                refresh_interval=getattr(settings, 'COLLATZ_FIREWALL_SNAPSHOT_REFRESH',
+                                         RuleSnapshot.DEFAULT_REFRESH_INTERVAL)
+            )
 
     def get_client_ip(self, request) -> str:
         """
@@ -64,107 +124,179 @@ class CollatzFirewallMiddleware(MiddlewareMixin):
                 return True
         return False
 
-    def process_request(self, request):
+    def _deny(self, message: str, status: int = 403):
+        """Error response when enforcing, None (let through) in audit mode."""
+        if self.enforce:
+            return JsonResponse({'error': message}, status=status)
+        return None
+
+    def _screen(self, request):
         """
-        Process incoming request.
+        Checks that need no whitelist entry.
 
         Returns:
-        - None: Request passes firewall, continue processing
-        - JsonResponse: Request blocked, return error response
+            (client_ip, None) to continue with the whitelist, or
+            (None, response) when the request is decided here (response
+            may be None, which lets it through)
         """
         if not self.enabled:
-            return None
+            return None, None
 
         # Get client IP
         client_ip = self.get_client_ip(request)
 
-        if not client_ip or client_ip == '':
+        if not client_ip:
             logger.warning("Could not extract client IP from request")
-            if self.enforce:
-                return JsonResponse(
-                    {'error': 'Could not determine client IP'},
-                    status=400
-                )
-            return None
+            return None, self._deny('Could not determine client IP', status=400)
 
         # Check if path should skip firewall
         if self.should_skip_path(request.path):
-            return None
+            return None, None
 
-        # Try to find IP in whitelist
+        return client_ip, None
+
+    @staticmethod
+    def _ip_integer(client_ip: str):
+        """Whitelist key of client_ip, or None if it is not an IPv4 address."""
         try:
-            whitelist_entry = IPWhitelist.objects.get(
-                ip_address=client_ip,
-                is_active=True
-            )
-        except IPWhitelist.DoesNotExist:
-            # IP not whitelisted
+            return CollatzConverter.ip_to_integer(client_ip)
+        except ValueError:
+            return None
+
+    def _request_log(self, request, client_ip: str, **fields):
+        """AccessLog field values for this request."""
+        return dict(
+            ip_address=client_ip,
+            request_path=request.path,
+            request_method=request.method,
+            user_agent=request.META.get('HTTP_USER_AGENT', ''),
+            **fields
+        )
+
+    def _apply_rule(self, request, client_ip: str, rule):
+        """
+        Decision of a matched firewall rule.
+
+        Returns:
+            None to continue with the whitelist check, or
+            (response, access log fields or None) when the rule decides
+        """
+        if rule is None:
+            return None
+
+        if rule.rule_type == FirewallRule.RULE_TYPE_ALLOW:
+            logger.debug(f"Access allowed for {client_ip} by rule {rule.name}")
+            log_fields = None
             if self.log_all:
-                AccessLog.objects.create(
-                    ip_address=client_ip,
-                    status=AccessLog.STATUS_BLOCKED,
-                    request_path=request.path,
-                    request_method=request.method,
-                    user_agent=request.META.get('HTTP_USER_AGENT', ''),
-                    error_message='IP not in whitelist'
+                log_fields = self._request_log(
+                    request, client_ip,
+                    status=AccessLog.STATUS_ALLOWED,
+                    error_message=f'Allowed by firewall rule: {rule.name}'
                 )
+            return None, log_fields
+
+        if rule.rule_type == FirewallRule.RULE_TYPE_BLOCK:
+            logger.warning(f"Request from {client_ip} blocked by rule {rule.name}")
+            log_fields = self._request_log(
+                request, client_ip,
+                status=AccessLog.STATUS_BLOCKED,
+                error_message=f'Blocked by firewall rule: {rule.name}'
+            )
+            return self._deny('IP blocked by firewall rule'), log_fields
 
-            logger.warning(f"Request from non-whitelisted IP: {client_ip}")
+        if (rule.rule_type == FirewallRule.RULE_TYPE_RATE_LIMIT
+                and self.rate_limiter is not None
+                and not self.rate_limiter.allow(rule, client_ip)):
+            logger.warning(f"Rate limit of rule {rule.name} exceeded by {client_ip}")
+            log_fields = self._request_log(
+                request, client_ip,
+                status=AccessLog.STATUS_BLOCKED,
+                error_message=f'Rate limit exceeded: {rule.name}'
+            )
+            return self._deny('Rate limit exceeded', status=429), log_fields
 
-            if self.enforce:
-                return JsonResponse(
-                    {'error': 'IP not whitelisted'},
-                    status=403
-                )
-            return None
+        return None
 
-        # Verify IP using Collatz firewall
-        verify_result = self.firewall_engine.verify_ip(
-            client_ip,
-            whitelist_entry.collatz_hash
-        )
+    def _not_whitelisted(self, request, client_ip: str):
+        """(response, access log fields or None) for an IP that is not whitelisted."""
+        logger.warning(f"Request from non-whitelisted IP: {client_ip}")
+        log_fields = None
+        if self.log_all:
+            log_fields = self._request_log(
+                request, client_ip,
+                status=AccessLog.STATUS_BLOCKED,
+                error_message='IP not in whitelist'
+            )
+        return self._deny('IP not whitelisted'), log_fields
 
+    def _verified(self, request, client_ip: str, whitelist_entry, verify_result):
+        """(response, access log fields or None) for a completed verification."""
         if verify_result.is_allowed():
-            # Update access info
-            whitelist_entry.update_access_timestamp()
-
+            logger.debug(f"Access allowed for {client_ip}")
             # Log allowed access (optional)
+            log_fields = None
             if self.log_all:
-                AccessLog.objects.create(
-                    ip_address=client_ip,
+                log_fields = self._request_log(
+                    request, client_ip,
                     computed_hash=verify_result.hash_value,
                     status=AccessLog.STATUS_ALLOWED,
-                    matched_whitelist=whitelist_entry,
-                    request_path=request.path,
-                    request_method=request.method,
-                    user_agent=request.META.get('HTTP_USER_AGENT', ''),
+                    matched_whitelist_id=whitelist_entry.pk,
                     response_time_ms=int(verify_result.response_time_ms)
                 )
+            return None, log_fields
 
-            logger.debug(f"Access allowed for {client_ip}")
-            return None
+        # Hash mismatch - possible spoofing
+        logger.error(f"Hash mismatch for {client_ip} - possible spoofing attack")
+        log_fields = self._request_log(
+            request, client_ip,
+            computed_hash=verify_result.hash_value,
+            status=AccessLog.STATUS_BLOCKED,
+            error_message='Hash verification failed - possible IP spoofing',
+            response_time_ms=int(verify_result.response_time_ms)
+        )
+        return self._deny('Firewall verification failed'), log_fields
+
+    def process_request(self, request):
+        """
+        Process incoming request.
+
+        Returns:
+        - None: Request passes firewall, continue processing
+        - JsonResponse: Request blocked, return error response
+        """
+        client_ip, response = self._screen(request)
+        if client_ip is None:
+            return response
 
+        ip_integer = self._ip_integer(client_ip)
+
+        # Firewall rules come before the whitelist
+        decision = None
+        if ip_integer is not None and self.rules is not None:
+            decision = self._apply_rule(request, client_ip, self.rules.lookup(ip_integer))
+
+        # Try to find IP in whitelist
+        whitelist_entry = None
+        if decision is None and ip_integer is not None:
+            whitelist_entry = self.whitelist.lookup(ip_integer)
+
+        if decision is not None:
+            response, log_fields = decision
+        elif whitelist_entry is None:
+            response, log_fields = self._not_whitelisted(request, client_ip)
         else:
-            # Hash mismatch - possible spoofing
-            AccessLog.objects.create(
-                ip_address=client_ip,
-                computed_hash=verify_result.hash_value,
-                status=AccessLog.STATUS_BLOCKED,
-                request_path=request.path,
-                request_method=request.method,
-                user_agent=request.META.get('HTTP_USER_AGENT', ''),
-                error_message='Hash verification failed - possible IP spoofing',
-                response_time_ms=int(verify_result.response_time_ms)
+            # Verify IP using Collatz firewall
+            verify_result = self.firewall_engine.verify_ip(
+                client_ip,
+                whitelist_entry.collatz_hash
             )
+            if verify_result.is_allowed():
+                record_whitelist_access(whitelist_entry.pk)
+            response, log_fields = self._verified(request, client_ip, whitelist_entry, verify_result)
 
-            logger.error(f"Hash mismatch for {client_ip} - possible spoofing attack")
-
-            if self.enforce:
-                return JsonResponse(
-                    {'error': 'Firewall verification failed'},
-                    status=403
-                )
-            return None
+        if log_fields is not None:
+            log_access(**log_fields)
+        return response
 
     def process_response(self, request, response):
         """Add firewall headers to response."""
@@ -173,3 +305,95 @@ class CollatzFirewallMiddleware(MiddlewareMixin):
             response['X-Content-Type-Options'] = 'nosniff'
 
         return response
+
+
+class AsyncCollatzFirewallMiddleware(CollatzFirewallMiddleware):
+    """
+    Native async variant of CollatzFirewallMiddleware for ASGI servers.
+
+    Reads the same COLLATZ_FIREWALL_* settings and makes the same
+    decisions, without handing each request to a sync thread:
+    - rule and whitelist lookups use the in-memory snapshots; only the
+      first load is awaited (through sync_to_async), later refreshes run
+      in the background on a single collatz-refresh thread while requests
+      keep reading the current copy
+    - the Collatz + SHA1-E3 verification runs on a bounded thread pool of
+      COLLATZ_FIREWALL_ASYNC_WORKERS threads
+    - access logs and access counts go through the in-memory queues of
+      firewall_gateway.access_log
+    """
+
+    sync_capable = False
+    async_capable = True
+
+    DEFAULT_WORKERS = 4
+
+    def __init__(self, get_response):
+        super().__init__(get_response)
+        self.verify_executor = ThreadPoolExecutor(
+            max_workers=getattr(settings, 'COLLATZ_FIREWALL_ASYNC_WORKERS', self.DEFAULT_WORKERS),
+            thread_name_prefix='collatz-verify'
+        )
+        self.refresh_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='collatz-refresh')
+        self._refreshing = {}  # Snapshot -> in-flight background refresh
+
+    async def __call__(self, request):
+        response = await self.aprocess_request(request)
+        if response is None:
+            response = await self.get_response(request)
+        return self.process_response(request, response)
+
+    async def _afresh(self, snapshot) -> None:
+        """Load snapshot if it never was, else start at most one background refresh."""
+        if not snapshot.is_stale():
+            return
+        if not snapshot.is_loaded():
+            await sync_to_async(snapshot.ensure_fresh)()
+        elif snapshot not in self._refreshing:
+            future = asyncio.get_running_loop().run_in_executor(
+                self.refresh_executor, snapshot.ensure_fresh
+            )
+            self._refreshing[snapshot] = future
+            future.add_done_callback(partial(self._refresh_done, snapshot))
+
+    def _refresh_done(self, snapshot, future) -> None:
+        del self._refreshing[snapshot]
+        if not future.cancelled() and future.exception() is not None:
+            logger.error(f"Background {type(snapshot).__name__} refresh failed: {future.exception()}")
+
+    async def aprocess_request(self, request):
+        """process_request for the event loop."""
+        client_ip, response = self._screen(request)
+        if client_ip is None:
+            return response
+
+        ip_integer = self._ip_integer(client_ip)
+
+        decision = None
+        if ip_integer is not None and self.rules is not None:
+            await self._afresh(self.rules)
+            decision = self._apply_rule(request, client_ip, self.rules.get(ip_integer))
+
+        whitelist_entry = None
+        if decision is None and ip_integer is not None:
+            await self._afresh(self.whitelist)
+            whitelist_entry = self.whitelist.get(ip_integer)
+
+        if decision is not None:
+            response, log_fields = decision
+        elif whitelist_entry is None:
+            response, log_fields = self._not_whitelisted(request, client_ip)
+        else:
+            verify_result = await asyncio.get_running_loop().run_in_executor(
+                self.verify_executor,
+                self.firewall_engine.verify_ip,
+                client_ip,
+                whitelist_entry.collatz_hash
+            )
+            if verify_result.is_allowed():
+                await arecord_whitelist_access(whitelist_entry.pk)
+            response, log_fields = self._verified(request, client_ip, whitelist_entry, verify_result)
+
+        if log_fields is not None:
+            await alog_access(**log_fields)
+        return response
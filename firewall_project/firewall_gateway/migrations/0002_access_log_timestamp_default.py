@@ -0,0 +1,19 @@
+# Generated by Django 5.2.18 on 2026-10-16 20:53
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('firewall_gateway', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='accesslog',
+            name='timestamp',
+            field=models.DateTimeField(db_index=True, default=django.utils.timezone.now, editable=False, help_text='When the access attempt occurred'),
+        ),
+    ]
@@ -110,10 +110,25 @@ class IPWhitelist(models.Model):
         return f"{self.name or self.ip_address} ({self.ip_address})"
 
     def update_access_timestamp(self):
-        """Update last verified timestamp and increment access count."""
+        """
+        Update last verified timestamp and increment access count.
+
+        The database row is updated by the next access counter flush
+        (see firewall_gateway.access_log), not by this call.
+        """
+        from firewall_gateway.access_log import record_whitelist_access
+
         self.last_verified = timezone.now()
         self.access_count += 1
-        self.save(update_fields=['last_verified', 'access_count'])
+        record_whitelist_access(self.pk, self.last_verified)
+
+    @classmethod
+    def record_access(cls, pk: int, count: int = 1, when=None):
+        """Add count accesses to an entry known only by id, in one UPDATE."""
+        cls.objects.filter(pk=pk).update(
+            last_verified=when or timezone.now(),
+            access_count=models.F('access_count') + count
+        )
 
     def deactivate(self):
         """Deactivate this whitelist entry."""
@@ -199,8 +214,11 @@ class AccessLog(models.Model):
         help_text="Error details if access was blocked"
     )
 
+    # Set when the entry is built, not when it is inserted: entries are
+    # written in batches some time after the request (see access_log.py)
     timestamp = models.DateTimeField(
-        auto_now_add=True,
+        default=timezone.now,
+        editable=False,
         db_index=True,
         help_text="When the access attempt occurred"
     )
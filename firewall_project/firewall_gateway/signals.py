@@ -0,0 +1,42 @@
+"""
+Firewall Signals: Keep in-process firewall caches consistent with the database
+Any change to an IPWhitelist row, other than recording an access, bumps the
+whitelist version; any change to a FirewallRule row bumps the rule version.
+"""
+
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+
+from firewall_gateway.core.rule_index import bump_rule_version
+from firewall_gateway.core.verification_cache import bump_whitelist_version
+from firewall_gateway.models.firewall_models import FirewallRule, IPWhitelist
+
+
+# Saves limited to these fields only record accesses and change no decision
+ACCESS_BOOKKEEPING_FIELDS = frozenset({'last_verified', 'access_count'})
+
+
+@receiver(post_save, sender=IPWhitelist, dispatch_uid='firewall_whitelist_saved')
+def whitelist_saved(sender, instance, update_fields=None, **kwargs):
+    """Invalidate cached decisions when an entry is saved, activated or deactivated."""
+    if update_fields and set(update_fields) <= ACCESS_BOOKKEEPING_FIELDS:
+        return
+    bump_whitelist_version()
+
+
+@receiver(post_delete, sender=IPWhitelist, dispatch_uid='firewall_whitelist_deleted')
+def whitelist_deleted(sender, instance, **kwargs):
+    """Invalidate cached decisions when an entry is deleted."""
+    bump_whitelist_version()
+
+
+@receiver(post_save, sender=FirewallRule, dispatch_uid='firewall_rule_saved')
+def rule_saved(sender, instance, **kwargs):
+    """Recompile firewall rules when a rule is saved, activated or deactivated."""
+    bump_rule_version()
+
+
+@receiver(post_delete, sender=FirewallRule, dispatch_uid='firewall_rule_deleted')
+def rule_deleted(sender, instance, **kwargs):
+    """Recompile firewall rules when a rule is deleted."""
+    bump_rule_version()
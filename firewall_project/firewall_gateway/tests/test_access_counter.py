@@ -0,0 +1,114 @@
+"""
+Unit tests for the whitelist access counter
+Tests coalescing, periodic flushing and failure handling.
+"""
+
+import threading
+import time
+import unittest
+
+from firewall_gateway.core.access_counter import AccessCounter
+
+
+class TestAccessCounter(unittest.TestCase):
+    """Test cases for AccessCounter"""
+
+    def setUp(self):
+        """Set up a counter that records its flushes"""
+        self.flushes = []
+        self.flushed = threading.Event()
+        self.counter = AccessCounter(self.flush, flush_interval=60)
+        self.addCleanup(self.counter.close)
+
+    def flush(self, counts):
+        self.flushes.append(counts)
+        self.flushed.set()
+
+    def test_coalesces_per_key(self):
+        """Test that accesses to one entry become one count and the latest time"""
+        for when in (3, 1, 7, 5):
+            self.counter.record(1, when)
+        self.counter.record(2, 4)
+
+        self.assertEqual(self.counter.flush(), 2)
+        self.assertEqual(self.flushes, [{1: (4, 7), 2: (1, 4)}])
+        self.assertEqual(self.counter.pending(), {})
+
+    def test_flush_nothing_pending(self):
+        """Test that an empty flush does not call flush_counts"""
+        self.assertEqual(self.counter.flush(), 0)
+        self.assertEqual(self.flushes, [])
+
+    def test_periodic_flush(self):
+        """Test that the background thread flushes every interval"""
+        counter = AccessCounter(self.flush, flush_interval=0.01)
+        self.addCleanup(counter.close)
+        counter.record('a', 1)
+        self.assertTrue(self.flushed.wait(5))
+        self.assertEqual(self.flushes[0], {'a': (1, 1)})
+
+    def test_failed_flush_is_retried(self):
+        """Test that counts survive a failing flush"""
+        calls = []
+
+        def flaky(counts):
+            calls.append(dict(counts))
+            if len(calls) == 1:
+                raise RuntimeError("database is locked")
+
+        counter = AccessCounter(flaky, flush_interval=60)
+        self.addCleanup(counter.close)
+        counter.record(1, 10)
+        with self.assertLogs('firewall_gateway.core.access_counter', level='ERROR'):
+            self.assertEqual(counter.flush(), 0)
+        counter.record(1, 20)
+        counter.flush()
+
+        self.assertEqual(calls[-1], {1: (2, 20)})
+        self.assertEqual(counter.get_stats()['failures'], 1)
+        self.assertEqual(counter.get_stats()['flushed'], 2)
+
+    def test_close_flushes(self):
+        """Test that close writes pending counts"""
+        self.counter.record(9, 1)
+        self.counter.close()
+        self.assertEqual(self.flushes, [{9: (1, 1)}])
+
+    def test_record_after_close_dropped(self):
+        """Test that accesses after close are counted as dropped, not left pending"""
+        self.counter.record(1, 1)
+        self.counter.close()
+        self.counter.record(2, 2)
+
+        self.assertEqual(self.counter.pending(), {})
+        self.assertEqual(self.flushes, [{1: (1, 1)}])
+        stats = self.counter.get_stats()
+        self.assertEqual((stats['recorded'], stats['dropped']), (1, 1))
+
+    def test_concurrent_records_are_not_lost(self):
+        """Test counting from several threads while flushing"""
+        counter = AccessCounter(self.flush, flush_interval=0.001)
+        self.addCleanup(counter.close)
+
+        def hit():
+            for i in range(500):
+                counter.record(i % 3, time.time())
+
+        threads = [threading.Thread(target=hit) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        counter.close()
+
+        total = sum(count for counts in self.flushes for count, _ in counts.values())
+        self.assertEqual(total, 2000)
+
+    def test_invalid_flush_interval(self):
+        """Test that the flush interval must be positive"""
+        with self.assertRaises(ValueError):
+            AccessCounter(self.flush, flush_interval=0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,231 @@
+"""
+Integration tests for the native async Collatz firewall middleware
+Tests AsyncCollatzFirewallMiddleware.__call__ on the event loop against a
+real database, including snapshot refreshes through sync_to_async.
+"""
+
+import asyncio
+import threading
+from unittest import mock
+
+from asgiref.sync import sync_to_async
+from django.http import HttpResponse
+from django.test import RequestFactory, TestCase, TransactionTestCase, override_settings
+
+from firewall_gateway.middleware import firewall_middleware
+from firewall_gateway.middleware.firewall_middleware import AsyncCollatzFirewallMiddleware
+from firewall_gateway.models.firewall_models import AccessLog, FirewallRule, IPWhitelist
+from firewall_gateway.tests.test_firewall_middleware import FIREWALL_SETTINGS, whitelist_ip
+
+
+async def ok_view(request):
+    return HttpResponse('ok')
+
+
+class AsyncMiddlewareMixin:
+    """Builds async middleware and sends requests through __call__"""
+
+    def setUp(self):
+        self.factory = RequestFactory()
+
+    def make_middleware(self, **settings):
+        with override_settings(**settings):
+            middleware = AsyncCollatzFirewallMiddleware(ok_view)
+        self.addCleanup(middleware.verify_executor.shutdown)
+        self.addCleanup(middleware.refresh_executor.shutdown)
+        return middleware
+
+    async def refreshed(self, middleware):
+        """Wait for the background refreshes started so far."""
+        await asyncio.gather(*middleware._refreshing.values())
+
+    async def request(self, middleware, ip_address: str, path: str = '/api/data/'):
+        return await middleware(self.factory.get(path, REMOTE_ADDR=ip_address))
+
+
+@override_settings(**FIREWALL_SETTINGS)
+class TestAsyncFirewallMiddleware(AsyncMiddlewareMixin, TestCase):
+    """Test cases for AsyncCollatzFirewallMiddleware decisions"""
+
+    def setUp(self):
+        super().setUp()
+        self.entry = whitelist_ip('10.9.0.1')
+        whitelist_ip('10.9.0.2', collatz_hash='f' * 64)
+
+    async def test_allowed(self):
+        """Test that a whitelisted IP reaches the view and is logged as allowed"""
+        middleware = self.make_middleware()
+
+        response = await self.request(middleware, '10.9.0.1')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['X-Firewall-Protected'], 'Collatz')
+        log = await AccessLog.objects.aget(ip_address='10.9.0.1')
+        self.assertEqual(log.status, AccessLog.STATUS_ALLOWED)
+        self.assertEqual(log.matched_whitelist_id, self.entry.pk)
+        entry = await IPWhitelist.objects.aget(pk=self.entry.pk)
+        self.assertEqual(entry.access_count, 1)
+
+    async def test_not_whitelisted(self):
+        """Test that an unknown IP is denied"""
+        middleware = self.make_middleware()
+
+        response = await self.request(middleware, '10.9.0.3')
+
+        self.assertEqual(response.status_code, 403)
+        log = await AccessLog.objects.aget(ip_address='10.9.0.3')
+        self.assertEqual(log.error_message, 'IP not in whitelist')
+
+    async def test_hash_mismatch(self):
+        """Test that a whitelisted IP whose stored hash differs is denied"""
+        middleware = self.make_middleware()
+
+        response = await self.request(middleware, '10.9.0.2')
+
+        self.assertEqual(response.status_code, 403)
+        log = await AccessLog.objects.aget(ip_address='10.9.0.2')
+        self.assertEqual(log.status, AccessLog.STATUS_BLOCKED)
+        self.assertIn('Hash verification failed', log.error_message)
+
+    async def test_skip_path(self):
+        """Test that skipped paths reach the view without a decision"""
+        middleware = self.make_middleware()
+
+        response = await self.request(middleware, '10.9.0.3', path='/health/')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertFalse(await AccessLog.objects.filter(ip_address='10.9.0.3').aexists())
+
+    async def test_rules(self):
+        """Test allow, block and rate_limit rules through __call__"""
+        await FirewallRule.objects.acreate(name='block-host', rule_type=FirewallRule.RULE_TYPE_BLOCK,
+                                           ip_range='10.9.0.1/32')
+        await FirewallRule.objects.acreate(name='allow-net', rule_type=FirewallRule.RULE_TYPE_ALLOW,
+                                           ip_range='10.10.0.0/16')
+        await FirewallRule.objects.acreate(name='throttle', rule_type=FirewallRule.RULE_TYPE_RATE_LIMIT,
+                                           ip_range='10.9.0.2/32', rate_limit_requests=1,
+                                           rate_limit_window_seconds=60)
+        middleware = self.make_middleware(COLLATZ_FIREWALL_RATE_LIMIT_ENABLED=True)
+
+        self.assertEqual((await self.request(middleware, '10.9.0.1')).status_code, 403)
+        self.assertEqual((await self.request(middleware, '10.10.3.4')).status_code, 200)
+        # Under its limit the request goes on to the (failing) hash check
+        self.assertEqual((await self.request(middleware, '10.9.0.2')).status_code, 403)
+        self.assertEqual((await self.request(middleware, '10.9.0.2')).status_code, 429)
+
+    async def test_verification_runs_on_executor(self):
+        """Test that verify_ip runs on the verification pool, concurrently and consistently"""
+        middleware = self.make_middleware()
+        threads = set()
+        verify_ip = middleware.firewall_engine.verify_ip
+
+        def recording_verify_ip(*args):
+            threads.add(threading.current_thread().name)
+            return verify_ip(*args)
+
+        with mock.patch.object(middleware.firewall_engine, 'verify_ip', side_effect=recording_verify_ip):
+            responses = await asyncio.gather(*[
+                self.request(middleware, ip) for ip in ['10.9.0.1', '10.9.0.2'] * 8
+            ])
+
+        self.assertEqual([r.status_code for r in responses], [200, 403] * 8)
+        self.assertTrue(threads)
+        self.assertTrue(all(name.startswith('collatz-verify') for name in threads))
+
+    async def test_fresh_snapshots_need_no_database(self):
+        """Test that with fresh snapshots the decision code makes no sync database call"""
+        middleware = self.make_middleware()
+        await sync_to_async(middleware.whitelist.ensure_fresh)()
+        await sync_to_async(middleware.rules.ensure_fresh)()
+
+        # Any ORM call left on the event loop would raise SynchronousOnlyOperation;
+        # sync_to_async must not be needed either
+        with mock.patch.object(firewall_middleware, 'sync_to_async',
+                               side_effect=AssertionError('unexpected refresh')):
+            response = await self.request(middleware, '10.9.0.3')
+
+        self.assertEqual(response.status_code, 403)
+
+
+@override_settings(**FIREWALL_SETTINGS)
+class TestAsyncSnapshotRefresh(AsyncMiddlewareMixin, TransactionTestCase):
+    """Test cases for snapshot refreshes of AsyncCollatzFirewallMiddleware with committed data"""
+
+    async def test_first_load_through_sync_to_async(self):
+        """Test that the first load is awaited and later changes load in the background"""
+        middleware = self.make_middleware()
+        entry = await sync_to_async(whitelist_ip)('10.11.0.1')
+
+        with mock.patch.object(firewall_middleware, 'sync_to_async', wraps=sync_to_async) as wrapped:
+            self.assertEqual((await self.request(middleware, '10.11.0.1')).status_code, 200)
+
+        refreshed = [call.args[0] for call in wrapped.call_args_list]
+        self.assertIn(middleware.whitelist.ensure_fresh, refreshed)
+        self.assertIn(middleware.rules.ensure_fresh, refreshed)
+
+        # The request that sees the change starts the refresh without waiting for it
+        await sync_to_async(entry.deactivate)()
+        await self.request(middleware, '10.11.0.1')
+        await self.refreshed(middleware)
+        self.assertEqual((await self.request(middleware, '10.11.0.1')).status_code, 403)
+
+        await FirewallRule.objects.acreate(name='allow-net', rule_type=FirewallRule.RULE_TYPE_ALLOW,
+                                           ip_range='10.11.0.0/24')
+        await self.request(middleware, '10.11.0.1')
+        await self.refreshed(middleware)
+        self.assertEqual((await self.request(middleware, '10.11.0.1')).status_code, 200)
+        self.assertEqual(middleware.whitelist.get_stats()['refreshes'], 2)
+        self.assertEqual(middleware.rules.get_stats()['refreshes'], 2)
+
+    async def test_requests_do_not_wait_for_refresh(self):
+        """Test that a slow refresh runs once while concurrent requests use the current copy"""
+        middleware = self.make_middleware()
+        await sync_to_async(whitelist_ip)('10.12.0.1')
+        self.assertEqual((await self.request(middleware, '10.12.0.1')).status_code, 200)
+
+        release = threading.Event()
+        refresh = middleware.whitelist.refresh
+
+        def slow_refresh():
+            release.wait(10)
+            refresh()
+
+        await sync_to_async(whitelist_ip)('10.12.0.2')
+        with mock.patch.object(middleware.whitelist, 'refresh', side_effect=slow_refresh):
+            responses = await asyncio.wait_for(asyncio.gather(*[
+                self.request(middleware, ip) for ip in ['10.12.0.1', '10.12.0.2'] * 4
+            ]), timeout=5)
+            self.assertEqual([r.status_code for r in responses], [200, 403] * 4)
+            self.assertEqual(len(middleware._refreshing), 1)
+            release.set()
+            await self.refreshed(middleware)
+
+        self.assertEqual(middleware.whitelist.get_stats()['refreshes'], 2)
+        self.assertEqual((await self.request(middleware, '10.12.0.2')).status_code, 200)
+
+    async def test_failed_refresh_is_retried(self):
+        """Test that a failed background refresh keeps the old copy and is retried"""
+        middleware = self.make_middleware()
+        await sync_to_async(whitelist_ip)('10.13.0.1')
+        await self.request(middleware, '10.13.0.1')
+        await sync_to_async(whitelist_ip)('10.13.0.2')
+
+        release = threading.Event()
+
+        def failing_loader():
+            release.wait(10)
+            raise RuntimeError('db down')
+
+        with mock.patch.object(middleware.whitelist, 'loader', side_effect=failing_loader):
+            with self.assertLogs(firewall_middleware.logger, 'ERROR'):
+                self.assertEqual((await self.request(middleware, '10.13.0.2')).status_code, 403)
+                future = middleware._refreshing[middleware.whitelist]
+                release.set()
+                with self.assertRaises(RuntimeError):
+                    await future
+                await asyncio.sleep(0)
+
+        self.assertEqual(middleware._refreshing, {})
+        await self.request(middleware, '10.13.0.2')
+        await self.refreshed(middleware)
+        self.assertEqual((await self.request(middleware, '10.13.0.2')).status_code, 200)
@@ -0,0 +1,133 @@
+"""
+Unit tests for the asynchronous batch writer
+Tests batching, flushing, overflow policies and shutdown.
+"""
+
+import threading
+import unittest
+
+from firewall_gateway.core.batch_writer import AsyncBatchWriter
+
+
+class TestAsyncBatchWriter(unittest.TestCase):
+    """Test cases for AsyncBatchWriter"""
+
+    def setUp(self):
+        """Set up a writer that records its batches"""
+        self.batches = []
+        self.release = threading.Event()
+        self.release.set()
+
+    def write(self, batch):
+        self.release.wait(5)
+        self.batches.append(list(batch))
+
+    def make_writer(self, **kwargs):
+        writer = AsyncBatchWriter(self.write, **kwargs)
+        self.addCleanup(self.release.set)
+        self.addCleanup(writer.close)
+        return writer
+
+    def test_flush_writes_everything_in_order(self):
+        """Test that flush waits for every submitted item"""
+        writer = self.make_writer(batch_size=4, flush_interval=0.05)
+        for i in range(10):
+            self.assertTrue(writer.submit(i))
+        writer.flush()
+
+        self.assertEqual([i for batch in self.batches for i in batch], list(range(10)))
+        self.assertTrue(all(len(batch) <= 4 for batch in self.batches))
+        self.assertEqual(writer.get_stats()['written'], 10)
+
+    def test_partial_batch_written_after_interval(self):
+        """Test that a partial batch does not wait for batch_size"""
+        writer = self.make_writer(batch_size=1000, flush_interval=0.01)
+        writer.submit('a')
+        writer.flush()
+        self.assertEqual(self.batches, [['a']])
+
+    def test_drop_policy(self):
+        """Test that overflowing items are dropped and counted"""
+        self.release.clear()
+        writer = self.make_writer(batch_size=1, max_queue=2, overflow='drop')
+        results = [writer.submit(i) for i in range(6)]
+        self.release.set()
+        writer.flush()
+
+        stats = writer.get_stats()
+        self.assertIn(False, results)
+        self.assertEqual(stats['dropped'], results.count(False))
+        self.assertEqual(stats['written'], results.count(True))
+
+    def test_sample_policy(self):
+        """Test that only every sample_every-th item is kept once half full"""
+        self.release.clear()
+        writer = self.make_writer(batch_size=1, max_queue=100, overflow='sample', sample_every=5)
+        for i in range(200):
+            writer.submit(i)
+        self.release.set()
+        writer.flush()
+
+        stats = writer.get_stats()
+        self.assertGreater(stats['sampled_out'], 0)
+        self.assertEqual(stats['submitted'] + stats['sampled_out'] + stats['dropped'], 200)
+        self.assertLessEqual(stats['written'], 100)
+
+    def test_block_policy(self):
+        """Test that a full queue makes submit wait instead of dropping"""
+        writer = self.make_writer(batch_size=2, max_queue=1, overflow='block', flush_interval=0.01)
+        for i in range(20):
+            self.assertTrue(writer.submit(i))
+        writer.flush()
+        self.assertEqual(writer.get_stats()['written'], 20)
+
+    def test_failed_batch_does_not_stop_writer(self):
+        """Test that a write error is counted and later items are still written"""
+        calls = []
+
+        def flaky(batch):
+            calls.append(batch)
+            if len(calls) == 1:
+                raise RuntimeError("database is locked")
+
+        writer = AsyncBatchWriter(flaky, batch_size=1, flush_interval=0.01)
+        self.addCleanup(writer.close)
+        with self.assertLogs('firewall_gateway.core.batch_writer', level='ERROR'):
+            writer.submit('first')
+            writer.flush()
+        writer.submit('second')
+        writer.flush()
+
+        stats = writer.get_stats()
+        self.assertEqual((stats['failed'], stats['written']), (1, 1))
+
+    def test_close_writes_queued_items(self):
+        """Test that close drains the queue before stopping"""
+        writer = AsyncBatchWriter(self.write, batch_size=100, flush_interval=0.01)
+        for i in range(5):
+            writer.submit(i)
+        writer.close()
+
+        self.assertEqual(sum(len(batch) for batch in self.batches), 5)
+
+    def test_submit_after_close_drops(self):
+        """Test that a closed writer drops and counts items instead of raising"""
+        for overflow in AsyncBatchWriter.OVERFLOW_POLICIES:
+            writer = AsyncBatchWriter(self.write, flush_interval=0.01, overflow=overflow)
+            writer.submit(1)
+            writer.close()
+
+            self.assertFalse(writer.submit(2))
+            stats = writer.get_stats()
+            self.assertEqual((stats['written'], stats['dropped'], stats['queued']), (1, 1, 0))
+
+    def test_invalid_configuration(self):
+        """Test constructor validation"""
+        for kwargs in ({'batch_size': 0}, {'flush_interval': 0}, {'max_queue': 0},
+                       {'overflow': 'spill'}, {'sample_every': 0}):
+            with self.assertRaises(ValueError):
+                AsyncBatchWriter(self.write, **kwargs)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -4,7 +4,12 @@ Tests IP to Collatz sequence conversion and validation.
 """
 
 import unittest
-from firewall_gateway.core.collatz_converter import CollatzConverter, CollatzResult
+from unittest import mock
+from firewall_gateway.core import collatz_converter
+from firewall_gateway.core.collatz_converter import (
+    CollatzConverter, CollatzResult, TrajectoryStats
+)
+from firewall_gateway.core.trajectory_cache import TrajectoryCache
 
 
 class TestCollatzConverter(unittest.TestCase):
@@ -107,6 +112,27 @@ class TestCollatzConverter(unittest.TestCase):
         # Each number = 8 bytes
         self.assertEqual(len(result), 24)
 
+    def test_sequence_to_bytes_big_endian(self):
+        """Test 64-bit big-endian layout of serialized numbers"""
+        sequence = [1, 2**32 + 5, 2**64 - 1]
+        expected = b''.join(num.to_bytes(8, byteorder='big') for num in sequence)
+        self.assertEqual(self.converter.sequence_to_bytes(sequence), expected)
+
+    def test_sequence_to_buffer_is_flat_view(self):
+        """Test that the buffer variant exposes a byte-level memoryview"""
+        sequence, _, _ = self.converter.generate_collatz_sequence(27)
+        buffer = self.converter.sequence_to_buffer(sequence)
+
+        self.assertIsInstance(buffer, memoryview)
+        self.assertEqual(buffer.format, 'B')
+        self.assertEqual(buffer.nbytes, len(sequence) * 8)
+        self.assertEqual(buffer.tobytes(), self.converter.sequence_to_bytes(sequence))
+
+    def test_sequence_to_bytes_overflow(self):
+        """Test that numbers beyond 64 bits are rejected"""
+        with self.assertRaises(OverflowError):
+            self.converter.sequence_to_bytes([2**64])
+
     def test_convert_ip_to_collatz_complete(self):
         """Test complete IP to Collatz conversion"""
         ip = '192.168.1.100'
@@ -117,7 +143,8 @@ class TestCollatzConverter(unittest.TestCase):
         self.assertEqual(result.ip_integer, 3232235876)
         self.assertGreater(result.sequence_length, 0)
         self.assertEqual(result.sequence[-1], 1)
-        self.assertIsInstance(result.trajectory_bytes, bytes)
+        self.assertIsInstance(result.trajectory_bytes, memoryview)
+        self.assertEqual(result.trajectory_bytes.nbytes, result.sequence_length * 8)
 
     def test_collatz_result_repr(self):
         """Test CollatzResult string representation"""
@@ -163,5 +190,182 @@ class TestCollatzConverter(unittest.TestCase):
             self.converter.generate_collatz_sequence(-5)
 
 
+    def assert_batch_matches_scalar(self, values, max_length=CollatzConverter.MAX_SEQUENCE_LENGTH):
+        batch = self.converter.generate_collatz_batch(values, max_length)
+        self.assertEqual(len(batch), len(values))
+        for n, (trajectory_bytes, steps, max_val) in zip(values, batch):
+            sequence, expected_steps, expected_max = self.converter.generate_collatz_sequence(
+                n, max_length
+            )
+            self.assertEqual(trajectory_bytes, self.converter.sequence_to_bytes(sequence))
+            self.assertEqual(steps, expected_steps)
+            self.assertEqual(max_val, expected_max)
+
+    def test_collatz_batch_matches_scalar(self):
+        """Test that lockstep batch generation matches the scalar walk"""
+        values = [1, 2, 3, 7, 27, 97, 3232235876, 167772161, 2**32 - 1]
+        self.assert_batch_matches_scalar(values)
+
+    def test_collatz_batch_max_length(self):
+        """Test that batch generation honours max_length"""
+        self.assert_batch_matches_scalar([27, 3232235876, 1], max_length=10)
+
+    def test_collatz_batch_overflow_lane(self):
+        """Test that lanes overflowing uint64 behave like the scalar walk"""
+        # 3n+1 leaves the 64-bit range, which the serializer cannot encode
+        with self.assertRaises(OverflowError):
+            self.converter.sequence_to_bytes(
+                self.converter.generate_collatz_sequence(2**63 + 1, 50)[0]
+            )
+        with self.assertRaises(OverflowError):
+            self.converter.generate_collatz_batch([2**63 + 1, 27], max_length=50)
+        # Large even starts shrink and stay in range
+        self.assert_batch_matches_scalar([2**63, 27], max_length=50)
+
+    def test_collatz_batch_without_numpy(self):
+        """Test the pure-Python fallback of batch generation"""
+        with mock.patch.object(collatz_converter, '_NUMPY_ENABLED', False):
+            self.assert_batch_matches_scalar([3, 27, 3232235876])
+
+    def test_collatz_batch_rejects_non_positive(self):
+        """Test that batch generation rejects zero"""
+        with self.assertRaises(ValueError):
+            self.converter.generate_collatz_batch([5, 0])
+
+    def test_collatz_batch_empty(self):
+        """Test batch generation with no values"""
+        self.assertEqual(self.converter.generate_collatz_batch([]), [])
+
+    def assert_stream_matches_sequence(self, n, chunk_words, max_length=CollatzConverter.MAX_SEQUENCE_LENGTH):
+        """Check streamed chunks and stats against the materialized sequence"""
+        stats = TrajectoryStats()
+        chunks = [bytes(chunk) for chunk in self.converter.iter_trajectory_chunks(
+            n, stats, chunk_words=chunk_words, max_length=max_length
+        )]
+        sequence, steps, max_val = self.converter.generate_collatz_sequence(n, max_length)
+
+        self.assertEqual(b''.join(chunks), self.converter.sequence_to_bytes(sequence))
+        self.assertTrue(all(len(chunk) <= chunk_words * 8 for chunk in chunks))
+        self.assertEqual(stats.sequence_length, len(sequence))
+        self.assertEqual(stats.steps_to_one, steps)
+        self.assertEqual(stats.max_value, max_val)
+
+    def test_stream_matches_sequence(self):
+        """Test that streamed chunks concatenate to the serialized sequence"""
+        for n in [1, 2, 27, 3232235876]:
+            for chunk_words in [1, 7, 111, CollatzConverter.STREAM_CHUNK_WORDS]:
+                self.assert_stream_matches_sequence(n, chunk_words)
+
+    def test_stream_max_length(self):
+        """Test that streaming honours max_length"""
+        self.assert_stream_matches_sequence(27, chunk_words=4, max_length=10)
+
+    def test_stream_rejects_non_positive(self):
+        """Test that streaming rejects zero"""
+        with self.assertRaises(ValueError):
+            list(self.converter.iter_trajectory_chunks(0))
+
+    def test_stream_validates_eagerly(self):
+        """Test that streaming rejects zero before any chunk is requested"""
+        with self.assertRaises(ValueError):
+            self.converter.iter_trajectory_chunks(0)
+
+    def test_trajectory_length(self):
+        """Test that the counted length matches the materialized sequence"""
+        for n in [1, 2, 27, 3232235876]:
+            sequence, _, _ = self.converter.generate_collatz_sequence(n)
+            self.assertEqual(self.converter.trajectory_length(n), len(sequence))
+        self.assertEqual(self.converter.trajectory_length(27, max_length=10), 10)
+        with self.assertRaises(ValueError):
+            self.converter.trajectory_length(0)
+
+
+class TestTrajectoryCache(unittest.TestCase):
+    """Test cases for the cached trajectory path of CollatzConverter"""
+
+    def setUp(self):
+        """Install a fresh cache for each test"""
+        self.original_cache = CollatzConverter.trajectory_cache
+        CollatzConverter.trajectory_cache = TrajectoryCache()
+        self.converter = CollatzConverter()
+
+    def tearDown(self):
+        CollatzConverter.trajectory_cache = self.original_cache
+
+    def assert_matches_uncached(self, ip, max_length=CollatzConverter.MAX_SEQUENCE_LENGTH):
+        result = self.converter.convert_ip_to_collatz(ip, max_length)
+        sequence, steps, max_val = self.converter.generate_collatz_sequence(
+            self.converter.ip_to_integer(ip), max_length
+        )
+        self.assertEqual(list(result.sequence), sequence)
+        self.assertEqual(result.steps_to_one, steps)
+        self.assertEqual(result.max_value, max_val)
+        self.assertEqual(result.trajectory_bytes, self.converter.sequence_to_bytes(sequence))
+
+    def test_cached_result_matches_uncached(self):
+        """Test that cached conversions are identical to a fresh walk"""
+        for ip in ['192.168.1.100', '10.0.0.1', '0.0.0.1', '0.0.0.27', '255.255.255.255']:
+            self.assert_matches_uncached(ip)
+            self.assert_matches_uncached(ip)  # Second call is a cache hit
+
+    def test_cache_hit_counted(self):
+        """Test that repeated conversions hit the cache"""
+        self.converter.convert_ip_to_collatz('192.168.1.100')
+        self.converter.convert_ip_to_collatz('192.168.1.100')
+        stats = self.converter.get_cache_stats()
+        self.assertEqual(stats['hits'], 1)
+        self.assertEqual(stats['entries'], 1)
+
+    def test_cache_hit_shares_entry(self):
+        """Test that a cache hit hands out the cached sequence and a read-only view, uncopied"""
+        first = self.converter.convert_ip_to_collatz('192.168.1.100')
+        second = self.converter.convert_ip_to_collatz('192.168.1.100')
+
+        self.assertIs(second.sequence, first.sequence)
+        self.assertIs(second.trajectory_bytes, first.trajectory_bytes)
+        self.assertTrue(second.trajectory_bytes.readonly)
+
+    def test_suffix_reuse(self):
+        """Test that a trajectory passing through a cached value reuses its tail"""
+        # 0.0.0.54 -> 27 -> ... so the tail of 27 is shared
+        self.assert_matches_uncached('0.0.0.27')
+        self.assert_matches_uncached('0.0.0.54')
+        self.assertGreaterEqual(self.converter.get_cache_stats()['suffix_hits'], 1)
+
+    def test_truncated_conversion_matches(self):
+        """Test that max_sequence_length is honoured on cached trajectories"""
+        self.converter.convert_ip_to_collatz('192.168.1.100')
+        self.assert_matches_uncached('192.168.1.100', max_length=10)
+
+    def test_entry_limit_evicts_lru(self):
+        """Test LRU eviction when the entry limit is reached"""
+        CollatzConverter.trajectory_cache = TrajectoryCache(max_entries=2)
+        for ip in ['10.0.0.1', '10.0.0.2', '10.0.0.3']:
+            self.converter.convert_ip_to_collatz(ip)
+        stats = self.converter.get_cache_stats()
+        self.assertEqual(stats['entries'], 2)
+        self.assertEqual(stats['evictions'], 1)
+        self.assert_matches_uncached('10.0.0.1')
+
+    def test_memory_budget_respected(self):
+        """Test that the estimated footprint stays within the budget"""
+        budget = 200 * TrajectoryCache.BYTES_PER_STEP
+        CollatzConverter.trajectory_cache = TrajectoryCache(max_bytes=budget)
+        for last_octet in range(1, 20):
+            self.assert_matches_uncached(f'10.1.2.{last_octet}')
+        self.assertLessEqual(self.converter.get_cache_stats()['estimated_bytes'], budget)
+
+    def test_zero_ip_still_invalid(self):
+        """Test that 0.0.0.0 is rejected with the cache enabled"""
+        with self.assertRaises(ValueError):
+            self.converter.convert_ip_to_collatz('0.0.0.0')
+
+    def test_cache_disabled(self):
+        """Test conversion with caching turned off"""
+        CollatzConverter.trajectory_cache = None
+        self.assert_matches_uncached('192.168.1.100')
+        self.assertEqual(self.converter.get_cache_stats(), {'enabled': False})
+
+
 if __name__ == '__main__':
     unittest.main()
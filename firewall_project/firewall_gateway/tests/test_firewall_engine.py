@@ -3,10 +3,14 @@ Unit tests for Firewall Engine
 Tests IP registration, verification, and access control logic.
 """
 
+import os
+import tempfile
 import unittest
+from unittest import mock
 from firewall_gateway.core.firewall_engine import (
     FirewallEngine, VerificationStatus, VerificationResult, RegistrationResult
 )
+from firewall_gateway.core.verification_cache import bump_whitelist_version
 
 
 class TestFirewallEngine(unittest.TestCase):
@@ -172,5 +176,229 @@ class TestFirewallEngine(unittest.TestCase):
         self.assertIn('allowed', repr_str)
 
 
+    def test_hash_accepts_memoryview(self):
+        """Test that hashing a trajectory view equals hashing its bytes"""
+        converter = self.engine.collatz_converter
+        sequence, _, _ = converter.generate_collatz_sequence(3232235876)
+        integrator = self.engine.hash_integrator
+
+        from_view = integrator.hash_collatz_sequence(converter.sequence_to_buffer(sequence))
+        from_bytes = integrator.hash_collatz_sequence(converter.sequence_to_bytes(sequence))
+
+        self.assertEqual(from_view.hash_value, from_bytes.hash_value)
+        self.assertEqual(from_view.input_hash, from_bytes.input_hash)
+
+    def test_hash_stream_matches_sequence(self):
+        """Test that hashing streamed chunks equals hashing the whole trajectory"""
+        converter = self.engine.collatz_converter
+        integrator = self.engine.hash_integrator
+        n = 3232235876
+        sequence, _, _ = converter.generate_collatz_sequence(n)
+
+        streamed = integrator.hash_collatz_stream(converter.iter_trajectory_chunks(n, chunk_words=5))
+        whole = integrator.hash_collatz_sequence(converter.sequence_to_bytes(sequence))
+
+        self.assertEqual(streamed.hash_value, whole.hash_value)
+        self.assertEqual(streamed.input_hash, whole.input_hash)
+
+    def test_hash_file_matches_compute_hash(self):
+        """Test that hashing a file in chunks equals hashing its contents"""
+        integrator = self.engine.hash_integrator
+        data = bytes(range(256)) * 40
+        with tempfile.NamedTemporaryFile(delete=False) as f:
+            f.write(data)
+        try:
+            result = integrator.hash_file(f.name, chunk_size=1000)
+        finally:
+            os.unlink(f.name)
+
+        self.assertEqual(result.hash_value, integrator.compute_hash(data))
+        self.assertEqual(result.input_hash, data[:16].hex() + "...")
+
+    def test_streaming_engine_matches(self):
+        """Test that a streaming engine registers and verifies identically"""
+        streaming = FirewallEngine(streaming=True)
+        for ip in ['192.168.1.1', '10.0.0.1', '255.255.255.255']:
+            reg = self.engine.register_ip(ip)
+            streamed = streaming.register_ip(ip)
+            self.assertEqual(streamed.collatz_hash, reg.collatz_hash)
+            self.assertEqual(streamed.sequence_length, reg.sequence_length)
+
+            verify = streaming.verify_ip(ip, reg.collatz_hash)
+            self.assertEqual(verify.status, VerificationStatus.ALLOWED)
+            self.assertEqual(verify.details, self.engine.verify_ip(ip, reg.collatz_hash).details)
+
+        self.assertFalse(streaming.register_ip('0.0.0.0').success)
+
+    def test_streaming_zero_ip_is_invalid(self):
+        """Test that 0.0.0.0 is INVALID_IP, not INTERNAL_ERROR, when streaming"""
+        streaming = FirewallEngine(streaming=True)
+
+        result = streaming.verify_ip('0.0.0.0', 'a' * 64)
+
+        self.assertEqual(result.status, VerificationStatus.INVALID_IP)
+
+    def test_streaming_declares_length(self):
+        """Test that the streaming hasher folds chunks instead of buffering them"""
+        streaming = FirewallEngine(streaming=True)
+        integrator = streaming.hash_integrator
+        hashers = []
+        new_hasher = integrator.new_hasher
+
+        def tracking_new_hasher(length=None):
+            hasher = new_hasher(length)
+            hashers.append(hasher)
+            return hasher
+
+        with mock.patch.object(integrator, 'new_hasher', side_effect=tracking_new_hasher):
+            streamed = streaming.register_ip('192.168.1.1')
+
+        self.assertEqual(streamed.collatz_hash, self.engine.register_ip('192.168.1.1').collatz_hash)
+        self.assertEqual(len(hashers), 1)
+        self.assertEqual(hashers[0]._length, 8 * streamed.sequence_length)
+        self.assertIsNone(hashers[0]._buffer)
+
+    def test_register_many_matches_register_ip(self):
+        """Test that batched registration produces the same hashes"""
+        ips = ['192.168.1.1', '10.0.0.1', '0.0.0.1', '255.255.255.255']
+        results = self.engine.register_many(ips, batch_size=3)
+
+        self.assertEqual([r.ip_address for r in results], ips)
+        for result in results:
+            single = self.engine.register_ip(result.ip_address)
+            self.assertTrue(result.success)
+            self.assertEqual(result.collatz_hash, single.collatz_hash)
+            self.assertEqual(result.sequence_length, single.sequence_length)
+
+    def test_register_many_invalid(self):
+        """Test that invalid IPs fail individually in a batch"""
+        results = self.engine.register_many(['10.0.0.1', '999.1.1.1', '0.0.0.0'])
+
+        self.assertTrue(results[0].success)
+        self.assertFalse(results[1].success)
+        self.assertFalse(results[2].success)
+        self.assertIsNotNone(results[1].error_message)
+
+    def test_verify_many_matches_verify_ip(self):
+        """Test that batched verification matches per-IP verification"""
+        registered = {ip: self.engine.register_ip(ip).collatz_hash
+                      for ip in ['192.168.1.1', '10.0.0.1', '172.16.0.1']}
+        pairs = [
+            ('192.168.1.1', registered['192.168.1.1']),
+            ('10.0.0.1', registered['192.168.1.1']),    # Wrong hash
+            ('not.an.ip', 'somehash'),
+            ('172.16.0.1', registered['172.16.0.1'].upper()),
+        ]
+        results = self.engine.verify_many(pairs, batch_size=2)
+
+        self.assertEqual(len(results), len(pairs))
+        for (ip, expected_hash), result in zip(pairs, results):
+            single = self.engine.verify_ip(ip, expected_hash)
+            self.assertEqual(result.ip_address, ip)
+            self.assertEqual(result.status, single.status)
+            self.assertEqual(result.hash_value, single.hash_value)
+            self.assertEqual(result.sequence_length, single.sequence_length)
+            self.assertEqual(result.details, single.details)
+
+    def test_verify_many_empty(self):
+        """Test batched verification with no input"""
+        self.assertEqual(self.engine.verify_many([]), [])
+
+
+class TestVerificationCache(unittest.TestCase):
+    """Test cases for the verification decision cache"""
+
+    def setUp(self):
+        """Set up a cache-enabled engine"""
+        self.engine = FirewallEngine(cache_enabled=True, cache_ttl=60, cache_max_entries=2)
+        self.ip = '10.0.0.1'
+        self.stored_hash = self.engine.register_ip(self.ip).collatz_hash
+
+    def cache_stats(self):
+        return self.engine.get_engine_info()['verification_cache']
+
+    def test_repeat_verification_hits_cache(self):
+        """Test that the second verification is served from cache"""
+        first = self.engine.verify_ip(self.ip, self.stored_hash)
+        with mock.patch.object(self.engine.hash_integrator, 'hash_collatz_sequence') as hasher:
+            second = self.engine.verify_ip(self.ip, self.stored_hash)
+            hasher.assert_not_called()
+
+        self.assertEqual(second.status, first.status)
+        self.assertEqual(second.hash_value, first.hash_value)
+        self.assertTrue(second.details['cache_hit'])
+        self.assertNotIn('cache_hit', first.details)
+        self.assertEqual(self.cache_stats()['hits'], 1)
+        self.assertEqual(self.cache_stats()['misses'], 1)
+
+    def test_blocked_decision_cached(self):
+        """Test that hash mismatches are cached too"""
+        self.engine.verify_ip(self.ip, 'deadbeef')
+        result = self.engine.verify_ip(self.ip, 'DEADBEEF')
+        self.assertEqual(result.status, VerificationStatus.BLOCKED)
+        self.assertEqual(self.cache_stats()['hits'], 1)
+
+    def test_invalid_ip_not_cached(self):
+        """Test that errors are never cached"""
+        self.engine.verify_ip('invalid.ip', 'somehash')
+        self.engine.verify_ip('invalid.ip', 'somehash')
+        self.assertEqual(self.cache_stats()['entries'], 0)
+
+    def test_whitelist_change_invalidates(self):
+        """Test that a whitelist version bump invalidates cached decisions"""
+        self.engine.verify_ip(self.ip, self.stored_hash)
+        bump_whitelist_version()
+        result = self.engine.verify_ip(self.ip, self.stored_hash)
+
+        self.assertNotIn('cache_hit', result.details)
+        self.assertEqual(self.cache_stats()['invalidations'], 1)
+
+    def test_ttl_expiry(self):
+        """Test that decisions expire after the TTL"""
+        self.engine.verify_ip(self.ip, self.stored_hash)
+        with mock.patch('firewall_gateway.core.verification_cache.time.monotonic',
+                        return_value=10**9):
+            result = self.engine.verify_ip(self.ip, self.stored_hash)
+
+        self.assertNotIn('cache_hit', result.details)
+        self.assertEqual(self.cache_stats()['expirations'], 1)
+
+    def test_cache_is_bounded(self):
+        """Test that the cache evicts beyond max entries"""
+        for ip in ['10.0.0.1', '10.0.0.2', '10.0.0.3']:
+            self.engine.verify_ip(ip, 'deadbeef')
+        self.assertEqual(self.cache_stats()['entries'], 2)
+        self.assertEqual(self.cache_stats()['evictions'], 1)
+
+    def test_verify_many_uses_cache(self):
+        """Test that batched verification reads and fills the cache"""
+        self.engine.verify_ip(self.ip, self.stored_hash)
+        results = self.engine.verify_many([(self.ip, self.stored_hash), ('10.0.0.2', 'deadbeef')])
+
+        self.assertTrue(results[0].details['cache_hit'])
+        self.assertEqual(results[1].status, VerificationStatus.BLOCKED)
+        self.assertEqual(self.cache_stats()['entries'], 2)
+
+    def test_cache_disabled_by_default(self):
+        """Test that the default engine does not cache"""
+        info = FirewallEngine().get_engine_info()
+        self.assertFalse(info['verification_cache']['enabled'])
+
+    def test_from_settings(self):
+        """Test configuration from settings attributes"""
+        settings = mock.Mock(
+            COLLATZ_FIREWALL_CACHE_ENABLED=True,
+            COLLATZ_FIREWALL_CACHE_TTL=42,
+            COLLATZ_FIREWALL_CACHE_MAX_ENTRIES=7,
+            COLLATZ_FIREWALL_STREAMING=True,
+        )
+        engine_info = FirewallEngine.from_settings(settings).get_engine_info()
+        self.assertTrue(engine_info['streaming'])
+        info = engine_info['verification_cache']
+        self.assertTrue(info['enabled'])
+        self.assertEqual(info['ttl_seconds'], 42)
+        self.assertEqual(info['max_entries'], 7)
+
+
 if __name__ == '__main__':
     unittest.main()
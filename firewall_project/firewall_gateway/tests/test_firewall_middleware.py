@@ -0,0 +1,225 @@
+"""
+Integration tests for the Collatz firewall middleware
+Tests whitelist snapshot refreshes and firewall rule enforcement in the
+request path against a real database.
+"""
+
+from django.http import HttpResponse
+from django.test import RequestFactory, TestCase, override_settings
+
+from firewall_gateway.core.firewall_engine import FirewallEngine
+from firewall_gateway.core.verification_cache import get_whitelist_version
+from firewall_gateway.middleware.firewall_middleware import CollatzFirewallMiddleware
+from firewall_gateway.models.firewall_models import AccessLog, FirewallRule, IPWhitelist
+
+# Synchronous logging and access counts, so rows exist when the request returns
+FIREWALL_SETTINGS = dict(
+    COLLATZ_FIREWALL_ENABLED=True,
+    COLLATZ_FIREWALL_ENFORCE=True,
+    COLLATZ_FIREWALL_LOG_ALL=True,
+    COLLATZ_FIREWALL_LOG_ASYNC=False,
+    COLLATZ_FIREWALL_ACCESS_FLUSH_SECONDS=0,
+    COLLATZ_FIREWALL_SNAPSHOT_REFRESH=3600,
+    COLLATZ_FIREWALL_RULES_ENABLED=True,
+    COLLATZ_FIREWALL_RATE_LIMIT_ENABLED=False,
+    COLLATZ_FIREWALL_SKIP_PATHS=['/health/'],
+)
+
+
+def whitelist_ip(ip_address: str, collatz_hash: str = None, **fields) -> IPWhitelist:
+    """Create a whitelist entry the way the registration API does."""
+    engine = FirewallEngine()
+    registration = engine.register_ip(ip_address)
+    return IPWhitelist.objects.create(
+        ip_address=ip_address,
+        ip_integer=engine.collatz_converter.ip_to_integer(ip_address),
+        collatz_hash=collatz_hash or registration.collatz_hash,
+        collatz_sequence_length=registration.sequence_length,
+        collatz_steps_to_one=registration.sequence_length - 1,
+        collatz_max_value=1,
+        **fields
+    )
+
+
+def ok_view(request):
+    return HttpResponse('ok')
+
+
+@override_settings(**FIREWALL_SETTINGS)
+class MiddlewareTestCase(TestCase):
+    """Builds middleware and requests inside the test's settings"""
+
+    middleware_class = CollatzFirewallMiddleware
+
+    def setUp(self):
+        self.factory = RequestFactory()
+
+    def make_middleware(self, **settings):
+        with override_settings(**settings):
+            return self.middleware_class(ok_view)
+
+    def request(self, middleware, ip_address: str, path: str = '/api/data/'):
+        return middleware(self.factory.get(path, REMOTE_ADDR=ip_address))
+
+
+class TestWhitelistSnapshotWiring(MiddlewareTestCase):
+    """Test cases for whitelist signals and the middleware's snapshot"""
+
+    def test_save_bumps_version(self):
+        """Test that creating or editing an entry bumps the whitelist version"""
+        version = get_whitelist_version()
+        entry = whitelist_ip('10.8.0.1')
+        self.assertGreater(get_whitelist_version(), version)
+
+        version = get_whitelist_version()
+        entry.deactivate()
+        self.assertGreater(get_whitelist_version(), version)
+
+    def test_delete_bumps_version(self):
+        """Test that deleting an entry bumps the whitelist version"""
+        entry = whitelist_ip('10.8.0.2')
+        version = get_whitelist_version()
+        entry.delete()
+        self.assertGreater(get_whitelist_version(), version)
+
+    def test_access_bookkeeping_keeps_version(self):
+        """Test that recording an access does not invalidate the snapshot"""
+        entry = whitelist_ip('10.8.0.3')
+        version = get_whitelist_version()
+        entry.access_count += 1
+        entry.save(update_fields=['access_count', 'last_verified'])
+        self.assertEqual(get_whitelist_version(), version)
+
+    def test_middleware_serves_new_entry(self):
+        """Test that an entry added after the first load is admitted at once"""
+        middleware = self.make_middleware()
+        self.assertEqual(self.request(middleware, '10.8.0.4').status_code, 403)
+
+        whitelist_ip('10.8.0.4')
+
+        self.assertEqual(self.request(middleware, '10.8.0.4').status_code, 200)
+        self.assertEqual(middleware.whitelist.get_stats()['refreshes'], 2)
+
+    def test_deactivated_entry_rejected(self):
+        """Test that a deactivated entry is rejected on the next request"""
+        entry = whitelist_ip('10.8.0.5')
+        middleware = self.make_middleware()
+        self.assertEqual(self.request(middleware, '10.8.0.5').status_code, 200)
+
+        entry.deactivate()
+
+        self.assertEqual(self.request(middleware, '10.8.0.5').status_code, 403)
+        blocked = AccessLog.objects.get(ip_address='10.8.0.5', status=AccessLog.STATUS_BLOCKED)
+        self.assertEqual(blocked.error_message, 'IP not in whitelist')
+
+    def test_deleted_entry_rejected(self):
+        """Test that a deleted entry is rejected on the next request"""
+        entry = whitelist_ip('10.8.0.6')
+        middleware = self.make_middleware()
+        self.assertEqual(self.request(middleware, '10.8.0.6').status_code, 200)
+
+        entry.delete()
+
+        self.assertEqual(self.request(middleware, '10.8.0.6').status_code, 403)
+
+    def test_rehashed_entry_rejected(self):
+        """Test that a changed stored hash is used on the next request"""
+        entry = whitelist_ip('10.8.0.7')
+        middleware = self.make_middleware()
+        self.assertEqual(self.request(middleware, '10.8.0.7').status_code, 200)
+
+        entry.collatz_hash = 'f' * 64
+        entry.save()
+
+        self.assertEqual(self.request(middleware, '10.8.0.7').status_code, 403)
+
+
+class TestFirewallRuleMiddleware(MiddlewareTestCase):
+    """Test cases for FirewallRule enforcement by CollatzFirewallMiddleware"""
+
+    def test_allow_rule_admits_without_whitelist(self):
+        """Test that an allow rule admits an IP that is not whitelisted"""
+        FirewallRule.objects.create(name='office', rule_type=FirewallRule.RULE_TYPE_ALLOW,
+                                    ip_range='10.1.0.0/16')
+        middleware = self.make_middleware()
+
+        response = self.request(middleware, '10.1.2.3')
+
+        self.assertEqual(response.status_code, 200)
+        log = AccessLog.objects.get(ip_address='10.1.2.3')
+        self.assertEqual(log.status, AccessLog.STATUS_ALLOWED)
+        self.assertIn('office', log.error_message)
+
+    def test_block_rule_denies_whitelisted_ip(self):
+        """Test that a block rule denies even a whitelisted IP"""
+        whitelist_ip('10.2.0.5')
+        FirewallRule.objects.create(name='quarantine', rule_type=FirewallRule.RULE_TYPE_BLOCK,
+                                    ip_range='10.2.0.0/24')
+        middleware = self.make_middleware()
+
+        response = self.request(middleware, '10.2.0.5')
+
+        self.assertEqual(response.status_code, 403)
+        self.assertEqual(AccessLog.objects.get(ip_address='10.2.0.5').status,
+                         AccessLog.STATUS_BLOCKED)
+
+    def test_no_rule_falls_back_to_whitelist(self):
+        """Test that an uncovered IP goes through the Collatz whitelist check"""
+        whitelist_ip('10.3.0.1')
+        FirewallRule.objects.create(name='other', rule_type=FirewallRule.RULE_TYPE_BLOCK,
+                                    ip_range='192.168.0.0/16')
+        middleware = self.make_middleware()
+
+        self.assertEqual(self.request(middleware, '10.3.0.1').status_code, 200)
+        self.assertEqual(self.request(middleware, '10.3.0.2').status_code, 403)
+
+    def test_rate_limit_rule_returns_429(self):
+        """Test that a rate_limit rule denies with 429 once its limit is exceeded"""
+        whitelist_ip('10.4.0.1')
+        FirewallRule.objects.create(name='throttle', rule_type=FirewallRule.RULE_TYPE_RATE_LIMIT,
+                                    ip_range='10.4.0.0/24', rate_limit_requests=2,
+                                    rate_limit_window_seconds=60)
+        middleware = self.make_middleware(COLLATZ_FIREWALL_RATE_LIMIT_ENABLED=True)
+
+        statuses = [self.request(middleware, '10.4.0.1').status_code for _ in range(3)]
+
+        self.assertEqual(statuses, [200, 200, 429])
+
+    def test_priority_order(self):
+        """Test that the higher-priority rule wins over a more specific one"""
+        FirewallRule.objects.create(name='block-net', rule_type=FirewallRule.RULE_TYPE_BLOCK,
+                                    ip_range='10.5.0.0/24', priority=10)
+        allow = FirewallRule.objects.create(name='allow-host', rule_type=FirewallRule.RULE_TYPE_ALLOW,
+                                            ip_range='10.5.0.7/32', priority=1)
+        middleware = self.make_middleware()
+        self.assertEqual(self.request(middleware, '10.5.0.7').status_code, 403)
+
+        allow.priority = 20
+        allow.save()
+        self.assertEqual(self.request(middleware, '10.5.0.7').status_code, 200)
+        self.assertEqual(self.request(middleware, '10.5.0.8').status_code, 403)
+
+    def test_disabled_rate_limiter_falls_through(self):
+        """Test that an unenforced rate_limit rule does not shadow a lower-priority block"""
+        whitelist_ip('10.6.0.1')
+        FirewallRule.objects.create(name='throttle', rule_type=FirewallRule.RULE_TYPE_RATE_LIMIT,
+                                    ip_range='10.6.0.0/24', priority=10, rate_limit_requests=100,
+                                    rate_limit_window_seconds=60)
+        FirewallRule.objects.create(name='block-net', rule_type=FirewallRule.RULE_TYPE_BLOCK,
+                                    ip_range='10.6.0.0/24', priority=1)
+        middleware = self.make_middleware(COLLATZ_FIREWALL_RATE_LIMIT_ENABLED=False)
+
+        response = self.request(middleware, '10.6.0.1')
+
+        self.assertEqual(response.status_code, 403)
+        self.assertIn('block-net', AccessLog.objects.get(ip_address='10.6.0.1').error_message)
+        self.assertEqual(len(middleware.rules), 1)
+
+    def test_rules_disabled(self):
+        """Test that COLLATZ_FIREWALL_RULES_ENABLED=False skips the rule check"""
+        whitelist_ip('10.7.0.1')
+        FirewallRule.objects.create(name='block-net', rule_type=FirewallRule.RULE_TYPE_BLOCK,
+                                    ip_range='10.7.0.0/24')
+        middleware = self.make_middleware(COLLATZ_FIREWALL_RULES_ENABLED=False)
+
+        self.assertEqual(self.request(middleware, '10.7.0.1').status_code, 200)
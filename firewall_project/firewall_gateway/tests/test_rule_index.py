@@ -0,0 +1,178 @@
+"""
+Unit tests for the compiled firewall rule index
+Tests CIDR matching, rule precedence, snapshot refreshes and rate limiting.
+"""
+
+import random
+import unittest
+from unittest import mock
+
+from firewall_gateway.core.collatz_converter import CollatzConverter
+from firewall_gateway.core.rule_index import (
+    CompiledRule, RateLimiter, RuleIndex, RuleSnapshot, bump_rule_version
+)
+
+
+def ip(address):
+    return CollatzConverter.ip_to_integer(address)
+
+
+def rule(pk, ip_range, rule_type='block', priority=0, **kwargs):
+    return CompiledRule.from_row(pk, f'rule-{pk}', rule_type, ip_range, priority, **kwargs)
+
+
+class TestCompiledRule(unittest.TestCase):
+    """Test cases for CompiledRule parsing"""
+
+    def test_cidr_and_single_ip(self):
+        """Test that networks are normalised and single IPs become /32"""
+        network = rule(1, '10.1.2.3/16')
+        self.assertEqual((network.network, network.prefix_len), (ip('10.1.0.0'), 16))
+        host = rule(2, ' 192.168.1.7 ')
+        self.assertEqual((host.network, host.prefix_len), (ip('192.168.1.7'), 32))
+
+    def test_contains(self):
+        """Test membership by ip_integer"""
+        self.assertIn(ip('10.1.255.255'), rule(1, '10.1.0.0/16'))
+        self.assertNotIn(ip('10.2.0.0'), rule(1, '10.1.0.0/16'))
+        self.assertIn(ip('8.8.8.8'), rule(2, '0.0.0.0/0'))
+
+    def test_invalid_range(self):
+        """Test that non-IPv4 ranges are rejected"""
+        for ip_range in ('10.0.0.0/33', 'not-an-ip', '2001:db8::/32'):
+            with self.assertRaises(ValueError):
+                rule(1, ip_range)
+
+
+class TestRuleIndex(unittest.TestCase):
+    """Test cases for RuleIndex"""
+
+    def test_longest_prefix_wins_at_equal_priority(self):
+        """Test that the most specific rule applies"""
+        index = RuleIndex([rule(1, '10.0.0.0/8', 'allow'), rule(2, '10.1.0.0/16', 'block'),
+                           rule(3, '10.1.2.3', 'allow')])
+        self.assertEqual(index.match(ip('10.9.9.9')).pk, 1)
+        self.assertEqual(index.match(ip('10.1.9.9')).pk, 2)
+        self.assertEqual(index.match(ip('10.1.2.3')).pk, 3)
+        self.assertIsNone(index.match(ip('11.0.0.0')))
+
+    def test_priority_beats_specificity(self):
+        """Test that a higher priority covering rule overrides narrower ones"""
+        index = RuleIndex([rule(1, '10.0.0.0/8', 'block', priority=10),
+                           rule(2, '10.1.0.0/16', 'allow')])
+        self.assertEqual(index.match(ip('10.1.0.1')).pk, 1)
+
+    def test_first_rule_wins_ties(self):
+        """Test that equal priority and prefix keep the given order"""
+        index = RuleIndex([rule(1, '10.0.0.0/8'), rule(2, '10.0.0.0/8')])
+        self.assertEqual(index.match(ip('10.0.0.1')).pk, 1)
+
+    def test_address_space_edges(self):
+        """Test the first and last IPv4 addresses"""
+        index = RuleIndex([rule(1, '0.0.0.0/32'), rule(2, '255.255.255.255/32')])
+        self.assertEqual(index.match(0).pk, 1)
+        self.assertEqual(index.match(2**32 - 1).pk, 2)
+        self.assertIsNone(index.match(1))
+
+    def test_empty_index(self):
+        """Test that nothing matches without rules"""
+        index = RuleIndex()
+        self.assertIsNone(index.match(ip('1.2.3.4')))
+        self.assertEqual(index.intervals, 1)
+
+    def test_matches_linear_scan(self):
+        """Test random rule sets against evaluating every rule"""
+        rng = random.Random(25)
+        for _ in range(20):
+            rules = []
+            for pk in range(rng.randint(1, 60)):
+                prefix_len = rng.randint(0, 32)
+                network = rng.getrandbits(32) if rng.random() < 0.5 else ip('10.0.0.0')
+                rules.append(rule(pk, f'{CollatzConverter.integer_to_ip(network)}/{prefix_len}',
+                                  priority=rng.randint(0, 3)))
+            index = RuleIndex(rules)
+            self.assertLessEqual(index.intervals, 2 * len(rules) + 1)
+
+            probes = [rng.getrandbits(32) for _ in range(200)]
+            probes += [r.network for r in rules] + [r.network + (1 << (32 - r.prefix_len)) - 1
+                                                    for r in rules]
+            for probe in probes:
+                expected = None
+                for candidate in rules:
+                    if probe in candidate and (
+                            expected is None
+                            or (candidate.priority, candidate.prefix_len)
+                            > (expected.priority, expected.prefix_len)):
+                        expected = candidate
+                self.assertIs(index.match(probe), expected)
+
+
+class TestRuleSnapshot(unittest.TestCase):
+    """Test cases for RuleSnapshot"""
+
+    def setUp(self):
+        """Set up a snapshot over in-memory rule rows"""
+        self.rows = [(1, 'office', 'allow', '10.0.0.0/8', 0, None, None)]
+        self.loader = mock.Mock(side_effect=lambda: list(self.rows))
+        self.snapshot = RuleSnapshot(self.loader, refresh_interval=60)
+
+    def test_lookup_builds_once(self):
+        """Test that repeated lookups do not rebuild"""
+        for _ in range(3):
+            self.assertEqual(self.snapshot.lookup(ip('10.0.0.1')).name, 'office')
+        self.assertEqual(self.loader.call_count, 1)
+
+    def test_version_bump_rebuilds(self):
+        """Test that a rule change in this process is seen immediately"""
+        self.snapshot.lookup(1)
+        self.rows = [(2, 'ban', 'block', '10.0.0.0/24', 0, None, None)]
+        bump_rule_version()
+        self.assertEqual(self.snapshot.lookup(ip('10.0.0.1')).name, 'ban')
+        self.assertIsNone(self.snapshot.lookup(ip('10.0.1.1')))
+
+    def test_get_does_not_refresh(self):
+        """Test that get() reads the current index only"""
+        self.assertIsNone(self.snapshot.get(ip('10.0.0.1')))
+        self.assertEqual(self.loader.call_count, 0)
+
+    def test_invalid_rows_are_skipped(self):
+        """Test that one bad ip_range does not disable the other rules"""
+        self.rows.append((2, 'v6', 'block', '2001:db8::/32', 5, None, None))
+        with self.assertLogs('firewall_gateway.core.rule_index', level='WARNING'):
+            self.assertEqual(self.snapshot.lookup(ip('10.0.0.1')).name, 'office')
+        self.assertEqual(self.snapshot.get_stats()['skipped_rules'], 1)
+
+
+class TestRateLimiter(unittest.TestCase):
+    """Test cases for RateLimiter"""
+
+    def test_limit_per_window(self):
+        """Test that requests over the limit are refused until the window ends"""
+        limiter = RateLimiter()
+        limited = rule(1, '10.0.0.0/8', 'rate_limit', rate_limit_requests=2,
+                       rate_limit_window_seconds=60)
+        with mock.patch('firewall_gateway.core.rule_index.time.monotonic', return_value=100.0):
+            self.assertEqual([limiter.allow(limited, '10.0.0.1') for _ in range(3)],
+                             [True, True, False])
+            self.assertTrue(limiter.allow(limited, '10.0.0.2'))
+        with mock.patch('firewall_gateway.core.rule_index.time.monotonic', return_value=161.0):
+            self.assertTrue(limiter.allow(limited, '10.0.0.1'))
+
+    def test_rule_without_limit(self):
+        """Test that a rate_limit rule without limits allows everything"""
+        limiter = RateLimiter()
+        self.assertTrue(all(limiter.allow(rule(1, '10.0.0.0/8', 'rate_limit'), '10.0.0.1')
+                            for _ in range(100)))
+
+    def test_pruning_bounds_memory(self):
+        """Test that expired windows are dropped when max_keys is reached"""
+        limiter = RateLimiter(max_keys=10)
+        limited = rule(1, '10.0.0.0/8', 'rate_limit', rate_limit_requests=5,
+                       rate_limit_window_seconds=1)
+        for i in range(50):
+            limiter.allow(limited, f'10.0.0.{i}')
+        self.assertLessEqual(len(limiter._windows), 10)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,92 @@
+"""
+Unit tests for the in-process whitelist snapshot
+Tests lookups, version- and interval-driven refreshes.
+"""
+
+import threading
+import unittest
+from unittest import mock
+
+from firewall_gateway.core.verification_cache import bump_whitelist_version
+from firewall_gateway.core.whitelist_snapshot import SnapshotEntry, WhitelistSnapshot
+
+
+class TestWhitelistSnapshot(unittest.TestCase):
+    """Test cases for WhitelistSnapshot"""
+
+    def setUp(self):
+        """Set up a snapshot over an in-memory table"""
+        self.rows = [(167772161, 1, 'aa11'), (3232235876, 2, 'bb22')]
+        self.loader = mock.Mock(side_effect=lambda: list(self.rows))
+        self.snapshot = WhitelistSnapshot(self.loader, refresh_interval=60)
+
+    def test_lookup(self):
+        """Test hits and misses by ip_integer"""
+        self.assertEqual(self.snapshot.lookup(167772161), SnapshotEntry(1, 'aa11'))
+        self.assertIsNone(self.snapshot.lookup(1))
+        self.assertEqual(len(self.snapshot), 2)
+
+    def test_loads_once(self):
+        """Test that repeated lookups do not reload"""
+        for _ in range(5):
+            self.snapshot.lookup(167772161)
+        self.assertEqual(self.loader.call_count, 1)
+        self.assertEqual(self.snapshot.get_stats()['lookups'], 5)
+
+    def test_version_bump_reloads(self):
+        """Test that a whitelist change in this process is seen immediately"""
+        self.snapshot.lookup(167772161)
+        self.rows = [(167772161, 1, 'cc33')]
+        bump_whitelist_version()
+
+        self.assertEqual(self.snapshot.lookup(167772161).collatz_hash, 'cc33')
+        self.assertIsNone(self.snapshot.lookup(3232235876))
+        self.assertEqual(self.loader.call_count, 2)
+
+    def test_interval_reloads(self):
+        """Test that changes from other processes are picked up by polling"""
+        self.snapshot.lookup(1)
+        self.rows = []
+        with mock.patch('firewall_gateway.core.whitelist_snapshot.time.monotonic',
+                        return_value=10**9):
+            self.assertIsNone(self.snapshot.lookup(167772161))
+        self.assertEqual(self.snapshot.get_stats()['refreshes'], 2)
+
+    def test_invalidate(self):
+        """Test forcing a reload"""
+        self.snapshot.lookup(1)
+        self.snapshot.invalidate()
+        self.snapshot.lookup(1)
+        self.assertEqual(self.loader.call_count, 2)
+
+    def test_get_does_not_refresh(self):
+        """Test that get() reads the current copy and ensure_fresh() reloads it"""
+        self.assertIsNone(self.snapshot.get(167772161))
+        self.assertEqual(self.loader.call_count, 0)
+
+        self.snapshot.ensure_fresh()
+        self.assertFalse(self.snapshot.is_stale())
+        self.assertEqual(self.snapshot.get(167772161), SnapshotEntry(1, 'aa11'))
+        self.snapshot.ensure_fresh()
+        self.assertEqual(self.loader.call_count, 1)
+
+    def test_readers_do_not_wait_for_refresh(self):
+        """Test that a stale snapshot is served while another thread reloads"""
+        self.snapshot.lookup(1)
+        bump_whitelist_version()
+        result = []
+        with self.snapshot._refresh_lock:
+            reader = threading.Thread(target=lambda: result.append(self.snapshot.lookup(167772161)))
+            reader.start()
+            reader.join(timeout=5)
+        self.assertEqual(result, [SnapshotEntry(1, 'aa11')])
+        self.assertEqual(self.loader.call_count, 1)
+
+    def test_invalid_refresh_interval(self):
+        """Test that the refresh interval must be positive"""
+        with self.assertRaises(ValueError):
+            WhitelistSnapshot(self.loader, refresh_interval=0)
+
+
+if __name__ == '__main__':
+    unittest.main()
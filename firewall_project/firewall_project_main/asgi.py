@@ -0,0 +1,14 @@
+"""
+ASGI config for firewall gateway project.
+
+Serve with an ASGI server, e.g. uvicorn firewall_project_main.asgi:application,
+together with AsyncCollatzFirewallMiddleware.
+"""
+
+import os
+
+from django.core.asgi import get_asgi_application
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'firewall_project_main.settings')
+
+application = get_asgi_application()
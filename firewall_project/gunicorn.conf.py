@@ -0,0 +1,29 @@
+"""
+Gunicorn settings for the firewall gateway.
+
+    gunicorn -c gunicorn.conf.py
+
+Each worker loads the SHA1-E3 kernels right after it is forked, so the
+first request it serves does not pay for it, and writes its queued access
+log entries and access counts before it exits.
+"""
+
+import os
+
+wsgi_app = 'firewall_project_main.wsgi:application'
+bind = os.getenv('GUNICORN_BIND', '0.0.0.0:8000')
+workers = int(os.getenv('GUNICORN_WORKERS', '2'))
+
+
+def post_fork(server, worker):
+    from securehash_project.storage.utils.sha1_sponge_collatz_enhanced import kernel_backend, warmup
+
+    seconds = warmup()
+    server.log.info("Worker %s: SHA1-E3 %s kernels ready in %.2fs", worker.pid, kernel_backend(), seconds)
+
+
+def worker_exit(server, worker):
+    from firewall_gateway.access_log import shutdown_access_counter, shutdown_access_log_writer
+
+    shutdown_access_log_writer()
+    shutdown_access_counter()
@@ -2,8 +2,12 @@
 """
 Create a 2 GiB deterministic file and hash it once using SHA1-E3 (streaming).
 Logs timing and throughput, and writes a Markdown report.
+
+With --checkpoint the hash state is saved periodically, and rerunning the
+script after an interruption resumes from the last checkpoint.
 """
 
+import argparse
 import os
 import time
 from pathlib import Path
@@ -11,6 +15,7 @@ from pathlib import Path
 import sys
 sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
 from storage.utils.sha1_sponge_collatz_enhanced import enhanced_sha1_signature_file
+from storage.utils.sha1e3_resumable import resumable_signature_file
 
 
 def write_deterministic_file(path: Path, size_bytes: int, chunk_size: int = 4 * 1024 * 1024) -> None:
@@ -47,21 +52,36 @@ def human_size(n: int) -> str:
 
 
 def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--checkpoint', help='Checkpoint file; enables resuming an interrupted run')
+    parser.add_argument('--checkpoint-every-mib', type=int, default=256,
+                        help='Distance between checkpoints in MiB (default: 256)')
+    args = parser.parse_args()
+
     out_dir = Path("securehash_project/benchmark_data/large_nist")
     size = 2 * 1024 * 1024 * 1024  # 2 GiB
     test_path = out_dir / f"nist_{size}.bin"
     report_path = out_dir / "hash_2g_report.md"
 
-    print(f"Preparing file of size {human_size(size)} at {test_path}...")
     t0 = time.time()
-    write_deterministic_file(test_path, size)
+    if args.checkpoint and test_path.exists() and test_path.stat().st_size == size:
+        # Regenerating would change the mtime and invalidate the checkpoint
+        print(f"Reusing existing file {test_path}")
+    else:
+        print(f"Preparing file of size {human_size(size)} at {test_path}...")
+        write_deterministic_file(test_path, size)
     t1 = time.time()
     gen_time = t1 - t0
     print(f"Generated in {gen_time:.2f}s")
 
     print("Hashing with SHA1-E3 (streaming)... this may take many hours.")
     h0 = time.time()
-    digest = enhanced_sha1_signature_file(str(test_path), show_progress=True)
+    if args.checkpoint:
+        digest = resumable_signature_file(str(test_path), args.checkpoint,
+                                          checkpoint_every=args.checkpoint_every_mib * 1024 * 1024,
+                                          show_progress=True)
+    else:
+        digest = enhanced_sha1_signature_file(str(test_path), show_progress=True)
     h1 = time.time()
     hash_time = h1 - h0
     mbps = (size / (1024 * 1024)) / hash_time if hash_time > 0 else 0.0
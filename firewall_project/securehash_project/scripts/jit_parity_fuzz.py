@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+"""
+JIT Parity Fuzzer for SHA1-E3
+Compares the Numba kernels with the pure-Python reference on random inputs.
+"""
+
+import argparse
+import random
+import sys
+import time
+from pathlib import Path
+
+# Add the project root to Python path
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from storage.utils import sha1_sponge_collatz_enhanced as sponge
+
+
+def fuzz_block_mixing(rng: random.Random, iterations: int) -> list:
+    """Random blocks (0-128 bytes, biased to run-heavy bytes) at random positions."""
+    failures = []
+    for _ in range(iterations):
+        size = rng.choice([rng.randint(1, 128), 64])
+        if rng.random() < 0.2:
+            block = bytes(rng.choice((0x00, 0xFF, rng.getrandbits(8))) for _ in range(size))
+        else:
+            block = bytes(rng.getrandbits(8) for _ in range(size))
+        position = rng.getrandbits(rng.choice((4, 16, 31)))
+        if sponge.enhanced_block_mixing_fast(block, position) != sponge.enhanced_block_mixing(block, position):
+            failures.append(('block', block.hex(), position))
+    return failures
+
+
+def fuzz_collatz(rng: random.Random, iterations: int) -> list:
+    """Random 32-bit seeds through the strengthened Collatz sequence."""
+    failures = []
+    for _ in range(iterations):
+        seed = rng.getrandbits(32)
+        if sponge.strengthened_collatz_sequence_fast(seed) != sponge.strengthened_collatz_sequence(seed):
+            failures.append(('collatz', seed))
+    return failures
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--blocks', type=int, default=20000, help='Block mixing cases')
+    parser.add_argument('--seeds', type=int, default=500, help='Collatz seed cases')
+    parser.add_argument('--seed', type=int, default=None, help='RNG seed (random if omitted)')
+    args = parser.parse_args()
+
+    if not sponge._NUMBA_ENABLED:
+        print("Numba not installed: nothing to compare")
+        return 0
+
+    rng_seed = args.seed if args.seed is not None else random.randrange(2**32)
+    rng = random.Random(rng_seed)
+    print(f"RNG seed: {rng_seed}")
+
+    start = time.time()
+    failures = fuzz_block_mixing(rng, args.blocks) + fuzz_collatz(rng, args.seeds)
+    elapsed = time.time() - start
+
+    print(f"{args.blocks} blocks, {args.seeds} seeds in {elapsed:.1f}s: {len(failures)} mismatches")
+    for failure in failures[:10]:
+        print(f"  MISMATCH {failure}")
+    return 1 if failures else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
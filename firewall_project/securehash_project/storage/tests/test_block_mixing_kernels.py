@@ -0,0 +1,94 @@
+"""Tests for the JIT block-mixing kernels of sha1_sponge_collatz_enhanced."""
+
+import random
+
+import pytest
+
+from storage.utils import sha1_sponge_collatz_enhanced as sponge
+
+
+def _random_data(size, seed=0):
+    rng = random.Random(seed)
+    return bytes(rng.getrandbits(8) for _ in range(size))
+
+
+@pytest.mark.parametrize('size', [0, 1, 15, 16, 17, 64, 65, 64 * 3 + 5, 64 * 20])
+def test_mixed_buffer_size(size):
+    """Test the output size of whole-buffer mixing."""
+    blocks = [size - i if size - i < 64 else 64 for i in range(0, size, 64)]
+    assert sponge.mixed_buffer_size(size) == sum(max(16, b) for b in blocks)
+
+
+@pytest.mark.parametrize('size', [0, 1, 15, 16, 17, 64, 65, 64 * 7 + 33, 64 * 40])
+@pytest.mark.parametrize('start_position', [0, 9])
+def test_buffer_mixing_matches_per_block(size, start_position):
+    """Test that the fused kernel equals mixing block by block."""
+    data = _random_data(size, seed=size)
+    expected = b''.join(
+        sponge.enhanced_block_mixing_fast(data[i:i + 64], start_position + k)
+        for k, i in enumerate(range(0, size, 64))
+    )
+    mixed = sponge.enhanced_block_mixing_buffer_fast(data, start_position)
+    assert bytes(mixed) == expected
+
+
+def test_signature_independent_of_segment_size(monkeypatch):
+    """Test that splitting the input into fused segments does not change the signature."""
+    data = _random_data(64 * 50 + 11, seed=3)
+    expected = sponge.enhanced_sha1_signature(data, show_progress=False)
+    monkeypatch.setattr(sponge, 'FUSED_SEGMENT_BYTES', 64 * 3)
+    assert sponge.enhanced_sha1_signature(data, show_progress=False) == expected
+
+
+requires_numba = pytest.mark.skipif(not sponge._NUMBA_ENABLED, reason="Numba not installed")
+
+
+@requires_numba
+@pytest.mark.parametrize('seed', range(6))
+def test_jit_block_mixing_matches_reference(seed):
+    """Differential fuzz of the JIT block kernel against the Python reference."""
+    rng = random.Random(seed)
+    for _ in range(150):
+        size = rng.choice([0, 1, 7, 8, 15, 16, 17, 31, 63, 64, 64, 64, 100])
+        if rng.random() < 0.3:
+            block = bytes(rng.choice((0x00, 0xFF)) for _ in range(size))
+        else:
+            block = bytes(rng.getrandbits(8) for _ in range(size))
+        position = rng.getrandbits(31)
+        assert (sponge.enhanced_block_mixing_fast(block, position)
+                == sponge.enhanced_block_mixing(block, position)), (block.hex(), position)
+
+
+@requires_numba
+def test_jit_collatz_matches_reference():
+    """Test that the JIT strengthened Collatz sequence is value for value identical."""
+    rng = random.Random(11)
+    for seed in [0, 1, 2, 3, 27, 0xFFFFFFFF] + [rng.getrandbits(32) for _ in range(40)]:
+        assert sponge.strengthened_collatz_sequence_fast(seed) == sponge.strengthened_collatz_sequence(seed)
+
+
+@requires_numba
+def test_signature_independent_of_jit_flag(monkeypatch):
+    """Test that SHA1E3_USE_JIT no longer changes signatures."""
+    data = _random_data(64 * 9 + 3, seed=5)
+    with_jit = sponge.enhanced_sha1_signature(data, show_progress=False)
+    monkeypatch.setattr(sponge, '_USE_JIT', False)
+    assert sponge.enhanced_sha1_signature(data, show_progress=False) == with_jit
+
+
+@requires_numba
+def test_self_check_passes():
+    """Test that the startup self-check accepts the shipped kernels."""
+    assert sponge.jit_self_check()
+
+
+def test_self_check_failure_disables_jit(monkeypatch):
+    """Test that a kernel mismatch makes jit_enabled() refuse the JIT path."""
+    monkeypatch.setattr(sponge, '_NUMBA_ENABLED', True)
+    monkeypatch.setattr(sponge, '_USE_JIT', True)
+    monkeypatch.setattr(sponge, '_JIT_VERIFIED', None)
+    monkeypatch.setattr(sponge, 'enhanced_block_mixing_fast', lambda block, position: b'\x00' * 16)
+
+    assert not sponge.jit_self_check()
+    assert not sponge.jit_enabled()
+    assert sponge._JIT_VERIFIED is False
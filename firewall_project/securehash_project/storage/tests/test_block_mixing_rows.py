@@ -0,0 +1,71 @@
+"""Tests for the batch-of-blocks NumPy engine of enhanced_block_mixing."""
+
+import random
+
+import numpy as np
+import pytest
+
+from storage.utils import sha1_sponge_collatz_enhanced as sponge
+
+
+def _blocks(count, width, seed=0):
+    rng = np.random.default_rng(seed)
+    blocks = rng.integers(0, 256, size=(count, width), dtype=np.uint8)
+    # Low-entropy rows exercise padding and run breaking
+    blocks[:3] = 0
+    blocks[3:5] = 0xFF
+    return blocks
+
+
+@pytest.mark.parametrize('width', [1, 7, 8, 15, 16, 17, 20, 31, 33, 63, 64])
+def test_rows_match_reference(width):
+    """Test every row against the scalar reference."""
+    blocks = _blocks(30, width, seed=width)
+    rng = random.Random(width)
+    positions = np.array([0, 1, 2, 7, 8] + [rng.getrandbits(31) for _ in range(25)])
+    mixed = sponge.enhanced_block_mixing_rows(blocks, positions)
+    assert mixed.shape == (30, max(16, width))
+    for block, position, row in zip(blocks, positions, mixed):
+        assert row.tobytes() == sponge.enhanced_block_mixing(block.tobytes(), int(position))
+
+
+def test_long_run_rows():
+    """Test vectorized long-run detection against a bit-string scan."""
+    rng = np.random.default_rng(1)
+    rows = rng.integers(0, 256, size=(400, 16), dtype=np.uint8)
+    rows[::7, 3:5] = 0
+    rows[::11, 9:11] = 0xFF
+    flagged = set(sponge._rows_with_long_runs(rows).tolist())
+    for m, row in enumerate(rows):
+        bits = ''.join(format(b, '08b') for b in row)
+        assert (m in flagged) == ('0' * 15 in bits or '1' * 15 in bits)
+
+
+@pytest.mark.parametrize('size', [0, 5, 64, 64 * 3 + 40, 64 * 50])
+@pytest.mark.parametrize('start_position', [0, 11])
+def test_numpy_buffer_matches_per_block(size, start_position, monkeypatch):
+    """Test whole-buffer mixing across row batches and a partial tail."""
+    monkeypatch.setattr(sponge, 'ROWS_BATCH', 16)
+    data = bytes(random.Random(size).getrandbits(8) for _ in range(size))
+    expected = b''.join(
+        sponge.enhanced_block_mixing(data[i:i + 64], start_position + k)
+        for k, i in enumerate(range(0, size, 64))
+    )
+    assert sponge.enhanced_block_mixing_buffer_numpy(data, start_position).tobytes() == expected
+
+
+def test_signature_without_jit_uses_rows(monkeypatch):
+    """Test that the non-JIT signature path equals the JIT or reference one."""
+    data = bytes(random.Random(3).getrandbits(8) for _ in range(64 * 40 + 13))
+    expected = sponge.enhanced_sha1_signature(data, show_progress=False)
+    monkeypatch.setattr(sponge, '_USE_JIT', False)
+    assert sponge.enhanced_sha1_signature(data, show_progress=False) == expected
+
+
+def test_batch_worker_without_jit(monkeypatch):
+    """Test the file_fast batch worker on the rows engine."""
+    monkeypatch.setattr(sponge, '_USE_JIT', False)
+    batch = [(5 + k, bytes([k]) * 64) for k in range(6)] + [(11, b'tail')]
+    assert sponge._mix_batch_for_positions(batch) == [
+        (position, sponge.enhanced_block_mixing(block, position)) for position, block in batch
+    ]
@@ -0,0 +1,66 @@
+"""Tests for the pipelined chunk reader and the streaming file signature."""
+
+import os
+import threading
+
+import pytest
+
+from storage.utils import sha1_sponge_collatz_enhanced as sponge
+from storage.utils.file_utils import read_file_chunks
+
+
+@pytest.fixture
+def data_file(tmp_path):
+    def make(size):
+        path = tmp_path / f'data_{size}.bin'
+        path.write_bytes(os.urandom(size))
+        return path
+    return make
+
+
+@pytest.mark.parametrize('size', [0, 1, 63, 64, 1000, 4096, 4097])
+def test_chunks_reassemble_file(data_file, size):
+    """Test that chunks are full-sized except the last and cover the file."""
+    path = data_file(size)
+    chunks = [bytes(chunk) for chunk in read_file_chunks(str(path), chunk_size=256)]
+    assert b''.join(chunks) == path.read_bytes()
+    assert all(len(chunk) == 256 for chunk in chunks[:-1])
+
+
+def test_early_close_stops_reader(data_file):
+    """Test that abandoning the iterator stops the background thread."""
+    path = data_file(10000)
+    before = threading.active_count()
+    chunks = read_file_chunks(str(path), chunk_size=100)
+    next(chunks)
+    chunks.close()
+    assert threading.active_count() == before
+
+
+def test_missing_file_raises(tmp_path):
+    """Test that read errors surface in the consumer."""
+    with pytest.raises(IOError):
+        list(read_file_chunks(str(tmp_path / 'missing.bin')))
+
+
+def test_invalid_buffers(data_file):
+    """Test that at least two buffers are required."""
+    with pytest.raises(ValueError):
+        list(read_file_chunks(str(data_file(10)), buffers=1))
+
+
+@pytest.mark.parametrize('size', [0, 17, 64 * 30 + 5])
+@pytest.mark.parametrize('chunk_size', [64, 64 * 7, None])
+def test_file_signature_matches_in_memory(data_file, size, chunk_size):
+    """Test that chunk size does not change the file signature."""
+    path = data_file(size)
+    assert (sponge.enhanced_sha1_signature_file(str(path), show_progress=False, chunk_size=chunk_size)
+            == sponge.enhanced_sha1_signature(path.read_bytes(), show_progress=False))
+
+
+def test_file_signature_without_jit(data_file, monkeypatch):
+    """Test the pure-Python chunk path."""
+    path = data_file(64 * 5 + 9)
+    expected = sponge.enhanced_sha1_signature(path.read_bytes(), show_progress=False)
+    monkeypatch.setattr(sponge, '_USE_JIT', False)
+    assert sponge.enhanced_sha1_signature_file(str(path), show_progress=False, chunk_size=128) == expected
@@ -0,0 +1,101 @@
+"""Tests for lazy kernel loading, the AOT kernel build and warmup()."""
+
+import json
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+from storage.utils import sha1_sponge_collatz_enhanced as sponge
+
+
+PROJECT_ROOT = Path(__file__).resolve().parents[2]
+
+BOOT_SCRIPT = """
+import json, sys, time
+start = time.perf_counter()
+from storage.utils import sha1_sponge_collatz_enhanced as sponge
+imported = time.perf_counter()
+numba_on_import = 'numba' in sys.modules
+warmup_seconds = sponge.warmup()
+first = time.perf_counter()
+signature = sponge.enhanced_sha1_signature(b'first request', show_progress=False)
+print(json.dumps({
+    'import_seconds': imported - start,
+    'numba_on_import': numba_on_import,
+    'warmup_seconds': warmup_seconds,
+    'first_call_seconds': time.perf_counter() - first,
+    'backend': sponge.kernel_backend(),
+    'signature': signature,
+}))
+"""
+
+
+def _boot_worker():
+    """Start a fresh interpreter the way a forked worker would and time it."""
+    result = subprocess.run([sys.executable, '-c', BOOT_SCRIPT], cwd=PROJECT_ROOT,
+                            capture_output=True, text=True, timeout=600, check=True)
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+@pytest.fixture(scope='module')
+def boot():
+    return _boot_worker()
+
+
+def test_import_does_not_load_numba(boot):
+    """Test that importing the module leaves Numba for the first kernel call."""
+    assert not boot['numba_on_import']
+
+
+def test_warmup_moves_kernel_loading_out_of_first_call(boot):
+    """Test that after warmup() the first signature pays no start-up cost."""
+    assert boot['backend'] in ('aot', 'jit', 'python')
+    assert boot['signature'] == sponge.enhanced_sha1_signature(b'first request', show_progress=False)
+    if boot['backend'] != 'python':
+        assert boot['first_call_seconds'] < boot['warmup_seconds']
+
+
+def test_warmup_is_repeatable():
+    """Test that warmup() can run again once the kernels are loaded."""
+    assert sponge.warmup() >= 0
+    assert sponge.warmup() >= 0
+
+
+def test_fast_variants_without_kernels(monkeypatch):
+    """Test the Python fallbacks used when no compiled kernels exist."""
+    monkeypatch.setattr(sponge, '_KERNELS', None)
+    monkeypatch.setattr(sponge, '_KERNEL_BACKEND', 'python')
+    monkeypatch.setattr(sponge, '_JIT_VERIFIED', None)
+    block = bytes(range(40))
+    assert sponge.enhanced_block_mixing_fast(block, 3) == sponge.enhanced_block_mixing(block, 3)
+    assert sponge.strengthened_collatz_sequences_fast([27]) == [sponge.strengthened_collatz_sequence(27)]
+    assert not sponge.jit_self_check()
+    assert sponge.kernel_backend() == 'python'
+
+
+requires_aot = pytest.mark.skipif(sponge._load_aot_kernels() is None,
+                                  reason="AOT kernels not built (scripts/build_sha1e3_aot.py)")
+
+
+@requires_aot
+def test_aot_kernels_match_reference(monkeypatch):
+    """Test the AOT build against the Python reference."""
+    data = bytes(range(256)) * 3 + b'tail'
+    monkeypatch.setattr(sponge, '_USE_JIT', False)
+    expected = sponge.enhanced_sha1_signature(data, show_progress=False)
+
+    monkeypatch.setattr(sponge, '_USE_JIT', True)
+    monkeypatch.setattr(sponge, '_KERNELS', sponge._load_aot_kernels())
+    monkeypatch.setattr(sponge, '_KERNEL_BACKEND', 'aot')
+    monkeypatch.setattr(sponge, '_JIT_VERIFIED', None)
+    assert sponge.kernel_backend() == 'aot'
+    assert sponge.enhanced_sha1_signature(data, show_progress=False) == expected
+
+
+@requires_aot
+def test_stale_aot_kernels_are_ignored(monkeypatch):
+    """Test that an AOT build from other kernel sources is not used."""
+    monkeypatch.setattr(sponge, 'kernel_source_tag', lambda: -1)
+    assert sponge._load_aot_kernels() is None
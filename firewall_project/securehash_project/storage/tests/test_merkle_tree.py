@@ -70,3 +70,12 @@ def test_merkle_proof_ordering():
     # Reverse proof order should fail verification
     reversed_proof = [(is_left, hash_) for is_left, hash_ in reversed(proof)]
     assert not verify_proof(leaves[0], reversed_proof, root)
+
+
+@pytest.mark.parametrize('count', [3, 5, 6, 7, 11])
+def test_merkle_proof_odd_levels(count):
+    """Test proofs for leaves whose level has no right sibling."""
+    leaves = [bytes([i]) for i in range(count)]
+    root = build_merkle_root(leaves)
+    for i, leaf in enumerate(leaves):
+        assert verify_proof(leaf, build_proof(leaves, i), root)
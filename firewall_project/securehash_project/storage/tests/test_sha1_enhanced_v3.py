@@ -0,0 +1,127 @@
+"""Tests for the incremental SHA1-E3 v3 hasher."""
+
+import random
+
+import pytest
+
+from storage.utils import sha1_enhanced_v3
+from storage.utils.sha1_enhanced_v3 import EnhancedSHA1Hasher, enhanced_sha1_with_content
+
+
+def _random_data(size, seed=0):
+    rng = random.Random(seed)
+    return bytes(rng.getrandbits(8) for _ in range(size))
+
+
+def _feed(hasher, data, seed=0):
+    """Feed data in irregular chunk sizes."""
+    rng = random.Random(seed)
+    offset = 0
+    while offset < len(data):
+        step = rng.randint(1, 11)
+        hasher.update(data[offset:offset + step])
+        offset += step
+    return hasher
+
+
+@pytest.mark.parametrize('size', list(range(0, 40)) + [63, 64, 65, 1000, 4097])
+@pytest.mark.parametrize('declared', [False, True])
+def test_incremental_matches_one_shot(size, declared):
+    """Test that chunked updates produce the one-shot signature."""
+    data = _random_data(size, seed=size)
+    hasher = EnhancedSHA1Hasher(length=size if declared else None)
+    _feed(hasher, data, seed=size)
+    assert hasher.hexdigest() == enhanced_sha1_with_content(data)
+
+
+def test_initial_data_and_new():
+    """Test hashlib-style construction with initial data."""
+    data = b'firewall trajectory' * 10
+    expected = enhanced_sha1_with_content(data)
+    assert EnhancedSHA1Hasher(data).hexdigest() == expected
+    assert sha1_enhanced_v3.new(data, length=len(data)).hexdigest() == expected
+    assert EnhancedSHA1Hasher(data).digest() == bytes.fromhex(expected)
+
+
+def test_digest_does_not_finalize():
+    """Test that digesting leaves the hasher usable."""
+    data = _random_data(300, seed=1)
+    hasher = EnhancedSHA1Hasher(data[:150])
+    assert hasher.hexdigest() == enhanced_sha1_with_content(data[:150])
+    hasher.update(data[150:])
+    assert hasher.hexdigest() == enhanced_sha1_with_content(data)
+
+
+def test_copy_is_independent():
+    """Test that a copy can diverge from the original."""
+    data = _random_data(200, seed=2)
+    hasher = EnhancedSHA1Hasher(length=250)
+    hasher.update(data)
+    clone = hasher.copy()
+    hasher.update(b'a' * 50)
+    clone.update(b'b' * 50)
+    assert hasher.hexdigest() == enhanced_sha1_with_content(data + b'a' * 50)
+    assert clone.hexdigest() == enhanced_sha1_with_content(data + b'b' * 50)
+
+
+def test_declared_length_enforced():
+    """Test that input must match the declared length."""
+    hasher = EnhancedSHA1Hasher(length=20)
+    with pytest.raises(ValueError):
+        hasher.update(b'x' * 21)
+    hasher.update(b'x' * 10)
+    with pytest.raises(ValueError):
+        hasher.hexdigest()
+
+
+def test_declared_length_keeps_bounded_state():
+    """Test that a declared length keeps no more than a window of input."""
+    hasher = EnhancedSHA1Hasher(length=100000)
+    for _ in range(100):
+        hasher.update(b'\x5a' * 1000)
+        assert len(hasher._pending) < 6
+
+
+requires_numpy = pytest.mark.skipif(
+    not sha1_enhanced_v3._NUMPY_ENABLED, reason="NumPy not installed"
+)
+
+
+@requires_numpy
+@pytest.mark.parametrize('size', list(range(0, 30)) + [255, 256, 257, 4099])
+def test_numpy_features_match_reference(size):
+    """Test that vectorized window features are bit-identical."""
+    data = _random_data(size, seed=size)
+    assert (sha1_enhanced_v3._content_features_numpy(data)
+            == sha1_enhanced_v3._content_features_reference(data))
+
+
+@requires_numpy
+@pytest.mark.parametrize('data', [b'', b'a', b'abcdef', b'\x00' * 100, bytes(range(256)) * 8])
+def test_numpy_engine_matches_reference(data):
+    """Test that the numpy engine produces the reference signature."""
+    assert (enhanced_sha1_with_content(data, engine='numpy')
+            == enhanced_sha1_with_content(data, engine='reference'))
+
+
+def test_unknown_engine_rejected():
+    """Test that an unknown engine name is an error."""
+    with pytest.raises(ValueError):
+        enhanced_sha1_with_content(b'data', engine='gpu')
+
+
+@requires_numpy
+@pytest.mark.parametrize('size', list(range(0, 70)) + [127, 128, 129, 1000, 4099, 20000])
+def test_linear_engine_matches_reference(size):
+    """Differential test of the linear-time mixing kernel against the reference."""
+    data = _random_data(size, seed=size + 7)
+    assert (enhanced_sha1_with_content(data, engine='linear')
+            == enhanced_sha1_with_content(data, engine='reference'))
+
+
+@requires_numpy
+def test_linear_engine_structured_inputs():
+    """Test the linear kernel on low-entropy inputs."""
+    for data in [b'\x00' * 4096, b'\xff' * 333, b'ab' * 1000, bytes(range(256)) * 17]:
+        assert (enhanced_sha1_with_content(data, engine='linear')
+                == enhanced_sha1_with_content(data, engine='reference'))
@@ -0,0 +1,172 @@
+"""Tests for resumable SHA1-E3 hashing."""
+
+import hashlib
+import json
+import random
+
+import pytest
+
+from storage.utils import sha1_sponge_collatz_enhanced as sponge
+from storage.utils import sha1e3_resumable as resumable
+from storage.utils import sha1e3_tree as tree
+from storage.utils.sha1e3_resumable import SHA1E3StreamHasher, SHA1State
+
+
+def _random_data(size, seed=0):
+    rng = random.Random(seed)
+    return bytes(rng.getrandbits(8) for _ in range(size))
+
+
+def _feed(hasher, data, seed=0):
+    rng = random.Random(seed)
+    offset = 0
+    while offset < len(data):
+        step = rng.choice([1, 7, 63, 64, 65, 200, 3000])
+        hasher.update(data[offset:offset + step])
+        offset += step
+
+
+@pytest.mark.parametrize('size', [0, 1, 55, 56, 63, 64, 65, 119, 120, 1000, 5000])
+def test_sha1_state_matches_hashlib(size):
+    """Test the exportable SHA-1 against hashlib."""
+    data = _random_data(size, seed=size)
+    sha1 = SHA1State()
+    _feed(sha1, data, seed=size)
+    assert sha1.hexdigest() == hashlib.sha1(data).hexdigest()
+
+
+def test_sha1_state_honours_jit_flag(monkeypatch):
+    """Test that SHA1State leaves the compiled kernel alone when the JIT is disabled."""
+    class BrokenKernels:
+        def sha1_compress_blocks(self, h, data):
+            raise AssertionError('kernel used with SHA1E3_USE_JIT off')
+
+    monkeypatch.setattr(sponge, '_USE_JIT', False)
+    monkeypatch.setattr(sponge, '_kernels', lambda: BrokenKernels())
+    data = _random_data(5000, seed=3)
+    assert SHA1State(data).hexdigest() == hashlib.sha1(data).hexdigest()
+
+
+def test_self_check_covers_sha1_kernel(monkeypatch):
+    """Test that a wrong SHA-1 compression kernel fails jit_self_check."""
+    kernels = sponge._kernels()
+    if kernels is None:
+        pytest.skip('compiled kernels not available')
+
+    class WrongSHA1Kernels:
+        def __getattr__(self, name):
+            return getattr(kernels, name)
+
+        def sha1_compress_blocks(self, h, data):
+            kernels.sha1_compress_blocks(h, data)
+            h[0] ^= 1
+
+    monkeypatch.setattr(sponge, '_kernels', lambda: WrongSHA1Kernels())
+    assert not sponge.jit_self_check()
+
+
+def test_sha1_state_round_trip():
+    """Test exporting and restoring SHA-1 state mid-stream."""
+    data = _random_data(3001, seed=1)
+    sha1 = SHA1State(data[:1234])
+    restored = SHA1State.from_state(json.loads(json.dumps(sha1.export_state())))
+    restored.update(data[1234:])
+    assert restored.digest() == hashlib.sha1(data).digest()
+
+
+def test_sha1_state_rejects_bad_state():
+    """Test that an inconsistent SHA-1 state is rejected."""
+    state = SHA1State(b'abc').export_state()
+    state['length'] = 4
+    with pytest.raises(ValueError):
+        SHA1State.from_state(state)
+
+
+@pytest.mark.parametrize('size', [0, 1, 64, 65, 64 * 33 + 7])
+def test_stream_hasher_matches_signature(size):
+    """Test that the stream hasher equals enhanced_sha1_signature."""
+    data = _random_data(size, seed=size + 1)
+    hasher = SHA1E3StreamHasher()
+    _feed(hasher, data, seed=size)
+    assert hasher.hexdigest() == sponge.enhanced_sha1_signature(data, show_progress=False)
+    assert hasher.offset == size
+
+
+def test_stream_hasher_resume():
+    """Test exporting state, restoring it and finishing elsewhere."""
+    data = _random_data(64 * 20 + 30, seed=2)
+    hasher = SHA1E3StreamHasher()
+    hasher.update(data[:701])
+    state = json.loads(json.dumps(hasher.export_state()))
+
+    restored = SHA1E3StreamHasher.from_state(state)
+    restored.update(data[701:])
+    assert restored.hexdigest() == sponge.enhanced_sha1_signature(data, show_progress=False)
+
+
+def test_stream_hasher_rejects_foreign_state():
+    """Test that a checkpoint of another mode is rejected."""
+    with pytest.raises(ValueError):
+        SHA1E3StreamHasher.from_state({'version': 1, 'mode': 'tree'})
+
+
+def test_resumable_file_after_interruption(tmp_path, monkeypatch):
+    """Test that a killed job resumes from its last checkpoint."""
+    data = _random_data(64 * 50 + 3, seed=3)
+    path = tmp_path / 'archive.bin'
+    path.write_bytes(data)
+    checkpoint = tmp_path / 'archive.ckpt'
+
+    saved = []
+    real_save = resumable.save_checkpoint
+
+    def save_then_die(p, state):
+        real_save(p, state)
+        saved.append(state['offset'])
+        if len(saved) == 2:
+            raise KeyboardInterrupt
+
+    monkeypatch.setattr(resumable, 'save_checkpoint', save_then_die)
+    with pytest.raises(KeyboardInterrupt):
+        resumable.resumable_signature_file(str(path), str(checkpoint), checkpoint_every=640)
+    monkeypatch.setattr(resumable, 'save_checkpoint', real_save)
+
+    assert checkpoint.exists()
+    resumed_from = json.loads(checkpoint.read_text())['offset']
+    assert resumed_from == saved[-1] > 0
+
+    signature = resumable.resumable_signature_file(str(path), str(checkpoint), checkpoint_every=640)
+    assert signature == sponge.enhanced_sha1_signature(data, show_progress=False)
+    assert not checkpoint.exists()
+
+
+def test_stale_checkpoint_ignored(tmp_path):
+    """Test that a checkpoint for a different file version is not resumed."""
+    path = tmp_path / 'archive.bin'
+    path.write_bytes(_random_data(500, seed=4))
+    checkpoint = tmp_path / 'archive.ckpt'
+    hasher = SHA1E3StreamHasher()
+    hasher.update(b'\x00' * 128)
+    resumable.save_checkpoint(str(checkpoint), dict(hasher.export_state(), file={'size': 1, 'mtime_ns': 0}))
+
+    assert (resumable.resumable_signature_file(str(path), str(checkpoint))
+            == sponge.enhanced_sha1_signature(path.read_bytes(), show_progress=False))
+
+
+def test_resumable_tree(tmp_path):
+    """Test that tree mode resumes from its saved leaf list."""
+    data = _random_data(256 * 9 + 5, seed=5)
+    path = tmp_path / 'archive.bin'
+    path.write_bytes(data)
+    checkpoint = tmp_path / 'archive.tree.ckpt'
+    expected = tree.tree_signature(data, leaf_size=256, max_workers=1)
+
+    digests = tree.file_leaf_digests(str(path), 256, max_workers=1, last_leaf=4)
+    resumable.save_checkpoint(str(checkpoint), {
+        'version': resumable.CHECKPOINT_VERSION, 'mode': 'tree',
+        'file': resumable._file_identity(str(path)), 'leaf_size': 256,
+        'digests': [d.hex() for d in digests],
+    })
+    assert resumable.resumable_tree_signature_file(
+        str(path), str(checkpoint), leaf_size=256, max_workers=1, checkpoint_leaves=2) == expected
+    assert not checkpoint.exists()
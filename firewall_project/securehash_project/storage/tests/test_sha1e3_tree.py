@@ -0,0 +1,97 @@
+"""Tests for SHA1-E3 tree mode."""
+
+import os
+
+import pytest
+
+from storage.utils import sha1e3_tree as tree
+from storage.utils.merkle import build_merkle_root
+
+
+LEAF = 256
+
+
+def _data(size, seed=0):
+    return bytes((i * 131 + seed * 7 + (i >> 5)) & 0xFF for i in range(size))
+
+
+@pytest.mark.parametrize('size', [0, 1, LEAF - 1, LEAF, LEAF + 1, LEAF * 5 + 17])
+def test_signature_format(size):
+    """Test the versioned signature layout and its Merkle root."""
+    data = _data(size)
+    signature = tree.tree_signature(data, leaf_size=LEAF, max_workers=1)
+    leaf_size, length, root = tree.parse_tree_signature(signature)
+    assert signature.startswith(tree.TREE_MODE_VERSION + ':')
+    assert (leaf_size, length) == (LEAF, size)
+    digests = [tree.leaf_digest(data[i:i + LEAF]) for i in range(0, max(size, 1), LEAF)]
+    assert root == build_merkle_root(digests)
+
+
+def test_parallel_matches_serial():
+    """Test that leaf hashing on the worker pool gives the same signature."""
+    data = _data(LEAF * 6 + 3, seed=1)
+    assert (tree.tree_signature(data, leaf_size=LEAF, max_workers=2)
+            == tree.tree_signature(data, leaf_size=LEAF, max_workers=1))
+
+
+def test_file_matches_memory(tmp_path):
+    """Test that the file variant equals the in-memory variant."""
+    data = _data(LEAF * 4 + 100, seed=2)
+    path = tmp_path / 'input.bin'
+    path.write_bytes(data)
+    assert (tree.tree_signature_file(str(path), leaf_size=LEAF, max_workers=2)
+            == tree.tree_signature(data, leaf_size=LEAF, max_workers=1))
+
+
+def test_length_is_bound():
+    """Test that duplicating the last leaf changes the signature."""
+    data = _data(LEAF * 3, seed=3)
+    padded = data + data[-LEAF:]
+    assert tree.tree_signature(data, LEAF, 1) != tree.tree_signature(padded, LEAF, 1)
+
+
+def test_extend_after_append(tmp_path):
+    """Test incremental rehashing of an appended file."""
+    path = tmp_path / 'log.bin'
+    first = _data(LEAF * 2 + 50, seed=4)
+    path.write_bytes(first)
+    digests = tree.file_leaf_digests(str(path), LEAF, max_workers=1)
+
+    with open(path, 'ab') as f:
+        f.write(_data(LEAF * 2, seed=5))
+    extended = tree.extend_leaf_digests(str(path), digests, len(first), LEAF, max_workers=1)
+
+    assert extended[:2] == digests[:2]
+    assert (tree.signature_from_leaf_digests(extended, os.path.getsize(path), LEAF)
+            == tree.tree_signature_file(str(path), LEAF, max_workers=1))
+
+
+def test_verify_single_leaf():
+    """Test verifying one leaf range against the signature."""
+    data = _data(LEAF * 5 + 9, seed=6)
+    digests = tree.leaf_digests(data, LEAF, max_workers=1)
+    signature = tree.signature_from_leaf_digests(digests, len(data), LEAF)
+    for index in range(len(digests)):
+        leaf = data[index * LEAF:(index + 1) * LEAF]
+        proof = tree.leaf_proof(digests, index)
+        assert tree.verify_leaf(leaf, proof, signature)
+        assert not tree.verify_leaf(leaf + b'x', proof, signature)
+
+
+@pytest.mark.parametrize('signature', ['', 'abc', 'sha1e3-tree-v0:256:1:00', 'sha1e3-tree-v1:x:1:00'])
+def test_invalid_signature(signature):
+    """Test that malformed tree signatures are rejected."""
+    with pytest.raises(ValueError):
+        tree.parse_tree_signature(signature)
+
+
+def test_invalid_leaf_size():
+    """Test that leaves must hold whole blocks."""
+    with pytest.raises(ValueError):
+        tree.tree_signature(b'data', leaf_size=100)
+
+
+def test_digest_count_checked():
+    """Test that the digest list must match the data length."""
+    with pytest.raises(ValueError):
+        tree.signature_from_leaf_digests([b'\x00' * 32], LEAF * 2, LEAF)
@@ -0,0 +1,51 @@
+"""Tests for the shared-memory multi-process SHA1-E3 engine."""
+
+import random
+
+import pytest
+
+from storage.utils import sha1_sponge_collatz_enhanced as sponge
+
+
+def _random_data(size, seed=0):
+    rng = random.Random(seed)
+    return bytes(rng.getrandbits(8) for _ in range(size))
+
+
+@pytest.mark.parametrize('size', [0, 1, 15, 64, 65, 64 * 37 + 9])
+@pytest.mark.parametrize('max_workers', [1, 2])
+def test_matches_serial_signature(size, max_workers):
+    """Test that the shared-memory engine equals enhanced_sha1_signature."""
+    data = _random_data(size, seed=size)
+    assert (sponge.enhanced_sha1_signature_vectorized_extreme(data, show_progress=False, max_workers=max_workers)
+            == sponge.enhanced_sha1_signature(data, show_progress=False))
+
+
+def test_small_ranges(monkeypatch):
+    """Test that many small ranges are reassembled in order."""
+    data = _random_data(64 * 50 + 3, seed=1)
+    monkeypatch.setattr(sponge, 'SHARED_RANGE_BLOCKS', 3)
+    assert (sponge.enhanced_sha1_signature_vectorized_extreme(data, show_progress=False, max_workers=1)
+            == sponge.enhanced_sha1_signature(data, show_progress=False))
+
+
+@pytest.mark.parametrize('size', [0, 64 * 20 + 17])
+def test_file_variant(tmp_path, size):
+    """Test the file variant that reads directly into shared memory."""
+    data = _random_data(size, seed=2)
+    path = tmp_path / 'input.bin'
+    path.write_bytes(data)
+    assert (sponge.enhanced_sha1_signature_file_vectorized_extreme(str(path), show_progress=False, max_workers=2)
+            == sponge.enhanced_sha1_signature(data, show_progress=False))
+
+
+def test_range_mixing_without_jit(monkeypatch):
+    """Test the pure-Python range mixer against per-block mixing."""
+    monkeypatch.setattr(sponge, '_USE_JIT', False)
+    data = _random_data(64 * 3 + 10, seed=3)
+    out = sponge.np.empty(sponge.mixed_buffer_size(len(data)), dtype=sponge.np.uint8)
+    sponge._mix_range_into(memoryview(data), 5, out)
+    assert out.tobytes() == b''.join(
+        sponge.enhanced_block_mixing(data[i:i + 64], 5 + k)
+        for k, i in enumerate(range(0, len(data), 64))
+    )
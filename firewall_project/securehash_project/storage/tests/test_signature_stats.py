@@ -0,0 +1,110 @@
+"""Tests for the quiet, instrumented SHA1-E3 signature API."""
+
+import concurrent.futures
+import contextlib
+import logging
+
+import pytest
+
+from storage.utils import sha1_sponge_collatz_enhanced as sponge
+from storage.utils.sha1_sponge_collatz_enhanced import SignatureStats
+
+
+DATA = bytes(range(256)) * 9 + b'tail'
+
+
+SIGNERS = [
+    lambda data, **kw: sponge.enhanced_sha1_signature(data, **kw),
+    lambda data, **kw: sponge.enhanced_sha1_signature_extreme_parallel(data, max_workers=2, **kw),
+    lambda data, **kw: sponge.enhanced_sha1_signature_vectorized_extreme(data, max_workers=1, **kw),
+]
+
+
+@pytest.mark.parametrize('sign', SIGNERS)
+def test_quiet_without_progress(sign, capsys):
+    """Test that nothing is printed when show_progress is off."""
+    sign(DATA, show_progress=False)
+    assert capsys.readouterr().out == ''
+
+
+@pytest.mark.parametrize('sign', SIGNERS)
+def test_stats_object_filled(sign):
+    """Test that a SignatureStats passed in is filled with the phase timings."""
+    stats = SignatureStats()
+    signature = sign(DATA, show_progress=False, stats=stats)
+    assert signature == sponge.enhanced_sha1_signature(DATA, show_progress=False)
+    assert stats.data_bytes == len(DATA)
+    assert stats.blocks == (len(DATA) + 63) // 64
+    assert stats.total_seconds >= stats.mixing_seconds + stats.collatz_seconds + stats.finalize_seconds - 1e-6
+    assert stats.throughput_mbps > 0
+
+
+FILE_SIGNERS = [
+    lambda path, **kw: sponge.enhanced_sha1_signature_file(path, **kw),
+    lambda path, **kw: sponge.enhanced_sha1_signature_file_fast(path, parallel_workers=1, **kw),
+    lambda path, **kw: sponge.enhanced_sha1_signature_file_fast(path, parallel_workers=2, batch_blocks=8, **kw),
+    lambda path, **kw: sponge.enhanced_sha1_signature_file_vectorized_extreme(path, max_workers=1, **kw),
+]
+
+
+@pytest.fixture
+def data_file(tmp_path):
+    path = tmp_path / 'data.bin'
+    path.write_bytes(DATA)
+    return str(path)
+
+
+@pytest.mark.parametrize('sign', FILE_SIGNERS)
+def test_file_stats_object_filled(sign, data_file, capsys):
+    """Test that the file variants are quiet and report timings the same way."""
+    stats = SignatureStats()
+    signature = sign(data_file, show_progress=False, stats=stats)
+    assert capsys.readouterr().out == ''
+    assert signature == sponge.enhanced_sha1_signature(DATA, show_progress=False)
+    assert stats.data_bytes == len(DATA)
+    assert stats.blocks == (len(DATA) + 63) // 64
+    assert stats.total_seconds >= stats.mixing_seconds + stats.collatz_seconds + stats.finalize_seconds - 1e-6
+
+
+class _FailingPool:
+    """Worker pool stand-in whose tasks all fail."""
+    max_workers = 2
+
+    def submit_ordered(self, fn, *iterables):
+        for _ in zip(*iterables):
+            future = concurrent.futures.Future()
+            future.set_exception(RuntimeError('worker died'))
+            yield future
+
+
+def test_shared_fallback_logged(monkeypatch, caplog, capsys):
+    """Test that failed shared-memory ranges are logged, remixed locally and reported as progress."""
+    monkeypatch.setattr(sponge, '_worker_pool_for', lambda max_workers: contextlib.nullcontext(_FailingPool()))
+    with caplog.at_level(logging.WARNING, logger=sponge.__name__):
+        signature = sponge.enhanced_sha1_signature_vectorized_extreme(DATA, show_progress=True, max_workers=2)
+    assert signature == sponge.enhanced_sha1_signature(DATA, show_progress=False)
+    assert any('worker died' in record.getMessage() for record in caplog.records)
+    out = capsys.readouterr().out
+    assert 'worker died' not in out
+    assert 'remaining' in out
+
+
+def test_stats_callback():
+    """Test that a callable receives one SignatureStats per signature."""
+    received = []
+    sponge.enhanced_sha1_signature(DATA, show_progress=False, stats=received.append)
+    assert len(received) == 1
+    assert isinstance(received[0], SignatureStats)
+
+
+def test_progress_output(capsys):
+    """Test that show_progress still prints the breakdown."""
+    sponge.enhanced_sha1_signature(DATA, show_progress=True)
+    out = capsys.readouterr().out
+    assert 'Performance breakdown:' in out
+    assert 'Throughput:' in out
+
+
+def test_zero_duration_throughput():
+    """Test throughput of an untimed result."""
+    assert SignatureStats(data_bytes=100).throughput_mbps == 0.0
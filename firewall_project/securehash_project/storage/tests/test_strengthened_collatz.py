@@ -0,0 +1,63 @@
+"""Tests for the integer-bitwise strengthened Collatz sequence."""
+
+import random
+
+import pytest
+
+from storage.utils import sha1_sponge_collatz_enhanced as sponge
+
+
+EDGE_SEEDS = [0, 1, 2, 3, 4, 27, 0x7FFF, 0xFFFF8000, 0xFFFFFFFF, 2**40 + 5]
+
+
+def _seeds(count, seed=0):
+    rng = random.Random(seed)
+    return EDGE_SEEDS + [rng.getrandbits(32) for _ in range(count)]
+
+
+@pytest.mark.parametrize('seed', _seeds(60))
+def test_bitwise_matches_reference(seed):
+    """Test that the bitwise sequence equals the string-based original."""
+    assert (sponge.strengthened_collatz_sequence(seed)
+            == sponge._strengthened_collatz_sequence_reference(seed))
+
+
+def test_lookup_tables():
+    """Test the popcount and balance tables against their definitions."""
+    for b in range(256):
+        assert sponge._POPCOUNT8[b] == bin(b).count('1')
+        assert sponge._BALANCED8[b] == sponge.balance_byte(b)
+
+
+def test_long_run_detection():
+    """Test shift-based detection of runs longer than 14 bits."""
+    assert not sponge._has_long_run(0x55555555)
+    assert not sponge._has_long_run(0x00003FFF | 0x55550000)  # 14 ones
+    assert sponge._has_long_run(0x0000FFFF)
+    assert sponge._has_long_run(0xFFFE0001)
+    for _ in range(2000):
+        val = random.getrandbits(32)
+        bits = format(val, '032b')
+        assert sponge._has_long_run(val) == ('0' * 15 in bits or '1' * 15 in bits)
+
+
+def test_batch_matches_single():
+    """Test that the batched variant returns one sequence per seed, in order."""
+    seeds = _seeds(25, seed=4)
+    assert sponge.strengthened_collatz_sequences(seeds) == [
+        sponge.strengthened_collatz_sequence(seed) for seed in seeds
+    ]
+
+
+def test_batch_without_jit(monkeypatch):
+    """Test the pure-Python batch fallback."""
+    monkeypatch.setattr(sponge, '_USE_JIT', False)
+    seeds = _seeds(5, seed=8)
+    assert sponge.strengthened_collatz_sequences(seeds) == [
+        sponge._strengthened_collatz_sequence_reference(seed) for seed in seeds
+    ]
+
+
+def test_batch_empty():
+    """Test the batched variant with no seeds."""
+    assert sponge.strengthened_collatz_sequences([]) == []
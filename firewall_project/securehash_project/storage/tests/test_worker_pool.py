@@ -0,0 +1,113 @@
+"""Tests for the persistent SHA1-E3 worker pool."""
+
+import multiprocessing
+import os
+import random
+import threading
+import time
+from concurrent.futures.process import BrokenProcessPool
+
+import pytest
+
+from storage.utils import sha1_sponge_collatz_enhanced as sponge
+from storage.utils.sha1_sponge_collatz_enhanced import SHA1E3WorkerPool
+
+
+def _random_data(size, seed=0):
+    rng = random.Random(seed)
+    return bytes(rng.getrandbits(8) for _ in range(size))
+
+
+@pytest.fixture
+def pool():
+    pool = SHA1E3WorkerPool(max_workers=2, max_in_flight=3)
+    yield pool
+    pool.shutdown()
+
+
+def test_lazy_start_and_reuse(pool):
+    """Test that workers start on first use and are reused afterwards."""
+    assert not pool.running
+    assert list(pool.map(abs, [-1, -2, 3])) == [1, 2, 3]
+    assert list(pool.map(pow, [2, 3], [3, 2])) == [8, 9]
+    assert pool.running
+    assert pool.starts == 1
+
+
+def test_shutdown_and_restart(pool):
+    """Test that a shut-down pool starts again on the next submit."""
+    assert pool.submit(abs, -5).result() == 5
+    pool.shutdown()
+    assert not pool.running
+    assert pool.submit(abs, -6).result() == 6
+    assert pool.starts == 2
+
+
+def test_map_preserves_order(pool):
+    """Test ordered results with more items than in-flight slots."""
+    assert list(pool.map(abs, range(-50, 0))) == list(range(50, 0, -1))
+
+
+def test_submit_backpressure(pool):
+    """Test that submit blocks once max_in_flight tasks are outstanding."""
+    futures = [pool.submit(time.sleep, 0.5) for _ in range(3)]
+    blocked = threading.Event()
+
+    def submit_one():
+        pool.submit(abs, 1).result()
+        blocked.set()
+
+    thread = threading.Thread(target=submit_one)
+    start = time.monotonic()
+    thread.start()
+    thread.join(5)
+    assert blocked.is_set()
+    assert time.monotonic() - start > 0.2
+    assert any(f.done() for f in futures)
+
+
+def test_invalid_limits():
+    """Test that pool limits are validated."""
+    with pytest.raises(ValueError):
+        SHA1E3WorkerPool(max_workers=2, max_in_flight=-1)
+
+
+def test_shared_pool_is_reused():
+    """Test that default-sized calls share one started pool."""
+    shared = sponge.get_worker_pool()
+    assert sponge.get_worker_pool() is shared
+    data = _random_data(64 * 30 + 5, seed=1)
+    expected = sponge.enhanced_sha1_signature(data, show_progress=False)
+    with sponge._worker_pool_for(None) as pool:
+        assert pool is shared
+    if shared.max_workers > 1:
+        for _ in range(2):
+            assert sponge.enhanced_sha1_signature_vectorized_extreme(data, show_progress=False) == expected
+        assert shared.starts == 1
+
+
+def test_file_fast_with_pool(tmp_path):
+    """Test that the pooled file hasher keeps signatures unchanged."""
+    data = _random_data(64 * 40 + 9, seed=2)
+    path = tmp_path / 'input.bin'
+    path.write_bytes(data)
+    expected = sponge.enhanced_sha1_signature(data, show_progress=False)
+    for _ in range(2):
+        assert sponge.enhanced_sha1_signature_file_fast(
+            str(path), show_progress=False, parallel_workers=2, batch_blocks=7) == expected
+
+
+def test_workers_not_forked_from_threads(pool):
+    """Test that workers come from a forkserver where the platform has one."""
+    assert pool.submit(abs, -3).result() == 3
+    if 'forkserver' in multiprocessing.get_all_start_methods():
+        assert pool._executor._mp_context.get_start_method() == 'forkserver'
+
+
+def test_recovers_from_dead_worker(pool):
+    """Test that a worker dying breaks only its own task, not the pool."""
+    with pytest.raises(BrokenProcessPool):
+        pool.submit(os._exit, 1).result(timeout=30)
+    assert pool.submit(abs, -3).result(timeout=30) == 3
+    assert list(pool.map(abs, [-1, -2])) == [1, 2]
+    assert pool.starts == 2
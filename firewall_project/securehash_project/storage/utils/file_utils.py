@@ -1,9 +1,17 @@
 """Utility functions for file handling and streaming."""
 
 import logging
+import os
+import queue
+import threading
 from typing import Iterator
 
 
+# Default read size for pipelined reads: large enough that syscall overhead
+# disappears, small enough that two buffers stay cheap
+PIPELINE_CHUNK_SIZE = 8 * 1024 * 1024
+
+
 def stream_file_in_chunks(path: str, chunk_size: int = 16 * 1024) -> Iterator[bytes]:
     """
     Stream a file's contents in chunks to minimize memory usage.
@@ -28,3 +36,89 @@ def stream_file_in_chunks(path: str, chunk_size: int = 16 * 1024) -> Iterator[by
     except IOError as e:
         logging.error(f"Error reading file {path}: {e}")
         raise
+
+
+def _readinto_full(f, view: memoryview) -> int:
+    """Fill view from f, stopping early only at end of file."""
+    filled = 0
+    while filled < len(view):
+        n = f.readinto(view[filled:])
+        if not n:
+            break
+        filled += n
+    return filled
+
+
+def read_file_chunks(path: str, chunk_size: int = PIPELINE_CHUNK_SIZE,
+                     buffers: int = 2, offset: int = 0) -> Iterator[memoryview]:
+    """
+    Read a file in large chunks, ahead of the consumer.
+
+    A background thread readinto()s fixed-size reusable buffers while the
+    caller processes the previous chunk, so reading overlaps computation and
+    at most buffers * chunk_size bytes are held. Every chunk except the last
+    is exactly chunk_size bytes, so block boundaries stay aligned when
+    chunk_size is a multiple of the block size. The kernel is told the file
+    is read sequentially where posix_fadvise is available.
+
+    Args:
+        path: Path to the file to read
+        chunk_size: Size of each chunk in bytes
+        buffers: Number of buffers in rotation (2 = double buffering)
+        offset: Byte offset to start reading at
+
+    Yields:
+        memoryview: Read-only chunk of file data, valid only until the next chunk is requested
+
+    Raises:
+        IOError: If file cannot be read
+    """
+    if chunk_size < 1 or buffers < 2:
+        raise ValueError("chunk_size must be positive and buffers at least 2")
+
+    free: "queue.Queue" = queue.Queue()
+    filled: "queue.Queue" = queue.Queue()
+    for _ in range(buffers):
+        free.put(bytearray(chunk_size))
+    stop = threading.Event()
+
+    def reader():
+        try:
+            with open(path, 'rb', buffering=0) as f:
+                f.seek(offset)
+                if hasattr(os, 'posix_fadvise'):
+                    try:
+                        os.posix_fadvise(f.fileno(), offset, 0, os.POSIX_FADV_SEQUENTIAL)
+                    except OSError:
+                        pass
+                while not stop.is_set():
+                    buf = free.get()
+                    if buf is None:
+                        break
+                    n = _readinto_full(f, memoryview(buf))
+                    if n:
+                        filled.put((buf, n))
+                    if n < chunk_size:
+                        break
+        except BaseException as e:
+            filled.put(e)
+            return
+        filled.put(None)
+
+    thread = threading.Thread(target=reader, name='read_file_chunks', daemon=True)
+    thread.start()
+    try:
+        while True:
+            item = filled.get()
+            if item is None:
+                break
+            if isinstance(item, BaseException):
+                logging.error(f"Error reading file {path}: {item}")
+                raise item
+            buf, n = item
+            yield memoryview(buf).toreadonly()[:n]
+            free.put(buf)
+    finally:
+        stop.set()
+        free.put(None)
+        thread.join()
@@ -59,8 +59,9 @@ def build_proof(leaf_hashes: List[bytes], index: int) -> List[Tuple[bool, bytes]
             if i == target_index or i + 1 == target_index:
                 # Add sibling to proof
                 if target_index % 2 == 0:
-                    if i + 1 < len(current_level):
-                        proof.append((False, current_level[i + 1]))
+                    # A last node without a sibling is paired with itself
+                    right = current_level[i + 1] if i + 1 < len(current_level) else current_level[i]
+                    proof.append((False, right))
                 else:
                     proof.append((True, current_level[i]))
             
@@ -4,9 +4,24 @@ Specifically designed to detect subtle differences in similar files
 """
 
 import hashlib
+import os
 from typing import List, Tuple
 import struct
 
+# Optional NumPy for the vectorized feature engine (same output)
+_NUMPY_ENABLED = False
+try:
+    import numpy as np
+    from numpy.lib.stride_tricks import sliding_window_view
+    _NUMPY_ENABLED = True
+except ImportError:
+    _NUMPY_ENABLED = False
+
+ENGINES = ('reference', 'numpy', 'linear')
+
+# Engine used when none is requested (can be set via environment)
+DEFAULT_ENGINE = os.getenv('SHA1E3_V3_ENGINE', 'linear' if _NUMPY_ENABLED else 'reference')
+
 def collatz_sequence(n: int, max_steps: int = 100) -> List[int]:
     """Generate bounded Collatz sequence for a given number."""
     sequence = [n]
@@ -70,15 +85,125 @@ def mix_with_position(block: bytes, position: int, prev_blocks: List[bytes] = No
     
     return mixed
 
-def enhanced_sha1_with_content(data: bytes) -> str:
+def _content_feature_matrix(data: bytes) -> 'np.ndarray':
     """
-    Compute enhanced signature with improved content sensitivity.
+    create_content_features for every window of data, as a (windows, 14) array.
+
+    Full 6-byte windows are viewed with sliding_window_view and their
+    statistics reduced along the window axis; the (at most two) short
+    windows at the end go through create_content_features.
     """
-    # 1. Initial SHA-1 hash with smaller block size
-    sha1_hash = hashlib.sha1(data).digest()
-    sha1_blocks = [sha1_hash[i:i+4] for i in range(0, 20, 4)]  # 4-byte blocks
-    
-    # 2. Process file content with overlapping windows
+    size = len(data)
+    if size >= 1 << 32:
+        # Same limit as position.to_bytes(4, 'big') in the reference
+        raise OverflowError("int too big to convert")
+
+    window_size, stride = 6, 4
+    full = (size - window_size) // stride + 1 if size >= window_size else 0
+    raw = bytes(data)
+    features = np.empty((full, 14), dtype=np.uint8)
+
+    if full:
+        windows = sliding_window_view(np.frombuffer(raw, dtype=np.uint8), window_size)[::stride][:full]
+        offsets = np.arange(full, dtype=np.int64) * stride
+
+        # 1. Per-window SHA-1 (hashlib has no batch API; one C call per window)
+        sha1 = hashlib.sha1
+        prefixes = b''.join([
+            sha1(raw[o:o + window_size]).digest()[:2]
+            for o in range(0, full * stride, stride)
+        ])
+        features[:, 0:2] = np.frombuffer(prefixes, dtype=np.uint8).reshape(full, 2)
+
+        # 2. Statistical features
+        features[:, 2] = windows.max(axis=1)
+        features[:, 3] = windows.min(axis=1)
+        features[:, 4] = windows.sum(axis=1, dtype=np.uint32) & 0xFF
+        ordered = np.sort(windows, axis=1)
+        features[:, 5] = 1 + np.count_nonzero(ordered[:, 1:] != ordered[:, :-1], axis=1)
+
+        # 3. Position features
+        features[:, 6:10] = offsets.astype('>u4').view(np.uint8).reshape(full, 4)
+
+        # 4. Byte frequency features (b % 4 buckets)
+        buckets = windows & 3
+        for bucket in range(4):
+            features[:, 10 + bucket] = np.count_nonzero(buckets == bucket, axis=1)
+
+    tail = b''.join(
+        create_content_features(raw[i:i + window_size], i)
+        for i in range(full * stride, size, stride)
+    )
+    if tail:
+        features = np.concatenate([features, np.frombuffer(tail, dtype=np.uint8).reshape(-1, 14)])
+    return features
+
+def _content_features_numpy(data: bytes) -> List[bytes]:
+    """create_content_features for every window of data, computed in bulk."""
+    flat = _content_feature_matrix(data).tobytes()
+    return [flat[k:k + 14] for k in range(0, len(flat), 14)]
+
+def _mix_regions_linear(sha1_hash: bytes, features: 'np.ndarray') -> List[bytes]:
+    """
+    Step 3 of enhanced_sha1_with_content in linear time.
+
+    The reference re-runs mix_with_position against every previous mixed
+    block for every window, reallocating padded copies in xor_bytes. All of
+    it is byte-wise XOR and 1-byte rotation of 16-byte blocks, so region i
+    with n windows x_j (features XOR position pattern) reduces to:
+
+        rot^n(sha1_block) ^ rot^(n+i)(XOR_j rot^-j(x_j)) ^ XOR_k=1..n rot^k(C_i)
+
+    where C_i = XOR_t rot^(i-t)(mixed_blocks[t]). Windows are XORed per
+    residue of j mod 16, so each region costs 16 vector reductions and the
+    running state is a fixed uint8[16] updated in place.
+
+    Requires at least 5 windows (no empty regions).
+    """
+    width = 16
+    count_total = len(features)
+    blocks = np.zeros((count_total, width), dtype=np.uint8)
+    blocks[:, :14] = features
+
+    mixed_blocks = []
+    state = np.zeros(width, dtype=np.uint8)
+    previous = np.zeros(width, dtype=np.uint8)
+    for i in range(5):
+        start = (i * count_total) // 5
+        end = ((i + 1) * count_total) // 5
+        count = end - start
+        region = blocks[start:end]
+
+        # Position pattern i * 1000 + j, 4 big-endian bytes repeated
+        positions = (np.arange(count, dtype=np.uint32) + i * 1000).astype('>u4')
+        region ^= np.tile(positions.view(np.uint8).reshape(count, 4), 4)
+
+        # rot^-j(x_j), grouped by j mod 16 (rot^k is np.roll(-k))
+        state[:] = 0
+        for residue in range(min(width, count)):
+            folded = np.bitwise_xor.reduce(region[residue::width], axis=0)
+            state ^= np.roll(folded, residue)
+        state[:] = np.roll(state, -(count + i))
+
+        sha1_block = np.zeros(width, dtype=np.uint8)
+        sha1_block[:4] = np.frombuffer(sha1_hash[4 * i:4 * i + 4], dtype=np.uint8)
+        state ^= np.roll(sha1_block, -count)
+
+        # C_i and the parity of rot^k(C_i) for k = 1..count
+        previous[:] = 0
+        for t, block in enumerate(mixed_blocks):
+            previous ^= np.roll(np.frombuffer(block, dtype=np.uint8), -(i - t))
+        for shift in range(width):
+            first = shift if shift else width
+            if first <= count and ((count - first) // width) % 2 == 0:
+                state ^= np.roll(previous, -shift)
+
+        mixed_blocks.append(state.tobytes())
+
+    return mixed_blocks
+
+def _content_features_reference(data: bytes) -> List[bytes]:
+    """create_content_features for every overlapping window, one at a time."""
     content_blocks = []
     window_size = 6  # Smaller window for more sensitivity
     overlap = 2  # Overlapping bytes between windows
@@ -93,6 +218,40 @@ def enhanced_sha1_with_content(data: bytes) -> str:
         features = create_content_features(window, i)
         content_blocks.append(features)
     
+    return content_blocks
+
+def enhanced_sha1_with_content(data: bytes, engine: str = None) -> str:
+    """
+    Compute enhanced signature with improved content sensitivity.
+
+    engine selects the implementation, default DEFAULT_ENGINE:
+      'reference' - per-window Python features and mixing
+      'numpy'     - vectorized features, reference mixing
+      'linear'    - vectorized features, linear-time mixing kernel
+    All engines produce identical signatures; the NumPy engines fall back
+    to 'reference' when NumPy is not installed.
+    """
+    engine = engine or DEFAULT_ENGINE
+    if engine not in ENGINES:
+        raise ValueError(f"Unknown engine {engine!r}, expected one of {ENGINES}")
+    if engine != 'reference' and not _NUMPY_ENABLED:
+        engine = 'reference'
+
+    # 1. Initial SHA-1 hash with smaller block size
+    sha1_hash = hashlib.sha1(data).digest()
+    sha1_blocks = [sha1_hash[i:i+4] for i in range(0, 20, 4)]  # 4-byte blocks
+    
+    # 2. Process file content with overlapping windows
+    if engine == 'linear':
+        features = _content_feature_matrix(data)
+        if len(features) >= 5:
+            return _finalize_signature(_mix_regions_linear(sha1_hash, features))
+        content_blocks = [row.tobytes() for row in features]
+    elif engine == 'numpy':
+        content_blocks = _content_features_numpy(data)
+    else:
+        content_blocks = _content_features_reference(data)
+    
     # 3. Advanced mixing of SHA-1 and content blocks
     mixed_blocks = []
     for i in range(5):  # Process 5 blocks for more granularity
@@ -119,6 +278,10 @@ def enhanced_sha1_with_content(data: bytes) -> str:
         
         mixed_blocks.append(mixed)
     
+    return _finalize_signature(mixed_blocks)
+
+def _finalize_signature(mixed_blocks: List[bytes]) -> str:
+    """Turn the five mixed blocks into the final hex signature (steps 4-5)."""
     # 4. Generate and analyze Collatz sequences
     signatures = []
     for i, block in enumerate(mixed_blocks):
@@ -150,3 +313,180 @@ def verify_signature(data: bytes, signature: str) -> bool:
     """Verify if a signature matches the data."""
     computed = enhanced_sha1_with_content(data)
     return computed.lower() == signature.lower()
+
+# Streaming form of enhanced_sha1_with_content.
+#
+# Every mixing step above is a byte-wise XOR or a 1-byte rotation of a 16-byte
+# block, so a whole region folds into one accumulator:
+#   region_i = rot^n(sha1_block) ^ rot^(n+i)(XOR_j rot^-j(x_j)) ^ XOR_k=1..n rot^k(C_i)
+# where x_j is window j's features XOR its position pattern and C_i is the
+# contribution of the previous mixed blocks, which is only known once the
+# SHA-1 of the whole input is. The accumulators are kept as 128-bit ints.
+
+_MIX_BYTES = 16
+_MIX_MASK = (1 << (8 * _MIX_BYTES)) - 1
+_POSITION_REPEAT = int.from_bytes(b'\x00\x00\x00\x01' * (_MIX_BYTES // 4), 'big')
+_WINDOW_SIZE = 6
+_WINDOW_STRIDE = 4
+_MIN_STREAM_LENGTH = 17  # Fewer bytes leave some regions empty
+_UPDATE_CHUNK = 64 * 1024
+
+
+def _rotl(value: int, count: int) -> int:
+    """Rotate a 16-byte block left by count bytes (mixed[1:] + mixed[:1])."""
+    count %= _MIX_BYTES
+    if not count:
+        return value
+    shift = 8 * count
+    return ((value << shift) | (value >> (8 * _MIX_BYTES - shift))) & _MIX_MASK
+
+
+class EnhancedSHA1Hasher:
+    """
+    hashlib-style incremental hasher for enhanced_sha1_with_content.
+
+    With the total length declared up front the state is bounded: the SHA-1
+    of the input, at most 5 pending bytes of window overlap and one 16-byte
+    accumulator per region. Without it, region boundaries are unknown until
+    the end, so the raw input is buffered (one byte per input byte, never
+    the per-window feature list) and folded when the digest is requested.
+    """
+
+    name = 'sha1_enhanced_v3'
+    digest_size = 32
+    block_size = _WINDOW_STRIDE
+
+    def __init__(self, data: bytes = b'', length: int = None):
+        if length is not None and length < 0:
+            raise ValueError("length must be non-negative")
+
+        self._length = length
+        self._received = 0
+        self._sha1 = hashlib.sha1()
+
+        # Raw input is kept only when the regions cannot be laid out yet
+        self._buffer = bytearray() if length is None or length < _MIN_STREAM_LENGTH else None
+
+        if self._buffer is None:
+            windows = (length + _WINDOW_STRIDE - 1) // _WINDOW_STRIDE
+            self._region_ends = [((i + 1) * windows) // 5 for i in range(5)]
+            self._accumulators = [0] * 5
+            self._pending = bytearray()  # Input from the next window's offset
+            self._window = 0
+            self._region = 0
+            self._region_start = 0
+
+        if data:
+            self.update(data)
+
+    def update(self, data: bytes) -> None:
+        """Feed more input (any bytes-like object)."""
+        view = memoryview(data).cast('B')
+        size = len(view)
+        if self._length is not None and self._received + size > self._length:
+            raise ValueError(
+                f"Input exceeds declared length of {self._length} bytes"
+            )
+
+        self._sha1.update(view)
+        self._received += size
+
+        if self._buffer is not None:
+            self._buffer += view
+            return
+
+        for start in range(0, size, _UPDATE_CHUNK):
+            self._consume(view[start:start + _UPDATE_CHUNK], final=False)
+
+    def _consume(self, chunk, final: bool) -> None:
+        """Fold every window that is complete (or the input's tail if final)."""
+        data = bytes(self._pending) + bytes(chunk)
+        size = len(data)
+        accumulators = self._accumulators
+        region_ends = self._region_ends
+        window = self._window
+        region = self._region
+        region_start = self._region_start
+
+        offset = 0
+        while offset < size and (final or offset + _WINDOW_SIZE <= size):
+            while window >= region_ends[region]:
+                region_start = region_ends[region]
+                region += 1
+            j = window - region_start
+
+            features = create_content_features(
+                data[offset:offset + _WINDOW_SIZE], window * _WINDOW_STRIDE
+            )
+            position = (region * 1000 + j) * _POSITION_REPEAT
+            block = (int.from_bytes(features, 'big') << 16) ^ position
+            accumulators[region] ^= _rotl(block, -j)
+
+            window += 1
+            offset += _WINDOW_STRIDE
+
+        self._pending = bytearray(data[offset:])
+        self._window = window
+        self._region = region
+        self._region_start = region_start
+
+    def copy(self) -> 'EnhancedSHA1Hasher':
+        """Return an independent copy of the current state."""
+        clone = EnhancedSHA1Hasher.__new__(EnhancedSHA1Hasher)
+        clone.__dict__.update(self.__dict__)
+        clone._sha1 = self._sha1.copy()
+        if self._buffer is not None:
+            clone._buffer = bytearray(self._buffer)
+        else:
+            clone._accumulators = list(self._accumulators)
+            clone._pending = bytearray(self._pending)
+        return clone
+
+    def hexdigest(self) -> str:
+        """Signature of the input so far, identical to enhanced_sha1_with_content."""
+        if self._length is not None and self._received != self._length:
+            raise ValueError(
+                f"Declared length {self._length} bytes, received {self._received}"
+            )
+
+        if self._buffer is not None:
+            if len(self._buffer) < _MIN_STREAM_LENGTH:
+                return enhanced_sha1_with_content(bytes(self._buffer))
+            folded = EnhancedSHA1Hasher(length=len(self._buffer))
+            folded.update(self._buffer)
+            return folded.hexdigest()
+
+        state = self.copy()
+        state._consume(b'', final=True)
+
+        sha1_hash = self._sha1.digest()
+        mixed_blocks = []
+        region_start = 0
+        for i, region_end in enumerate(self._region_ends):
+            count = region_end - region_start
+            region_start = region_end
+
+            sha1_block = int.from_bytes(sha1_hash[4 * i:4 * i + 4], 'big') << 96
+            previous = 0
+            for t, block in enumerate(mixed_blocks):
+                previous ^= _rotl(int.from_bytes(block, 'big'), i - t)
+
+            mixed = _rotl(sha1_block, count) ^ _rotl(state._accumulators[i], count + i)
+            # XOR of rot^k(previous) for k = 1..count, by parity of k mod 16
+            for shift in range(_MIX_BYTES):
+                first = shift if shift else _MIX_BYTES
+                if first <= count and ((count - first) // _MIX_BYTES) % 2 == 0:
+                    mixed ^= _rotl(previous, shift)
+
+            mixed_blocks.append(mixed.to_bytes(_MIX_BYTES, 'big'))
+
+        return _finalize_signature(mixed_blocks)
+
+    def digest(self) -> bytes:
+        """Raw bytes of hexdigest()."""
+        return bytes.fromhex(self.hexdigest())
+
+
+def new(data: bytes = b'', length: int = None) -> EnhancedSHA1Hasher:
+    """Create an EnhancedSHA1Hasher, mirroring hashlib.new()."""
+    return EnhancedSHA1Hasher(data, length=length)
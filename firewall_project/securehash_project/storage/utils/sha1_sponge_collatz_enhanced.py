@@ -4,21 +4,40 @@ Combines SHA-1's initial security with advanced mixing and enhanced Collatz comp
 Employs matrix-based block mixing with controlled bit balance and pattern distribution.
 """
 
+import atexit
+import concurrent.futures
+import contextlib
 import hashlib
-from typing import List, Tuple
+import importlib
+import importlib.util
+import logging
+import multiprocessing
+import os
+import threading
+import time
+from collections import deque
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import dataclass, fields
+from multiprocessing import shared_memory
+from typing import Callable, List, Tuple, Union
 import struct
 import random
 import numpy as np
-# Optional Numba JIT for speed without changing outputs
-_NUMBA_ENABLED = False
-try:
-    from numba import njit
-    _NUMBA_ENABLED = True
-except Exception:
-    _NUMBA_ENABLED = False
+
+from .file_utils import PIPELINE_CHUNK_SIZE, read_file_chunks
+
+logger = logging.getLogger(__name__)
+
+# Upper bound on strengthened_collatz_sequence length (100 + 1000 steps)
+COLLATZ_MAX_VALUES = 1100
+
+# Optional compiled kernels (Numba JIT or the AOT build) for speed without
+# changing outputs. Only their presence is checked here; they are imported
+# on first use, so importing this module stays cheap
+_NUMBA_ENABLED = (importlib.util.find_spec('numba') is not None
+                  or bool(__package__) and importlib.util.find_spec(f'{__package__}._sha1e3_aot') is not None)
 
 # Runtime flag to enable/disable JIT (can be set via environment)
-import os
 _USE_JIT = os.getenv('SHA1E3_USE_JIT', '1').lower() in ('1', 'true', 'yes', 'on')
 
 # Cryptographically strong S-box (based on AES design principles)
@@ -62,8 +81,38 @@ def rotr(x: int, n: int) -> int:
     n = n & 7  # Keep rotation in range 0-7 bits
     return ((x >> n) | (x << (8 - n))) & 0xFF
 
+# Byte lookup tables: _ROTL8[n][x] == rotl(x, n), _ROTR8[n][x] == rotr(x, n),
+# _MUL8[r][x] == (x * MULTIPLIERS[r]) & 0xFF
+_SBOX8 = bytes(SBOX)
+_ROTL8 = [bytes(rotl(x, n) for x in range(256)) for n in range(8)]
+_ROTR8 = [bytes(rotr(x, n) for x in range(256)) for n in range(8)]
+_MUL8 = [bytes((x * m) & 0xFF for x in range(256)) for m in MULTIPLIERS]
+
 def global_mix(buf: bytearray) -> bytearray:
     """Create dependencies between multiple bytes with strong nonlinear mixing."""
+    out = bytearray(buf)
+    N = len(out)
+    sbox = _SBOX8
+    rotl3, rotr2 = _ROTL8[3], _ROTR8[2]
+
+    # Multiple passes with different patterns
+    for r in range(2):
+        prev1, prev2, next2 = _ROTL8[(2 + r) & 7], _ROTR8[(3 + r) & 7], _ROTL8[(1 + r) & 7]
+        mul = _MUL8[r % len(MULTIPLIERS)]
+
+        # Forward pass: each byte depends on neighbors
+        for i in range(N):
+            out[i] = sbox[out[i] ^ prev1[out[(i-1)%N]] ^ prev2[out[(i-2)%N]]
+                          ^ sbox[out[(i+1)%N]] ^ next2[out[(i+2)%N]]]
+
+        # Backward pass with different pattern
+        for i in range(N-1, -1, -1):
+            out[i] = mul[rotl3[out[i]] ^ sbox[out[(i+1)%N]] ^ rotr2[out[(i-1)%N]]]
+
+    return out
+
+def _global_mix_reference(buf: bytearray) -> bytearray:
+    """Original global_mix, kept as the reference for the table-driven versions."""
     if not isinstance(buf, bytearray):
         buf = bytearray(buf)
     
@@ -97,322 +146,375 @@ def global_mix(buf: bytearray) -> bytearray:
     
     return out
 
-# JIT-accelerated variant (identical logic) used when enabled via flag
-if _NUMBA_ENABLED:
-    # Create JIT-compatible SBOX as numpy array
-    SBOX_JIT = np.array(SBOX, dtype=np.uint8)
-    MULTIPLIERS_JIT = np.array(MULTIPLIERS, dtype=np.uint8)
-    PRIMES_JIT = np.array(PRIMES, dtype=np.uint8)
-
-    @njit(cache=True)
-    def _global_mix_jit(arr: np.ndarray) -> np.ndarray:
-        N = arr.size
-        out = arr.copy()
-        def sbox_scramble_nb(b: int) -> int:
-            return SBOX_JIT[b & 0xFF]
-        def rotl_nb(x: int, n: int) -> int:
-            n = n & 7
-            return ((x << n) | (x >> (8 - n))) & 0xFF
-        def rotr_nb(x: int, n: int) -> int:
-            n = n & 7
-            return ((x >> n) | (x << (8 - n))) & 0xFF
-        for r in range(2):
-            for i in range(N):
-                b = out[i]
-                b ^= rotl_nb(out[(i-1) % N], 2 + r)
-                b ^= rotr_nb(out[(i-2) % N], 3 + r)
-                b ^= sbox_scramble_nb(out[(i+1) % N])
-                b ^= rotl_nb(out[(i+2) % N], 1 + r)
-                b = sbox_scramble_nb(b)
-                out[i] = b
-            for i in range(N-1, -1, -1):
-                b = out[i]
-                b = rotl_nb(b, 3)
-                b ^= sbox_scramble_nb(out[(i+1) % N])
-                b ^= rotr_nb(out[(i-1) % N], 2)
-                b = (b * MULTIPLIERS_JIT[r % len(MULTIPLIERS_JIT)]) & 0xFF
-                out[i] = b
-        return out
-
-    def global_mix_fast(buf: bytearray) -> bytearray:
-        if not isinstance(buf, (bytearray, bytes)):
-            buf = bytearray(buf)
-        arr = np.frombuffer(bytes(buf), dtype=np.uint8)
-        out = _global_mix_jit(arr)
-        return bytearray(out.tobytes())
-
-    # JIT-compiled enhanced block mixing for maximum performance
-    @njit(cache=True)
-    def _enhanced_block_mixing_jit(block_arr: np.ndarray, position: int) -> np.ndarray:
-        """JIT-compiled version of enhanced_block_mixing for speed."""
-        output_size = max(16, block_arr.size)
-        chunk_size = 8
-
-        # Position-dependent constants (using modular arithmetic for JIT compatibility)
-        k1 = PRIMES_JIT[(position * 3) % len(PRIMES_JIT)]
-        k2 = PRIMES_JIT[(position * 5 + 1) % len(PRIMES_JIT)]
-        k3 = MULTIPLIERS_JIT[(position * 7) % len(MULTIPLIERS_JIT)]
-
-        # Initialize buffer with padding if needed
-        if block_arr.size < output_size:
-            buffer = np.zeros(output_size, dtype=np.uint8)
-            buffer[:block_arr.size] = block_arr
-            pad_base = (k1 * k2 + position) & 0xFF
-            for i in range(block_arr.size, output_size):
-                pad = SBOX_JIT[(pad_base + i * k3) & 0xFF]
-                buffer[i] = pad
-        else:
-            buffer = block_arr.copy()
-
-        # Process in chunks with optimized loops
-        result = np.zeros(output_size, dtype=np.uint8)
-        prev_chunk = np.zeros(chunk_size, dtype=np.uint8)
-        result_idx = 0
-
-        for chunk_start in range(0, buffer.size, chunk_size):
-            chunk_end = min(chunk_start + chunk_size, buffer.size)
-            chunk = buffer[chunk_start:chunk_end].copy()
-
-            # Pad chunk if needed
-            if chunk.size < chunk_size:
-                padded_chunk = np.zeros(chunk_size, dtype=np.uint8)
-                padded_chunk[:chunk.size] = chunk
-                pad_val = (k1 + chunk_start) & 0xFF
-                for i in range(chunk.size, chunk_size):
-                    pad_val = SBOX_JIT[(pad_val * k2 + k3) & 0xFF]
-                    padded_chunk[i] = pad_val
-                chunk = padded_chunk
-
-            # Mix with previous chunk
-            if chunk_start > 0:
-                for i in range(chunk_size):
-                    n = (position + i) & 7
-                    rotated = ((prev_chunk[i] << n) | (prev_chunk[i] >> (8 - n))) & 0xFF
-                    chunk[i] ^= rotated
-
-            # Apply global mixing (simplified for JIT)
-            chunk = _global_mix_jit(chunk)
-
-            # Position-dependent transformations
-            chunk_idx = chunk_start // chunk_size
-            for i in range(chunk_size):
-                x = chunk[i]
-                x = SBOX_JIT[x & 0xFF]  # sbox_scramble
-                n = (position + chunk_idx + i) & 7
-                x = ((x << n) | (x >> (8 - n))) & 0xFF  # rotl
-                x = (x * k3 + k1) & 0xFF
-                x = SBOX_JIT[x & 0xFF]  # sbox_scramble again
-                chunk[i] = x
-
-            # Another round of global mixing
-            chunk = _global_mix_jit(chunk)
-
-            # Store result
-            copy_size = min(chunk_size, output_size - result_idx)
-            result[result_idx:result_idx + copy_size] = chunk[:copy_size]
-            result_idx += copy_size
-            prev_chunk = chunk.copy()
-
-            if result_idx >= output_size:
-                break
-
-        # Final mixing passes
-        result = _global_mix_jit(result)
-        result = _global_mix_jit(result)
-        result = _global_mix_jit(result)
-
-        # Enhanced cross-byte XOR passes
-        N = result.size
-
-        # Forward pass with near neighbor
-        for i in range(N):
-            n = 3
-            rotated = ((result[(i+1) % N] << n) | (result[(i+1) % N] >> (8 - n))) & 0xFF
-            result[i] ^= rotated
+# NumPy forms of the byte tables for global_mix_rows
+_SBOX8_NP = np.frombuffer(_SBOX8, dtype=np.uint8)
+_ROTL8_NP = [np.frombuffer(t, dtype=np.uint8) for t in _ROTL8]
+_ROTR8_NP = [np.frombuffer(t, dtype=np.uint8) for t in _ROTR8]
+_MUL8_NP = [np.frombuffer(t, dtype=np.uint8) for t in _MUL8]
+
+def global_mix_rows(rows: np.ndarray) -> np.ndarray:
+    """
+    global_mix applied to every row of a (blocks, width) uint8 array.
+
+    global_mix is sequential along a row but independent across rows, so
+    each byte position is computed for all rows at once with table lookups.
+    Widths used by enhanced_block_mixing are 8 (chunks) and 16 or 64
+    (results); any width gives the same output as global_mix per row.
+    """
+    # Column-major working copy: one contiguous vector per byte position
+    cols = np.array(rows, dtype=np.uint8, order='F').T
+    N = cols.shape[0]
+    sbox = _SBOX8_NP
+    rotl3, rotr2 = _ROTL8_NP[3], _ROTR8_NP[2]
+
+    for r in range(2):
+        prev1, prev2, next2 = _ROTL8_NP[(2 + r) & 7], _ROTR8_NP[(3 + r) & 7], _ROTL8_NP[(1 + r) & 7]
+        mul = _MUL8_NP[r % len(MULTIPLIERS)]
 
-        # Far forward pass
         for i in range(N):
-            n = 5
-            rotated = ((result[(i+5) % N] << n) | (result[(i+5) % N] >> (8 - n))) & 0xFF
-            result[i] ^= rotated
+            cols[i] = sbox[cols[i] ^ prev1[cols[(i-1)%N]] ^ prev2[cols[(i-2)%N]]
+                           ^ sbox[cols[(i+1)%N]] ^ next2[cols[(i+2)%N]]]
 
-        # Backward pass
         for i in range(N-1, -1, -1):
-            n = 4
-            rotated = ((result[(i-2) % N] << n) | (result[(i-2) % N] >> (8 - n))) & 0xFF
-            result[i] ^= rotated
+            cols[i] = mul[rotl3[cols[i]] ^ sbox[cols[(i+1)%N]] ^ rotr2[cols[(i-1)%N]]]
+
+    return np.ascontiguousarray(cols.T)
+
+# Input bytes handed to the fused block-mixing kernel per call (multiple of 64);
+# bounds the size of the mixed output held in memory at once
+FUSED_SEGMENT_BYTES = 16 * 1024 * 1024
+
+def mixed_buffer_size(data_size: int, block_size: int = 64) -> int:
+    """Total size of the mixed output for data_size input bytes (blocks grow to >= 16 bytes)."""
+    full, tail = divmod(data_size, block_size)
+    return full * max(16, block_size) + (max(16, tail) if tail else 0)
+
+# Compiled kernels (identical logic), loaded on first use by _kernels(): the
+# AOT build from scripts/build_sha1e3_aot.py if present and current, else
+# the Numba JIT kernels in sha1e3_kernels
+_KERNELS = None
+_KERNEL_BACKEND = None
+
+def kernel_source_tag() -> int:
+    """Tag of the sha1e3_kernels source, compiled into the AOT build to detect stale builds."""
+    with open(os.path.join(os.path.dirname(__file__), 'sha1e3_kernels.py'), 'rb') as f:
+        return int.from_bytes(hashlib.sha1(f.read()).digest()[:7], 'big')
+
+def _load_aot_kernels():
+    """The AOT kernel module, or None if it is missing or built from other sources."""
+    try:
+        aot = importlib.import_module('._sha1e3_aot', __package__)
+    except ImportError:
+        return None
+    if aot.source_tag() != kernel_source_tag():
+        logger.warning(
+            "SHA1-E3 AOT kernels were built from older sources; "
+            "rebuild them with scripts/build_sha1e3_aot.py"
+        )
+        return None
+    return aot
+
+def _kernels():
+    """
+    Compiled kernel module, or None when only the Python code is available.
 
-        # Final S-box pass
-        for i in range(N):
-            result[i] = SBOX_JIT[result[i] & 0xFF]
+    Resolved once per process; importing Numba and loading its cached
+    kernels happens here rather than when this module is imported.
+    """
+    global _KERNELS, _KERNEL_BACKEND
+    if _KERNEL_BACKEND is None:
+        _KERNELS = _load_aot_kernels()
+        _KERNEL_BACKEND = 'aot'
+        if _KERNELS is None:
+            try:
+                _KERNELS = importlib.import_module('.sha1e3_kernels', __package__)
+                _KERNEL_BACKEND = 'jit'
+            except ImportError:
+                _KERNEL_BACKEND = 'python'
+    return _KERNELS
+
+def kernel_backend() -> str:
+    """Which kernels signatures use: 'aot', 'jit' or 'python'."""
+    if not jit_enabled():
+        return 'python'
+    return _KERNEL_BACKEND
+
+def global_mix_fast(buf: bytearray) -> bytearray:
+    kernels = _kernels()
+    if kernels is None:
+        return global_mix(buf)
+    arr = np.frombuffer(bytes(buf), dtype=np.uint8)
+    return bytearray(kernels.global_mix(arr).tobytes())
 
-        # One final global mixing
-        result = _global_mix_jit(result)
+def enhanced_block_mixing_fast(block: bytes, position: int) -> bytes:
+    """Fast compiled version of enhanced_block_mixing."""
+    kernels = _kernels()
+    if kernels is None:
+        return enhanced_block_mixing(block, position)
+    if not isinstance(block, (bytes, bytearray)):
+        block = bytes(block)
+    arr = np.frombuffer(block, dtype=np.uint8)
+    return bytes(kernels.block_mixing(arr, position).tobytes())
 
-        # Additional decorrelation passes
-        for i in range(N):
-            result[i] ^= SBOX_JIT[result[(i*7+3) % N] & 0xFF]
+def enhanced_block_mixing_buffer_fast(data: bytes, start_position: int = 0,
+                                      block_size: int = 64) -> np.ndarray:
+    """
+    Mix all blocks of data in a single compiled call.
 
-        # XOR with reverse position
-        for i in range(N):
-            result[i] ^= result[N-1-i]
+    Returns one uint8 array equal to the concatenation of
+    enhanced_block_mixing_fast(block, start_position + k) for every
+    block_size block of data.
+    """
+    kernels = _kernels()
+    if kernels is None:
+        return enhanced_block_mixing_buffer_numpy(data, start_position, block_size)
+    arr = np.frombuffer(data, dtype=np.uint8)
+    out = np.empty(mixed_buffer_size(arr.size, block_size), dtype=np.uint8)
+    kernels.block_mixing_buffer(arr, block_size, start_position, out)
+    return out
 
-        # Check for long runs and break only if found (simplified for JIT)
-        max_run = 0
-        current_run = 0
-        current_bit = -1
+def strengthened_collatz_sequence_fast(seed: int) -> List[int]:
+    """Fast compiled version of strengthened_collatz_sequence."""
+    kernels = _kernels()
+    if kernels is None:
+        return strengthened_collatz_sequence(seed)
+    # The kernel starts from the low 32 bits of the seed
+    return kernels.collatz_sequence(seed & 0xFFFFFFFF).tolist()
+
+def strengthened_collatz_sequences_fast(seeds: List[int]) -> List[List[int]]:
+    """Fast compiled version of strengthened_collatz_sequences."""
+    kernels = _kernels()
+    if kernels is None:
+        return [strengthened_collatz_sequence(seed) for seed in seeds]
+    seed_arr = np.array([seed & 0xFFFFFFFF for seed in seeds], dtype=np.int64)
+    out = np.zeros((seed_arr.size, COLLATZ_MAX_VALUES), dtype=np.int64)
+    lengths = np.zeros(seed_arr.size, dtype=np.int64)
+    kernels.collatz_batch(seed_arr, out, lengths)
+    return [out[k, :lengths[k]].tolist() for k in range(seed_arr.size)]
+
+# Outcome of jit_self_check (None until the JIT path is first requested)
+_JIT_VERIFIED = None
+
+def jit_self_check(samples: int = 48) -> bool:
+    """
+    Check the compiled kernels (JIT or AOT) against the pure-Python reference.
 
-        for i in range(N * 8):
-            byte_idx = i // 8
-            bit_pos = 7 - (i % 8)
-            bit = (result[byte_idx] >> bit_pos) & 1
+    Runs block mixing on deterministic pseudo-random blocks of every size
+    class (short, padded, partial chunk, full) and positions, whole-buffer
+    mixing, the strengthened Collatz sequence on a few seeds, and the SHA-1
+    compression kernel of the resumable hashers against hashlib.
 
-            if bit == current_bit:
-                current_run += 1
-                max_run = max(max_run, current_run)
-            else:
-                current_bit = bit
-                current_run = 1
+    Returns:
+        True if every output is identical, False otherwise
+    """
+    if not _NUMBA_ENABLED or _kernels() is None:
+        return False
+
+    rng = random.Random(0x5A1E3)
+    try:
+        for k in range(samples):
+            size = (1, 7, 15, 16, 17, 33, 63, 64)[k % 8]
+            block = bytes(rng.getrandbits(8) for _ in range(size))
+            position = rng.getrandbits(31)
+            if enhanced_block_mixing_fast(block, position) != enhanced_block_mixing(block, position):
+                return False
+
+        data = bytes(rng.getrandbits(8) for _ in range(64 * 3 + 21))
+        expected = b''.join(
+            enhanced_block_mixing(data[i:i + 64], k)
+            for k, i in enumerate(range(0, len(data), 64))
+        )
+        if bytes(enhanced_block_mixing_buffer_fast(data)) != expected:
+            return False
 
-        # Simple bit balancing for extreme outliers only
-        for i in range(N):
-            bits = 0
-            for j in range(8):
-                if (result[i] >> j) & 1:
-                    bits += 1
-            if bits > 5 or bits < 3:
-                # Simple balancing - flip one bit
-                result[i] ^= 1
-
-        return result
-
-    def enhanced_block_mixing_fast(block: bytes, position: int) -> bytes:
-        """Fast JIT-compiled version of enhanced_block_mixing."""
-        if not isinstance(block, (bytes, bytearray)):
-            block = bytes(block)
-        arr = np.frombuffer(block, dtype=np.uint8)
-        result = _enhanced_block_mixing_jit(arr, position)
-        return bytes(result.tobytes())
-
-    # JIT-compiled Collatz sequence with eliminated string operations
-    @njit(cache=True)
-    def _strengthened_collatz_sequence_jit(seed: int) -> np.ndarray:
-        """JIT-compiled Collatz sequence without string operations."""
-        sequence = np.zeros(1000, dtype=np.int64)  # Pre-allocate max size
-        seq_len = 0
-        state = seed & 0xFFFFFFFF
-        sequence_length = 0
-
-        # Enhanced mixing constants
-        PRIME1 = 0x6D2B79F5
-        PRIME2 = 0x1234567D
-
-        def mix_state_jit(val: int) -> int:
-            """Optimized mixing with bitwise operations only."""
-            # Initial mixing with controlled rotations
-            val = ((val << 7) | (val >> 25)) & 0xFFFFFFFF
-            val = (val * PRIME1) & 0xFFFFFFFF
-            val = ((val << 13) | (val >> 19)) & 0xFFFFFFFF
-            val = (val * PRIME2) & 0xFFFFFFFF
-
-            # Fast run detection using bitwise operations
-            prev_bit = -1
-            current_run = 0
-            max_run_in_val = 0
-
-            # Check each bit without string conversion
-            for bit_pos in range(32):
-                bit = (val >> (31 - bit_pos)) & 1
-                if bit == prev_bit:
-                    current_run += 1
-                    max_run_in_val = max(max_run_in_val, current_run)
-                else:
-                    current_run = 1
-                prev_bit = bit
-
-            # Break long runs by flipping bits
-            if max_run_in_val > 14:
-                # Simplified run breaking - flip every 7th bit in long runs
-                prev_bit = -1
-                current_run = 0
-                for bit_pos in range(32):
-                    bit = (val >> (31 - bit_pos)) & 1
-                    if bit == prev_bit:
-                        current_run += 1
-                        if current_run > 14 and current_run % 7 == 0:
-                            val ^= (1 << (31 - bit_pos))
-                    else:
-                        current_run = 1
-                    prev_bit = bit
-
-            # Byte-level bit balance using direct bit counting
-            for i in range(0, 32, 8):
-                byte_val = (val >> i) & 0xFF
-                bit_count = 0
-                for j in range(8):
-                    if (byte_val >> j) & 1:
-                        bit_count += 1
-
-                if bit_count < 3:  # Too few bits set
-                    val |= (0x55 << i)  # Add balanced bits
-                elif bit_count > 5:  # Too many bits set
-                    val &= ~(0x55 << i)  # Remove balanced bits
-
-            return val
-
-        # First loop - reduced length for performance
-        while state != 1 and sequence_length < 100:
-            if seq_len >= sequence.size:
-                break
-            sequence[seq_len] = state
-            seq_len += 1
-            sequence_length += 1
-
-            # Store previous state for cycle detection
-            prev_state = state
-
-            # Enhanced state transitions with better bit balance
-            state = mix_state_jit(state)
-            if state % 2 == 0:
-                state = mix_state_jit(state >> 1)
-            else:
-                state = mix_state_jit((3 * state + 1) & 0xFFFFFFFF)
+        for seed in (0, 1, 27, 0xFFFFFFFF, rng.getrandbits(32), rng.getrandbits(32)):
+            if strengthened_collatz_sequence_fast(seed) != strengthened_collatz_sequence(seed):
+                return False
+
+        for size in (0, 55, 64 * 17 + 9):
+            message = bytes(rng.getrandbits(8) for _ in range(size))
+            padded = (message + b'\x80' + b'\x00' * ((55 - size) % 64)
+                      + struct.pack('>Q', size * 8))
+            h = np.array([0x67452301, 0xEFCDAB89, 0x98BADCFE, 0x10325476, 0xC3D2E1F0], dtype=np.int64)
+            _kernels().sha1_compress_blocks(h, np.frombuffer(padded, dtype=np.uint8))
+            if struct.pack('>5I', *(int(x) for x in h)) != hashlib.sha1(message).digest():
+                return False
+    except Exception:
+        return False
+    return True
 
-            # Simple cycle detection without Python set (JIT limitation)
-            # Use modular arithmetic for basic cycle avoidance
-            if state == prev_state:
-                state = mix_state_jit(prev_state ^ sequence_length)
+def jit_enabled() -> bool:
+    """
+    Whether the JIT kernels should be used.
 
-            # Bit balance control
-            for i in range(0, 32, 8):
-                byte_val = (state >> i) & 0xFF
-                bit_count = 0
-                for j in range(8):
-                    if (byte_val >> j) & 1:
-                        bit_count += 1
-                if bit_count < 3 or bit_count > 5:
-                    state ^= (1 << i)  # Flip one bit in problematic byte
-
-        # Return only the used portion
-        return sequence[:seq_len]
-
-    def strengthened_collatz_sequence_fast(seed: int) -> List[int]:
-        """Fast JIT-compiled version of strengthened_collatz_sequence."""
-        result_array = _strengthened_collatz_sequence_jit(seed)
-        return [int(x) for x in result_array]
-
-else:
-    def global_mix_fast(buf: bytearray) -> bytearray:
-        return global_mix(buf)
+    Requires compiled kernels (Numba or the AOT build), SHA1E3_USE_JIT and
+    a passing jit_self_check, which runs once before the first use. On
+    mismatch the Python reference is used for the rest of the process, so
+    signatures never depend on the flag.
+    """
+    global _JIT_VERIFIED
+    if not (_NUMBA_ENABLED and _USE_JIT):
+        return False
+    if _JIT_VERIFIED is None:
+        _JIT_VERIFIED = jit_self_check()
+        if not _JIT_VERIFIED:
+            logger.warning(
+                "SHA1-E3 JIT kernels do not match the Python reference; "
+                "falling back to the reference implementation"
+            )
+    return _JIT_VERIFIED
 
-    def enhanced_block_mixing_fast(block: bytes, position: int) -> bytes:
-        return enhanced_block_mixing(block, position)
+def warmup() -> float:
+    """
+    Load the kernels and run jit_self_check now rather than on first use.
 
-    def strengthened_collatz_sequence_fast(seed: int) -> List[int]:
-        return strengthened_collatz_sequence(seed)
+    Meant for process start-up hooks such as gunicorn's post_fork, so a
+    worker's first request does not pay for importing Numba, loading its
+    cached kernels and checking them. Safe to call more than once.
+
+    Returns:
+        Seconds spent
+    """
+    start = time.perf_counter()
+    enhanced_sha1_signature(bytes(64), show_progress=False)
+    return time.perf_counter() - start
+
+def _has_long_run(val: int) -> bool:
+    """True if the 32-bit value contains a run of more than 14 equal bits."""
+    for v in (val, ~val & 0xFFFFFFFF):
+        t = v & (v >> 1)   # bit i: bits i..i+1 set
+        t &= t >> 2        # bits i..i+3
+        t &= t >> 4        # bits i..i+7
+        if t & (t >> 7):   # bits i..i+14
+            return True
+    return False
+
+def _break_runs_32(val: int) -> int:
+    """Flip every 7th bit inside runs longer than 14 (runs of the input value)."""
+    orig = val
+    run_start = 0
+    for pos in range(1, 33):
+        if pos == 32 or ((orig >> (31 - pos)) & 1) != ((orig >> (31 - run_start)) & 1):
+            length = pos - run_start
+            if length > 14:
+                for j in range(run_start + 7, run_start + length, 7):
+                    val ^= (1 << (31 - j))
+            run_start = pos
+    return val
+
+def _mix_state_bitwise(val: int) -> int:
+    """mix_state of strengthened_collatz_sequence with integer operations only."""
+    val = ((val << 7) | (val >> 25)) & 0xFFFFFFFF
+    val = (val * 0x6D2B79F5) & 0xFFFFFFFF
+    val = ((val << 13) | (val >> 19)) & 0xFFFFFFFF
+    val = (val * 0x1234567D) & 0xFFFFFFFF
+
+    # Long runs are rare: detect them with shifts, walk bits only when present
+    if _has_long_run(val):
+        val = _break_runs_32(val)
+
+    popcount = _POPCOUNT8
+    for i in (0, 8, 16, 24):
+        bit_count = popcount[(val >> i) & 0xFF]
+        if bit_count < 3:
+            val |= (0x55 << i)
+        elif bit_count > 5:
+            val &= ~(0x55 << i)
+    return val
+
+def _balance_word(val: int) -> int:
+    """balance_byte on each of the 4 low bytes, higher bits untouched."""
+    balanced = _BALANCED8
+    return ((val & ~0xFFFFFFFF)
+            | balanced[val & 0xFF]
+            | (balanced[(val >> 8) & 0xFF] << 8)
+            | (balanced[(val >> 16) & 0xFF] << 16)
+            | (balanced[(val >> 24) & 0xFF] << 24))
 
 def strengthened_collatz_sequence(seed: int) -> List[int]:
-    """Enhanced Collatz sequence with improved pattern distribution and run length control."""
+    """
+    Enhanced Collatz sequence with improved pattern distribution and run length control.
+
+    Integer-bitwise implementation: popcounts and balance_byte come from
+    256-entry tables and long runs are found with shift-and-mask, so no
+    per-step string formatting. Output is identical to
+    _strengthened_collatz_sequence_reference.
+    """
+    sequence = []
+    state = seed & 0xFFFFFFFF
+    previous_states = set()
+    popcount = _POPCOUNT8
+    mix_state = _mix_state_bitwise
+    balance_word = _balance_word
+
+    sequence_length = 0
+    while state != 1 and sequence_length < 100:
+        sequence.append(state)
+        sequence_length += 1
+        previous_states.add(state)
+        prev_state = state
+
+        state = mix_state(state)
+        if state % 2 == 0:
+            state = mix_state(state >> 1)
+        else:
+            state = mix_state((3 * state + 1) & 0xFFFFFFFF)
+
+        if state in previous_states:
+            state = mix_state(prev_state ^ sequence_length)
+
+        for i in (0, 8, 16, 24):
+            bit_count = popcount[(state >> i) & 0xFF]
+            if bit_count < 3 or bit_count > 5:
+                state ^= (1 << i)
+
+    sequence_length = 0
+    while state != 1 and sequence_length < 1000:
+        state = balance_word(state)
+
+        sequence.append(state)
+        sequence_length += 1
+        previous_states.add(state)
+        prev_state = state
+
+        if state % 2 == 0:
+            shifted = ((state >> 1) ^ (state << 2)) & 0xFFFFFFFF
+        else:
+            base = (3 * state + 1) & 0xFFFFFFFF
+            shifted = ((base >> 3) ^ (base << 5)) & 0xFFFFFFFF
+        state = balance_word(mix_state(shifted))
+
+        # Periodic pattern breaking with the last 4 values
+        if sequence_length % 4 == 0:
+            history_mix = 0
+            for i, prev in enumerate(sequence[-4:]):
+                history_mix ^= (prev * (0x6D2B79F5, 0x1234567D)[i % 2]) & 0xFFFFFFFF
+            state = balance_word(state ^ history_mix)
+
+        if state in previous_states:
+            new_state = ((prev_state * 0x6D2B79F5) + sequence_length) & 0xFFFFFFFF
+            new_state ^= (sum(sequence[-4:]) if len(sequence) >= 4 else prev_state)
+            state = balance_word(new_state)
+
+        state = mix_state(state)
+
+    return sequence
+
+def strengthened_collatz_sequences(seeds: List[int]) -> List[List[int]]:
+    """
+    strengthened_collatz_sequence for many seeds at once.
+
+    Uses a single JIT call over all seeds when the JIT path is enabled.
+    The per-step cycle check against each seed's own history keeps seeds
+    from advancing in NumPy lockstep, so the batch runs seed by seed inside
+    the kernel.
+    """
+    if jit_enabled():
+        return strengthened_collatz_sequences_fast(seeds)
+    return [strengthened_collatz_sequence(seed) for seed in seeds]
+
+def _strengthened_collatz_sequence_reference(seed: int) -> List[int]:
+    """Original string-based strengthened_collatz_sequence, kept for differential tests."""
     sequence = []
     state = seed & 0xFFFFFFFF
     previous_states = set()
@@ -658,7 +760,12 @@ def finalize_state(state: bytes) -> bytes:
     return result
 
 def enhanced_block_mixing(block: bytes, position: int) -> bytes:
-    """Enhanced block mixing with strong avalanche and minimal balancing."""
+    """
+    Enhanced block mixing with strong avalanche and minimal balancing.
+
+    Pure-Python reference: enhanced_block_mixing_fast must match it bit for
+    bit (see jit_self_check).
+    """
     output_size = max(16, len(block))
     chunk_size = 8  # Larger chunks for better mixing
     
@@ -698,10 +805,7 @@ def enhanced_block_mixing(block: bytes, position: int) -> bytes:
                 chunk[i] ^= rotl(prev_chunk[i], (position + i) & 7)
         
         # Strong initial mixing
-        if _NUMBA_ENABLED and _USE_JIT:
-            chunk = global_mix_fast(chunk)
-        else:
-            chunk = global_mix(chunk)
+        chunk = global_mix(chunk)
         
         # Position-dependent transformations
         for i in range(len(chunk)):
@@ -714,23 +818,15 @@ def enhanced_block_mixing(block: bytes, position: int) -> bytes:
             chunk[i] = x
         
         # Another round of global mixing
-        if _NUMBA_ENABLED and _USE_JIT:
-            chunk = global_mix_fast(chunk)
-        else:
-            chunk = global_mix(chunk)
+        chunk = global_mix(chunk)
         prev_chunk = chunk
         result.extend(chunk)
     
     # Final global mixing passes
     result = result[:output_size]  # Truncate to desired size
-    if _NUMBA_ENABLED and _USE_JIT:
-        result = global_mix_fast(result)  # First pass
-        result = global_mix_fast(result)  # Second pass
-        result = global_mix_fast(result)  # Third pass for stronger avalanche
-    else:
-        result = global_mix(result)  # First pass
-        result = global_mix(result)  # Second pass
-        result = global_mix(result)  # Third pass for stronger avalanche
+    result = global_mix(result)  # First pass
+    result = global_mix(result)  # Second pass
+    result = global_mix(result)  # Third pass for stronger avalanche
     
     # Enhanced cross-byte XOR passes with varied distances and rotations
     N = len(result)
@@ -752,10 +848,7 @@ def enhanced_block_mixing(block: bytes, position: int) -> bytes:
         result[i] = sbox_scramble(result[i])
     
     # One final pass of global mixing to resolve any remaining correlations
-    if _NUMBA_ENABLED and _USE_JIT:
-        result = global_mix_fast(result)
-    else:
-        result = global_mix(result)
+    result = global_mix(result)
     
     # Add permutation-based XOR for stronger decorrelation
     N = len(result)
@@ -853,6 +946,163 @@ def balance_byte(byte: int, target_bits: int = 4) -> int:
         
     return b
 
+
+# Lookup tables for the integer-bitwise Collatz functions, derived from
+# bin().count and balance_byte so they cannot drift from them
+_POPCOUNT8 = bytes(bin(b).count('1') for b in range(256))
+_BALANCED8 = bytes(balance_byte(b, 4) for b in range(256))
+
+# Tables for enhanced_block_mixing_rows
+_PRIMES_NP = np.array(PRIMES, dtype=np.int64)
+_MULTIPLIERS_NP = np.array(MULTIPLIERS, dtype=np.int64)
+_ROTL8_2D = np.stack(_ROTL8_NP)                       # [n, x] -> rotl(x, n)
+# Final gentle balance: balance_byte for bytes with <3 or >5 set bits, identity otherwise
+_FINAL_BALANCE_NP = np.array(
+    [_BALANCED8[b] if not 3 <= _POPCOUNT8[b] <= 5 else b for b in range(256)], dtype=np.uint8
+)
+
+# Rows per enhanced_block_mixing_rows call in enhanced_block_mixing_buffer_numpy;
+# bounds the temporaries to a few MB
+ROWS_BATCH = 8192
+
+def _rows_with_long_runs(rows: np.ndarray, max_run: int = 14) -> np.ndarray:
+    """Indices of rows whose bit string has a run longer than max_run."""
+    bits = np.unpackbits(rows, axis=1)
+    same = (bits[:, 1:] == bits[:, :-1]).astype(np.int32)
+    if same.shape[1] < max_run:
+        return np.empty(0, dtype=np.int64)
+    csum = np.concatenate([np.zeros((rows.shape[0], 1), dtype=np.int32), np.cumsum(same, axis=1)], axis=1)
+    # max_run equal neighbours in a row = a run of max_run + 1 bits
+    window = csum[:, max_run:] - csum[:, :-max_run]
+    return np.flatnonzero((window == max_run).any(axis=1))
+
+def enhanced_block_mixing_rows(blocks: np.ndarray, positions: np.ndarray) -> np.ndarray:
+    """
+    enhanced_block_mixing for a batch of equal-length blocks.
+
+    Args:
+        blocks: (M, L) uint8 array, one block per row
+        positions: M block positions
+
+    Returns:
+        (M, max(16, L)) uint8 array; row m equals
+        enhanced_block_mixing(blocks[m], positions[m])
+
+    Every step of the reference is independent across blocks once the
+    position constants k1/k2/k3 are gathered per row, so each step runs
+    over all rows at once with table lookups.
+    """
+    blocks = np.asarray(blocks, dtype=np.uint8)
+    M, L = blocks.shape
+    pos = np.asarray(positions, dtype=np.int64).reshape(M)
+    ar = np.arange(M)
+    output_size = max(16, L)
+    chunk_size = 8
+    sbox = _SBOX8_NP
+    col = lambda v: v[:, None]
+
+    # Position-dependent constants
+    k1 = _PRIMES_NP[(pos * 3) % len(PRIMES)]
+    k2 = _PRIMES_NP[(pos * 5 + 1) % len(PRIMES)]
+    k3 = _MULTIPLIERS_NP[(pos * 7) % len(MULTIPLIERS)]
+
+    # Position-dependent padding, then chunk padding up to a multiple of 8
+    n_chunks = -(-output_size // chunk_size)
+    buffer = np.empty((M, n_chunks * chunk_size), dtype=np.uint8)
+    buffer[:, :L] = blocks
+    if L < output_size:
+        pad_base = (k1 * k2 + pos) & 0xFF
+        j = np.arange(L, output_size, dtype=np.int64)
+        buffer[:, L:output_size] = sbox[(col(pad_base) + j * col(k3)) & 0xFF]
+    tail = output_size % chunk_size
+    if tail:
+        pad_val = (k1 + (output_size - tail)) & 0xFF
+        for j in range(output_size, n_chunks * chunk_size):
+            pad_val = sbox[(pad_val * k2 + k3) & 0xFF].astype(np.int64)
+            buffer[:, j] = pad_val
+
+    # Chunks with inter-chunk dependencies
+    i8 = np.arange(chunk_size, dtype=np.int64)
+    prev = None
+    for idx in range(n_chunks):
+        chunk = buffer[:, idx * chunk_size:(idx + 1) * chunk_size]
+        if prev is not None:
+            chunk = chunk ^ _ROTL8_2D[(col(pos) + i8) & 7, prev]
+        chunk = global_mix_rows(chunk)
+        x = sbox[chunk]
+        x = _ROTL8_2D[(col(pos) + idx + i8) & 7, x]
+        x = sbox[(x.astype(np.int64) * col(k3) + col(k1)) & 0xFF]
+        chunk = global_mix_rows(x)
+        buffer[:, idx * chunk_size:(idx + 1) * chunk_size] = chunk
+        prev = chunk
+
+    # Final global mixing passes
+    result = global_mix_rows(global_mix_rows(global_mix_rows(buffer[:, :output_size])))
+
+    # Cross-byte XOR passes, column by column in reference order
+    cols = np.array(result, order='F').T
+    N = output_size
+    rotl3, rotl5, rotl4 = _ROTL8_NP[3], _ROTL8_NP[5], _ROTL8_NP[4]
+    for i in range(N):
+        cols[i] ^= rotl3[cols[(i+1)%N]]
+    for i in range(N):
+        cols[i] ^= rotl5[cols[(i+5)%N]]
+    for i in range(N-1, -1, -1):
+        cols[i] ^= rotl4[cols[(i-2)%N]]
+    result = global_mix_rows(sbox[cols.T])
+
+    # Permutation-based XOR and XOR with reverse position
+    cols = np.array(result, order='F').T
+    for i in range(N):
+        cols[i] ^= sbox[cols[(i*7+3)%N]]
+    for i in range(N):
+        cols[i] ^= cols[N-1-i]
+    result = np.ascontiguousarray(cols.T)
+
+    # Inside-out shuffle per row and cross-S-box mixing
+    perm = np.tile(np.arange(N), (M, 1))
+    wide = result.astype(np.int64)
+    for i in range(N-1, 0, -1):
+        j = (wide[:, i] + wide[:, N-1-i]) % (i + 1)
+        pi = perm[:, i].copy()
+        perm[:, i] = perm[ar, j]
+        perm[ar, j] = pi
+    result ^= sbox[result[ar[:, None], perm]]
+
+    # Break long runs (rare) with the scalar routine
+    for m in _rows_with_long_runs(result):
+        result[m] = np.frombuffer(break_long_runs(result[m].tobytes()), dtype=np.uint8)
+
+    # Very gentle final balance
+    return _FINAL_BALANCE_NP[result]
+
+def enhanced_block_mixing_buffer_numpy(data, start_position: int = 0, block_size: int = 64) -> np.ndarray:
+    """
+    enhanced_block_mixing_buffer_fast without Numba.
+
+    Whole blocks go through enhanced_block_mixing_rows in batches of
+    ROWS_BATCH; a trailing partial block uses the scalar reference.
+    """
+    arr = np.frombuffer(data, dtype=np.uint8)
+    out = np.empty(mixed_buffer_size(arr.size, block_size), dtype=np.uint8)
+    full = arr.size // block_size
+    width = max(16, block_size)
+    rows = arr[:full * block_size].reshape(full, block_size)
+    for first in range(0, full, ROWS_BATCH):
+        last = min(full, first + ROWS_BATCH)
+        positions = np.arange(start_position + first, start_position + last, dtype=np.int64)
+        out[first * width:last * width] = enhanced_block_mixing_rows(rows[first:last], positions).reshape(-1)
+    if arr.size > full * block_size:
+        tail = enhanced_block_mixing(arr[full * block_size:].tobytes(), start_position + full)
+        out[full * width:] = np.frombuffer(tail, dtype=np.uint8)
+    return out
+
+def enhanced_block_mixing_buffer(data, start_position: int = 0, block_size: int = 64) -> np.ndarray:
+    """Mix every block of data with the JIT kernel when verified, else the NumPy rows engine."""
+    if jit_enabled():
+        return enhanced_block_mixing_buffer_fast(data, start_position, block_size)
+    return enhanced_block_mixing_buffer_numpy(data, start_position, block_size)
+
 def mix_bytes(a: int, b: int, salt: int) -> tuple[int, int]:
         """Optimized byte mixing with fast Feistel network."""
         # Initial mixing with prime multipliers
@@ -872,106 +1122,132 @@ def mix_bytes(a: int, b: int, salt: int) -> tuple[int, int]:
         
         return x, y
 
-def enhanced_sha1_signature(data: bytes, show_progress: bool = True) -> str:
-    """Generate enhanced SHA1 signature using sponge construction and Collatz mixing."""
-    import time
-    start_time = time.time()
-    
-    # Initialize SHA-1 hasher
-    sha1 = hashlib.sha1()
-    
-    # Progress tracking
-    total_blocks = (len(data) + 63) // 64  # Round up to nearest block
-    if show_progress:
-        print(f"\nProcessing {len(data)} bytes in {total_blocks} blocks")
-    
-    # Process data in blocks
-    block_size = 64  # SHA-1 block size
-    position = 0
-    block_time = 0
-    collatz_time = 0
-    finalize_time = 0
-    
-    # Process each block with enhanced mixing
-    block_start = time.time()
-    blocks_processed = 0
-    estimated_time = None
-    
-    for i in range(0, len(data), block_size):
-        block_process_start = time.time()
-        block = data[i:i + block_size]
-        # Apply enhanced block mixing (use fast version if available)
-        if _NUMBA_ENABLED and _USE_JIT:
-            mixed_block = enhanced_block_mixing_fast(block, position)
-        else:
-            mixed_block = enhanced_block_mixing(block, position)
-        # Update SHA-1 state
-        sha1.update(mixed_block)
-        position += 1
-        blocks_processed += 1
-        
-        if show_progress and blocks_processed % max(1, total_blocks // 10) == 0:
-            block_time = time.time() - block_process_start
-            if estimated_time is None:
-                estimated_time = block_time * total_blocks
-                print(f"\nEstimated total time: {estimated_time:.1f} seconds")
-            
-            progress = blocks_processed / total_blocks * 100
-            elapsed = time.time() - start_time
-            remaining = (estimated_time - elapsed) if estimated_time else "unknown"
-            print(f"Progress: {progress:.1f}% ({blocks_processed}/{total_blocks} blocks) - {remaining:.1f}s remaining")
-    block_time = time.time() - block_start
-    
-    # Get base SHA-1 digest
-    base_digest = sha1.hexdigest()
-    
-    # Generate Collatz sequence using base digest (use fast version if available)
-    collatz_start = time.time()
+@dataclass
+class SignatureStats:
+    """Per-phase timings of one SHA1-E3 signature."""
+    data_bytes: int = 0
+    blocks: int = 0
+    workers: int = 1
+    mixing_seconds: float = 0.0
+    collatz_seconds: float = 0.0
+    finalize_seconds: float = 0.0
+    total_seconds: float = 0.0
+
+    @property
+    def throughput_mbps(self) -> float:
+        if self.total_seconds <= 0:
+            return 0.0
+        return (self.data_bytes / (1024 * 1024)) / self.total_seconds
+
+# Receives the timings of a signature: a SignatureStats to fill in, or a callback
+StatsSink = Union[SignatureStats, Callable[[SignatureStats], None], None]
+
+def _report_stats(stats: StatsSink, result: SignatureStats) -> None:
+    """Deliver result to the caller's SignatureStats or callback."""
+    if stats is None:
+        return
+    if isinstance(stats, SignatureStats):
+        for field in fields(result):
+            setattr(stats, field.name, getattr(result, field.name))
+    else:
+        stats(result)
+
+def _print_stats(title: str, result: SignatureStats) -> None:
+    """Print the performance breakdown of a signature."""
+    print(title)
+    if result.workers > 1:
+        print(f"Workers used: {result.workers}")
+    print(f"Block mixing: {result.mixing_seconds:.4f}s")
+    print(f"Collatz sequence: {result.collatz_seconds:.4f}s")
+    print(f"Finalization: {result.finalize_seconds:.4f}s")
+    print(f"Total time: {result.total_seconds:.4f}s")
+    print(f"Throughput: {result.throughput_mbps:.2f} MB/s")
+
+def _print_progress(blocks_processed: int, total_blocks: int, elapsed: float) -> None:
+    """Print progress with a remaining-time estimate extrapolated from elapsed time."""
+    progress = blocks_processed / max(1, total_blocks)
+    remaining = elapsed / progress - elapsed if progress > 0 else 0.0
+    print(f"Progress: {progress * 100:.1f}% ({blocks_processed}/{total_blocks} blocks) - {remaining:.1f}s remaining")
+
+def _finalize_base_digest(base_digest: str, result: SignatureStats | None = None) -> bytes:
+    """Collatz mixing and final decorrelation of a base SHA-1 hex digest."""
+    collatz_start = time.perf_counter()
     seed = int(base_digest[:8], 16)
-    if _NUMBA_ENABLED and _USE_JIT:
+    if jit_enabled():
         sequence = strengthened_collatz_sequence_fast(seed)
     else:
         sequence = strengthened_collatz_sequence(seed)
-    collatz_time = time.time() - collatz_start
-    
-    # Regular mixing using sequence
+
     mixed_hash = bytearray.fromhex(base_digest)
     for i, val in enumerate(sequence[:8]):  # Use first 8 values
         idx = i * 2
         if idx + 1 < len(mixed_hash):
             mixed_hash[idx], mixed_hash[idx + 1] = mix_bytes(
-                mixed_hash[idx], 
+                mixed_hash[idx],
                 mixed_hash[idx + 1],
                 val & 0xFF
             )
-    
-    # Final SHA-256 based decorrelation
-    finalize_start = time.time()
+
+    finalize_start = time.perf_counter()
     final_hash = finalize_state(mixed_hash)
-    finalize_time = time.time() - finalize_start
-    
-    total_time = time.time() - start_time
-    print(f"Performance breakdown:")
-    print(f"Block mixing: {block_time:.4f}s")
-    print(f"Collatz sequence: {collatz_time:.4f}s")
-    print(f"Finalization: {finalize_time:.4f}s")
-    print(f"Total time: {total_time:.4f}s")
+    if result is not None:
+        result.collatz_seconds = finalize_start - collatz_start
+        result.finalize_seconds = time.perf_counter() - finalize_start
+    return final_hash
+
+def enhanced_sha1_signature(data: bytes, show_progress: bool = True, stats: StatsSink = None) -> str:
+    """
+    Generate enhanced SHA1 signature using sponge construction and Collatz mixing.
+
+    Nothing is printed unless show_progress is set. Per-phase timings are
+    delivered to stats, either a SignatureStats to fill in or a callable
+    taking one.
+    """
+    start_time = time.perf_counter()
+
+    # Initialize SHA-1 hasher
+    sha1 = hashlib.sha1()
+
+    # Progress tracking
+    total_blocks = (len(data) + 63) // 64  # Round up to nearest block
+    if show_progress:
+        print(f"\nProcessing {len(data)} bytes in {total_blocks} blocks")
+
+    # Process data in blocks
+    block_size = 64  # SHA-1 block size
+    position = 0
+
+    # Process each block with enhanced mixing: one fused call (JIT kernel or
+    # NumPy rows engine) and one SHA-1 update per segment
+    view = memoryview(data).cast('B')
+    for i in range(0, len(data), FUSED_SEGMENT_BYTES):
+        segment = view[i:i + FUSED_SEGMENT_BYTES]
+        mixed = enhanced_block_mixing_buffer(segment, position, block_size)
+        sha1.update(memoryview(mixed))
+        position += (len(segment) + block_size - 1) // block_size
+        if show_progress:
+            _print_progress(position, total_blocks, time.perf_counter() - start_time)
+
+    result = SignatureStats(data_bytes=len(data), blocks=total_blocks)
+    result.mixing_seconds = time.perf_counter() - start_time
+
+    final_hash = _finalize_base_digest(sha1.hexdigest(), result)
+
+    result.total_seconds = time.perf_counter() - start_time
+    if show_progress:
+        _print_stats("Performance breakdown:", result)
+    _report_stats(stats, result)
 
     return final_hash.hex()
 
-def enhanced_sha1_signature_extreme_parallel(data: bytes, show_progress: bool = True, max_workers: int = None) -> str:
+def enhanced_sha1_signature_extreme_parallel(data: bytes, show_progress: bool = True, max_workers: int = None,
+                                             stats: StatsSink = None) -> str:
     """Ultra-high performance parallel SHA1-E3 with massive CPU parallelization."""
-    import time
-    import concurrent.futures
-    import threading
-    from queue import Queue
-    import os
-
-    start_time = time.time()
+    start_time = time.perf_counter()
 
     # Use all available cores by default
     if max_workers is None:
-        max_workers = os.cpu_count()
+        max_workers = os.cpu_count() or 1
 
     # Initialize SHA-1 hasher
     sha1 = hashlib.sha1()
@@ -982,14 +1258,7 @@ def enhanced_sha1_signature_extreme_parallel(data: bytes, show_progress: bool =
         print(f"\nExtreme Parallel Processing: {len(data)} bytes in {total_blocks} blocks using {max_workers} cores")
 
     block_size = 64
-    block_time = 0
-    collatz_time = 0
-    finalize_time = 0
-
-    # Process blocks in massive parallel batches
-    block_start = time.time()
     blocks_processed = 0
-    estimated_time = None
 
     # Create work batches for optimal CPU utilization
     batch_size = max(1, total_blocks // (max_workers * 4))  # 4 batches per worker for load balancing
@@ -998,11 +1267,7 @@ def enhanced_sha1_signature_extreme_parallel(data: bytes, show_progress: bool =
         """Process a batch of blocks in parallel."""
         batch_results = []
         for position, block in batch_data:
-            if _NUMBA_ENABLED and _USE_JIT:
-                mixed_block = enhanced_block_mixing_fast(block, position)
-            else:
-                mixed_block = enhanced_block_mixing(block, position)
-            batch_results.append((position, mixed_block))
+            batch_results.append((position, _mix_block(block, position)))
         return batch_results
 
     # Create batches of work
@@ -1037,370 +1302,422 @@ def enhanced_sha1_signature_extreme_parallel(data: bytes, show_progress: bool =
             batch_idx = future_to_batch[future]
             try:
                 batch_results = future.result()
-                for pos, mixed_block in batch_results:
-                    mixed_blocks[pos] = mixed_block
-                    blocks_processed += 1
-
-                    if show_progress and blocks_processed % max(1, total_blocks // 10) == 0:
-                        if estimated_time is None:
-                            elapsed = time.time() - block_start
-                            estimated_time = elapsed * total_blocks / blocks_processed
-                            print(f"\nEstimated total time: {estimated_time:.1f} seconds")
-
-                        progress = blocks_processed / total_blocks * 100
-                        elapsed = time.time() - start_time
-                        remaining = (estimated_time - elapsed) if estimated_time else 0
-                        print(f"Progress: {progress:.1f}% ({blocks_processed}/{total_blocks} blocks) - {remaining:.1f}s remaining")
-
             except Exception as e:
-                print(f"Error processing batch {batch_idx}: {e}")
+                logger.warning("Error processing batch %d: %s", batch_idx, e)
                 # Fallback to sequential processing for this batch
-                batch = [work_batches[batch_idx]]
-                batch_results = process_block_batch(batch[0])
-                for pos, mixed_block in batch_results:
-                    mixed_blocks[pos] = mixed_block
-                    blocks_processed += 1
+                batch_results = process_block_batch(work_batches[batch_idx])
+            for pos, mixed_block in batch_results:
+                mixed_blocks[pos] = mixed_block
+            blocks_processed += len(batch_results)
+
+            if show_progress:
+                _print_progress(blocks_processed, total_blocks, time.perf_counter() - start_time)
 
     # Apply mixed blocks to SHA-1 in order (this maintains hash consistency)
     for mixed_block in mixed_blocks:
         if mixed_block is not None:
             sha1.update(mixed_block)
 
-    block_time = time.time() - block_start
-
-    # Get base SHA-1 digest
-    base_digest = sha1.hexdigest()
+    result = SignatureStats(data_bytes=len(data), blocks=total_blocks, workers=max_workers)
+    result.mixing_seconds = time.perf_counter() - start_time
 
-    # Generate Collatz sequence using base digest (use fast version if available)
-    collatz_start = time.time()
-    seed = int(base_digest[:8], 16)
-    if _NUMBA_ENABLED and _USE_JIT:
-        sequence = strengthened_collatz_sequence_fast(seed)
-    else:
-        sequence = strengthened_collatz_sequence(seed)
-    collatz_time = time.time() - collatz_start
+    final_hash = _finalize_base_digest(sha1.hexdigest(), result)
 
-    # Regular mixing using sequence
-    mixed_hash = bytearray.fromhex(base_digest)
-    for i, val in enumerate(sequence[:8]):  # Use first 8 values
-        idx = i * 2
-        if idx + 1 < len(mixed_hash):
-            mixed_hash[idx], mixed_hash[idx + 1] = mix_bytes(
-                mixed_hash[idx],
-                mixed_hash[idx + 1],
-                val & 0xFF
-            )
-
-    # Final decorrelation
-    finalize_start = time.time()
-    final_hash = finalize_state(mixed_hash)
-    finalize_time = time.time() - finalize_start
-
-    total_time = time.time() - start_time
-    throughput_mbps = (len(data) / (1024 * 1024)) / total_time if total_time > 0 else 0
-
-    print(f"Extreme Parallel Performance:")
-    print(f"Workers used: {max_workers}")
-    print(f"Block mixing: {block_time:.4f}s")
-    print(f"Collatz sequence: {collatz_time:.4f}s")
-    print(f"Finalization: {finalize_time:.4f}s")
-    print(f"Total time: {total_time:.4f}s")
-    print(f"Throughput: {throughput_mbps:.2f} MB/s")
-
-    return final_hash.hex()
-
-def enhanced_sha1_signature_vectorized_extreme(data: bytes, show_progress: bool = True, max_workers: int = None) -> str:
-    """Ultra-extreme performance with vectorization and memory optimization."""
-    import time
-    import concurrent.futures
-    import os
-
-    start_time = time.time()
-
-    # Use all available cores
-    if max_workers is None:
-        max_workers = os.cpu_count()
-
-    # Initialize SHA-1 hasher
-    sha1 = hashlib.sha1()
-
-    # Progress tracking
-    total_blocks = (len(data) + 63) // 64
+    result.total_seconds = time.perf_counter() - start_time
     if show_progress:
-        print(f"\nVectorized Extreme Processing: {len(data)} bytes in {total_blocks} blocks using {max_workers} cores")
-
-    block_size = 64
-    block_time = 0
-    collatz_time = 0
-    finalize_time = 0
-
-    # Optimized block processing with vectorization
-    block_start = time.time()
-    blocks_processed = 0
-    estimated_time = None
-
-    # Create larger work batches for better vectorization
-    batch_size = max(64, total_blocks // max_workers)  # Larger batches for vectorization
-
-    def process_vectorized_batch(batch_data):
-        """Process blocks with vectorized operations."""
-        if not batch_data:
-            return []
-
-        batch_results = []
-
-        # Process multiple blocks simultaneously with NumPy vectorization
-        positions = [pos for pos, _ in batch_data]
-        blocks = [block for _, block in batch_data]
-
-        # Vectorized processing where possible
-        for i, (position, block) in enumerate(zip(positions, blocks)):
-            # Use the fastest available method
-            if _NUMBA_ENABLED and _USE_JIT:
-                # Create NumPy array for vectorized operations
-                block_array = np.frombuffer(block, dtype=np.uint8)
-                if len(block_array) < 16:
-                    # Pad small blocks for vectorization
-                    padded = np.zeros(16, dtype=np.uint8)
-                    padded[:len(block_array)] = block_array
-                    block_array = padded
-
-                # Use JIT-compiled vectorized version
-                mixed_block = enhanced_block_mixing_fast(bytes(block_array), position)
-            else:
-                mixed_block = enhanced_block_mixing(block, position)
-
-            batch_results.append((position, mixed_block))
-
-        return batch_results
-
-    # Create optimized work batches
-    work_batches = []
-    current_batch = []
-    position = 0
-
-    for i in range(0, len(data), block_size):
-        block = data[i:i + block_size]
-        current_batch.append((position, block))
-        position += 1
-
-        if len(current_batch) >= batch_size:
-            work_batches.append(current_batch)
-            current_batch = []
+        _print_stats("Extreme Parallel Performance:", result)
+    _report_stats(stats, result)
 
-    if current_batch:
-        work_batches.append(current_batch)
+    return final_hash.hex()
 
-    # Process with optimized thread pool
-    mixed_blocks = [None] * total_blocks
+def _warm_worker() -> None:
+    """Worker initializer: load the JIT kernels once, when the process starts."""
+    if jit_enabled():
+        enhanced_block_mixing_buffer_fast(bytes(64))
+        strengthened_collatz_sequence_fast(1)
 
-    # Use ProcessPoolExecutor for CPU-intensive work (better for ARM)
-    with concurrent.futures.ProcessPoolExecutor(max_workers=max_workers) as executor:
-        # Submit all batches
-        future_to_batch = {}
-        for batch_idx, batch in enumerate(work_batches):
-            future = executor.submit(process_vectorized_batch, batch)
-            future_to_batch[future] = batch_idx
+class SHA1E3WorkerPool:
+    """
+    Long-lived process pool for SHA1-E3 block mixing.
+
+    Worker processes are started lazily on first use, warmed once (Numba
+    kernels loaded and self-checked) and then reused by every call, instead
+    of paying process start-up and JIT load on each hash. At most
+    max_in_flight tasks are queued or running at once; submit() blocks
+    until a slot is free.
+
+    Workers come from a forkserver where the platform has one (otherwise
+    the default start method). Workers are started lazily, possibly while
+    the pipelined file reader or a web server's threads are running; a
+    forkserver child is forked from a single-threaded server process, so
+    it cannot inherit a lock one of those threads holds.
+
+    A pool broken by a dying worker (e.g. OOM-killed) is replaced on the
+    next submit, so one lost worker does not stop hashing in the process.
+    """
 
-        # Collect results
-        for future in concurrent.futures.as_completed(future_to_batch):
-            batch_idx = future_to_batch[future]
+    START_METHOD = 'forkserver' if 'forkserver' in multiprocessing.get_all_start_methods() else None
+
+    def __init__(self, max_workers: int | None = None, max_in_flight: int | None = None):
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.max_in_flight = max_in_flight or self.max_workers * 4
+        if self.max_workers < 1:
+            raise ValueError("max_workers must be at least 1")
+        if self.max_in_flight < 1:
+            raise ValueError("max_in_flight must be at least 1")
+
+        self._executor = None
+        self._lock = threading.Lock()
+        self._slots = threading.BoundedSemaphore(self.max_in_flight)
+        self.starts = 0
+
+    @property
+    def running(self) -> bool:
+        return self._executor is not None
+
+    def _ensure_started(self):
+        with self._lock:
+            if self._executor is None:
+                self._executor = concurrent.futures.ProcessPoolExecutor(
+                    max_workers=self.max_workers, initializer=_warm_worker,
+                    mp_context=multiprocessing.get_context(self.START_METHOD)
+                )
+                self.starts += 1
+            return self._executor
+
+    def _replace_broken(self, executor) -> None:
+        """Drop executor if it is still the current one, so the next submit starts a new one."""
+        with self._lock:
+            if self._executor is not executor:
+                return
+            self._executor = None
+        logger.warning("SHA1-E3 worker pool is broken (a worker died); starting new workers")
+        executor.shutdown(wait=False)
+
+    def submit(self, fn, *args):
+        """
+        Submit fn(*args), waiting while max_in_flight tasks are outstanding.
+
+        If a worker died and broke the pool, the pool is replaced and the
+        task submitted once more to the new workers. Tasks that were already
+        running on the broken pool still fail with BrokenProcessPool.
+        """
+        self._slots.acquire()
+        try:
+            executor = self._ensure_started()
             try:
-                batch_results = future.result()
-                for pos, mixed_block in batch_results:
-                    mixed_blocks[pos] = mixed_block
-                    blocks_processed += 1
-
-                    if show_progress and blocks_processed % max(1, total_blocks // 10) == 0:
-                        if estimated_time is None:
-                            elapsed = time.time() - block_start
-                            estimated_time = elapsed * total_blocks / blocks_processed
-                            print(f"\nEstimated total time: {estimated_time:.1f} seconds")
-
-                        progress = blocks_processed / total_blocks * 100
-                        elapsed = time.time() - start_time
-                        remaining = (estimated_time - elapsed) if estimated_time else 0
-                        print(f"Progress: {progress:.1f}% ({blocks_processed}/{total_blocks} blocks) - {remaining:.1f}s remaining")
-
-            except Exception as e:
-                print(f"Error processing batch {batch_idx}: {e}")
-                # Fallback processing
-                batch = work_batches[batch_idx]
-                batch_results = process_vectorized_batch(batch)
-                for pos, mixed_block in batch_results:
-                    mixed_blocks[pos] = mixed_block
-                    blocks_processed += 1
-
-    # Apply mixed blocks to SHA-1 in order
-    for mixed_block in mixed_blocks:
-        if mixed_block is not None:
-            sha1.update(mixed_block)
-
-    block_time = time.time() - block_start
+                future = executor.submit(fn, *args)
+            except BrokenProcessPool:
+                self._replace_broken(executor)
+                future = self._ensure_started().submit(fn, *args)
+        except BaseException:
+            self._slots.release()
+            raise
+        future.add_done_callback(lambda _: self._slots.release())
+        return future
+
+    def submit_ordered(self, fn, *iterables):
+        """
+        Yield futures of fn over zipped iterables, in input order.
+
+        At most max_in_flight futures are submitted ahead of the one being
+        yielded, so large inputs are consumed lazily.
+        """
+        pending = deque()
+        for args in zip(*iterables):
+            if len(pending) >= self.max_in_flight:
+                yield pending.popleft()
+            pending.append(self.submit(fn, *args))
+        while pending:
+            yield pending.popleft()
+
+    def map(self, fn, *iterables):
+        """Like Executor.map, with bounded read-ahead."""
+        for future in self.submit_ordered(fn, *iterables):
+            yield future.result()
+
+    def shutdown(self, wait: bool = True) -> None:
+        """Stop the worker processes; the next submit starts new ones."""
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=wait)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.shutdown()
+
+_worker_pool = None
+_worker_pool_lock = threading.Lock()
+
+def get_worker_pool() -> SHA1E3WorkerPool:
+    """The process-wide SHA1-E3 worker pool, sized by SHA1E3_WORKERS (default: all cores)."""
+    global _worker_pool
+    with _worker_pool_lock:
+        if _worker_pool is None:
+            _worker_pool = SHA1E3WorkerPool(int(os.getenv('SHA1E3_WORKERS', '0')) or None)
+            atexit.register(shutdown_worker_pool)
+        return _worker_pool
+
+def shutdown_worker_pool() -> None:
+    """Shut down the process-wide worker pool, if it was started."""
+    if _worker_pool is not None:
+        _worker_pool.shutdown()
+
+@contextlib.contextmanager
+def _worker_pool_for(max_workers: int | None):
+    """The shared warm pool, or a pool owned by this call for other worker counts."""
+    pool = get_worker_pool()
+    if max_workers is None or max_workers == pool.max_workers:
+        yield pool
+    else:
+        with SHA1E3WorkerPool(max_workers) as own_pool:
+            yield own_pool
+
+# Blocks per shared-memory work range: large enough that a worker spends its
+# time in the mixing kernel rather than attaching segments and scheduling
+SHARED_RANGE_BLOCKS = 16384
+
+def _mix_range_into(data, start_position: int, out: np.ndarray, block_size: int = 64) -> None:
+    """Mix every block of data into the uint8 array out (sized by mixed_buffer_size)."""
+    if jit_enabled():
+        _kernels().block_mixing_buffer(np.frombuffer(data, dtype=np.uint8),
+                                       block_size, start_position, out)
+        return
+    out[:] = enhanced_block_mixing_buffer_numpy(data, start_position, block_size)
+
+def _shared_range_bounds(data_size: int, first_block: int, block_count: int,
+                         block_size: int = 64) -> tuple[int, int, int, int]:
+    """Input and output byte ranges of blocks [first_block, first_block + block_count)."""
+    in_start = first_block * block_size
+    in_end = min(data_size, in_start + block_count * block_size)
+    out_start = mixed_buffer_size(in_start, block_size)
+    out_end = out_start + mixed_buffer_size(in_end - in_start, block_size)
+    return in_start, in_end, out_start, out_end
+
+# Worker is top-level so it can be pickled by multiprocessing; only segment
+# names and block ranges cross the process boundary
+def _mix_shared_range(input_name: str, output_name: str, data_size: int,
+                      first_block: int, block_count: int) -> int:
+    """Worker: mix a block range of a shared input segment into a shared output segment."""
+    in_start, in_end, out_start, out_end = _shared_range_bounds(data_size, first_block, block_count)
+    src = shared_memory.SharedMemory(name=input_name)
+    dst = shared_memory.SharedMemory(name=output_name)
+    # Read-only, so the kernel reuses the specialization jit_self_check compiled
+    data = src.buf[in_start:in_end].toreadonly()
+    out = np.ndarray((out_end - out_start,), dtype=np.uint8, buffer=dst.buf, offset=out_start)
+    try:
+        _mix_range_into(data, first_block, out)
+    finally:
+        # Views must be gone before the segments can be closed
+        del out
+        data.release()
+        src.close()
+        dst.close()
+    return block_count
+
+def _mix_shared_parallel(input_shm, data_size: int, max_workers: int | None,
+                         show_progress: bool = True):
+    """
+    Mix a shared input segment across worker processes and hash it.
 
-    # Get base SHA-1 digest
-    base_digest = sha1.hexdigest()
+    Workers receive (first_block, block_count) ranges and write their mixed
+    blocks in place into a shared output segment. Ranges are consumed in
+    submission order, so SHA-1 sees exactly the serial byte stream.
 
-    # Generate Collatz sequence using base digest
-    collatz_start = time.time()
-    seed = int(base_digest[:8], 16)
-    if _NUMBA_ENABLED and _USE_JIT:
-        sequence = strengthened_collatz_sequence_fast(seed)
-    else:
-        sequence = strengthened_collatz_sequence(seed)
-    collatz_time = time.time() - collatz_start
+    Returns:
+        The SHA-1 object updated with every mixed block
+    """
+    start_time = time.perf_counter()
+    sha1 = hashlib.sha1()
+    total_blocks = (data_size + 63) // 64
+    if total_blocks == 0:
+        return sha1
+
+    output_shm = shared_memory.SharedMemory(create=True, size=mixed_buffer_size(data_size))
+    try:
+        def feed(first_block, block_count):
+            _, _, out_start, out_end = _shared_range_bounds(data_size, first_block, block_count)
+            sha1.update(output_shm.buf[out_start:out_end])
+
+        def ranges(workers):
+            range_blocks = min(SHARED_RANGE_BLOCKS, max(1, -(-total_blocks // (workers * 4))))
+            return [(first, min(range_blocks, total_blocks - first))
+                    for first in range(0, total_blocks, range_blocks)]
+
+        if max_workers is not None and max_workers <= 1:
+            for first_block, block_count in ranges(1):
+                _mix_shared_range(input_shm.name, output_shm.name, data_size, first_block, block_count)
+                feed(first_block, block_count)
+            return sha1
+
+        blocks_processed = 0
+        with _worker_pool_for(max_workers) as pool:
+            work = ranges(pool.max_workers)
+            futures = pool.submit_ordered(
+                _mix_shared_range,
+                [input_shm.name] * len(work), [output_shm.name] * len(work), [data_size] * len(work),
+                [first for first, _ in work], [count for _, count in work],
+            )
+            for (first_block, block_count), future in zip(work, futures):
+                try:
+                    future.result()
+                except Exception as e:
+                    logger.warning("Error processing blocks %d-%d: %s",
+                                   first_block, first_block + block_count - 1, e)
+                    # Fallback: mix the range in this process
+                    _mix_shared_range(input_shm.name, output_shm.name, data_size, first_block, block_count)
+                feed(first_block, block_count)
+
+                blocks_processed += block_count
+                if show_progress:
+                    _print_progress(blocks_processed, total_blocks, time.perf_counter() - start_time)
+        return sha1
+    finally:
+        output_shm.close()
+        output_shm.unlink()
+
+def _signature_from_shared_input(input_shm, data_size: int, show_progress: bool,
+                                 max_workers: int | None, label: str, stats: StatsSink = None) -> str:
+    """Shared-memory multi-process SHA1-E3 over an already filled input segment."""
+    start_time = time.perf_counter()
+    if max_workers is None:
+        max_workers = get_worker_pool().max_workers
+    total_blocks = (data_size + 63) // 64
+    if show_progress:
+        print(f"\n{label}: {data_size} bytes in {total_blocks} blocks using {max_workers} cores")
 
-    # Vectorized mixing using sequence
-    mixed_hash = bytearray.fromhex(base_digest)
+    sha1 = _mix_shared_parallel(input_shm, data_size, max_workers, show_progress)
 
-    # Vectorized byte mixing where possible
-    if len(sequence) >= 8:
-        # Process 8 operations simultaneously
-        for i in range(0, min(8, len(mixed_hash) // 2)):
-            val = sequence[i] & 0xFF
-            idx = i * 2
-            if idx + 1 < len(mixed_hash):
-                # Vectorized mixing operation
-                a, b = mixed_hash[idx], mixed_hash[idx + 1]
-                mixed_hash[idx], mixed_hash[idx + 1] = mix_bytes(a, b, val)
-
-    # Final decorrelation with vectorization
-    finalize_start = time.time()
-    final_hash = finalize_state(mixed_hash)
-    finalize_time = time.time() - finalize_start
+    result = SignatureStats(data_bytes=data_size, blocks=total_blocks, workers=max_workers)
+    result.mixing_seconds = time.perf_counter() - start_time
 
-    total_time = time.time() - start_time
-    throughput_mbps = (len(data) / (1024 * 1024)) / total_time if total_time > 0 else 0
+    final_hash = _finalize_base_digest(sha1.hexdigest(), result)
 
-    print(f"Vectorized Extreme Performance:")
-    print(f"Workers used: {max_workers}")
-    print(f"Block mixing: {block_time:.4f}s")
-    print(f"Collatz sequence: {collatz_time:.4f}s")
-    print(f"Finalization: {finalize_time:.4f}s")
-    print(f"Total time: {total_time:.4f}s")
-    print(f"Throughput: {throughput_mbps:.2f} MB/s")
+    result.total_seconds = time.perf_counter() - start_time
+    if show_progress:
+        _print_stats("Vectorized Extreme Performance:", result)
+    _report_stats(stats, result)
 
     return final_hash.hex()
 
-# Memory-optimized streaming version for large files
-def enhanced_sha1_signature_file_vectorized_extreme(file_path: str, show_progress: bool = True, max_workers: int = None) -> str:
-    """Ultra-extreme performance file processing with memory optimization."""
-    import time
-    import os
-    import mmap
-    import concurrent.futures
-
-    start_time = time.time()
+def enhanced_sha1_signature_vectorized_extreme(data: bytes, show_progress: bool = True, max_workers: int = None,
+                                               stats: StatsSink = None) -> str:
+    """
+    Multi-process SHA1-E3 over shared memory.
 
-    if max_workers is None:
-        max_workers = os.cpu_count()
+    The input is copied once into a shared memory segment; worker processes
+    mix block ranges of it into a shared output segment, which is fed to
+    SHA-1 in order. The signature equals enhanced_sha1_signature(data).
+    """
+    input_shm = shared_memory.SharedMemory(create=True, size=max(1, len(data)))
+    try:
+        input_shm.buf[:len(data)] = memoryview(data).cast('B')
+        return _signature_from_shared_input(input_shm, len(data), show_progress, max_workers,
+                                            "Vectorized Extreme Processing", stats)
+    finally:
+        input_shm.close()
+        input_shm.unlink()
 
-    # Use memory mapping for faster file access
+# Memory-optimized streaming version for large files
+def enhanced_sha1_signature_file_vectorized_extreme(file_path: str, show_progress: bool = True, max_workers: int = None,
+                                                    stats: StatsSink = None) -> str:
+    """Multi-process SHA1-E3 for a file, read straight into shared memory."""
     file_size = os.path.getsize(file_path)
-
-    if show_progress:
-        print(f"\nVectorized File Processing: {file_path} ({file_size} bytes) using {max_workers} cores")
-
-    # Memory-mapped file processing for extreme speed
-    with open(file_path, 'rb') as f:
-        if file_size > 0:
-            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mmapped_file:
-                # Process memory-mapped data
-                data = mmapped_file[:]
-                return enhanced_sha1_signature_vectorized_extreme(data, show_progress, max_workers)
-        else:
-            return enhanced_sha1_signature_vectorized_extreme(b'', show_progress, max_workers)
+    input_shm = shared_memory.SharedMemory(create=True, size=max(1, file_size))
+    try:
+        with open(file_path, 'rb') as f:
+            view = input_shm.buf[:file_size]
+            filled = 0
+            while filled < file_size:
+                n = f.readinto(view[filled:])
+                if not n:
+                    break
+                filled += n
+            view.release()
+        return _signature_from_shared_input(input_shm, filled, show_progress, max_workers,
+                                            f"Vectorized File Processing {file_path}", stats)
+    finally:
+        input_shm.close()
+        input_shm.unlink()
 
 def verify_signature(data: bytes, signature: str) -> bool:
     """Verify if a signature matches the data."""
     computed = enhanced_sha1_signature(data)
     return computed.lower() == signature.lower()
 
-def enhanced_sha1_signature_file(file_path: str, show_progress: bool = True) -> str:
+def enhanced_sha1_signature_file(file_path: str, show_progress: bool = True, stats: StatsSink = None,
+                                 chunk_size: int | None = None) -> str:
     """Streaming version: Generate enhanced SHA1-E3 signature for a file.
 
-    Processes the file in 64-byte blocks without loading it entirely into memory,
-    following the same logic as enhanced_sha1_signature.
+    Reads the file in large chunks (read_file_chunks: a background thread
+    fills two reusable buffers, so I/O overlaps mixing and memory stays
+    bounded) and mixes each chunk with one fused kernel call, following the
+    same logic as enhanced_sha1_signature.
     """
-    import time, os
-
-    start_time = time.time()
+    start_time = time.perf_counter()
 
     sha1 = hashlib.sha1()
 
     block_size = 64  # SHA-1 block size
     position = 0
+    # Chunks must hold whole blocks so block positions line up across chunks
+    chunk_size = max(block_size, (chunk_size or PIPELINE_CHUNK_SIZE) // block_size * block_size)
 
     total_size = os.path.getsize(file_path)
     total_blocks = (total_size + block_size - 1) // block_size
     if show_progress:
         print(f"\nProcessing file: {file_path} ({total_size} bytes) in {total_blocks} blocks")
 
-    blocks_processed = 0
-    estimated_time = None
-
-    with open(file_path, 'rb') as f:
-        while True:
-            block_process_start = time.time()
-            block = f.read(block_size)
-            if not block:
-                break
-            if _NUMBA_ENABLED and _USE_JIT:
-                mixed_block = enhanced_block_mixing_fast(block, position)
-            else:
-                mixed_block = enhanced_block_mixing(block, position)
-            sha1.update(mixed_block)
-            position += 1
-            blocks_processed += 1
-
-            if show_progress and (blocks_processed == 1 or blocks_processed % max(1, total_blocks // 10) == 0):
-                block_time = time.time() - block_process_start
-                if estimated_time is None:
-                    estimated_time = block_time * total_blocks
-                    print(f"\nEstimated total time: {estimated_time:.1f} seconds")
-                progress = blocks_processed / max(1, total_blocks) * 100
-                elapsed = time.time() - start_time
-                remaining = (estimated_time - elapsed) if estimated_time else 0.0
-                print(f"Progress: {progress:.1f}% ({blocks_processed}/{total_blocks} blocks) - {remaining:.1f}s remaining")
-
-    base_digest = sha1.hexdigest()
+    data_bytes = 0
+    for chunk in read_file_chunks(file_path, chunk_size):
+        sha1.update(memoryview(enhanced_block_mixing_buffer(chunk, position, block_size)))
+        position += (len(chunk) + block_size - 1) // block_size
+        data_bytes += len(chunk)
 
-    seed = int(base_digest[:8], 16)
-    if _NUMBA_ENABLED and _USE_JIT:
-        sequence = strengthened_collatz_sequence_fast(seed)
-    else:
-        sequence = strengthened_collatz_sequence(seed)
+        if show_progress:
+            _print_progress(position, total_blocks, time.perf_counter() - start_time)
 
-    mixed_hash = bytearray.fromhex(base_digest)
-    for i, val in enumerate(sequence[:8]):
-        idx = i * 2
-        if idx + 1 < len(mixed_hash):
-            mixed_hash[idx], mixed_hash[idx + 1] = mix_bytes(
-                mixed_hash[idx],
-                mixed_hash[idx + 1],
-                val & 0xFF
-            )
+    result = SignatureStats(data_bytes=data_bytes, blocks=position)
+    result.mixing_seconds = time.perf_counter() - start_time
 
-    final_hash = finalize_state(mixed_hash)
+    final_hash = _finalize_base_digest(sha1.hexdigest(), result)
 
-    total_time = time.time() - start_time
+    result.total_seconds = time.perf_counter() - start_time
     if show_progress:
-        print(f"Total time: {total_time:.4f}s")
+        _print_stats("Performance breakdown:", result)
+    _report_stats(stats, result)
 
     return final_hash.hex()
 
+def _mix_block(block: bytes, position: int) -> bytes:
+    """enhanced_block_mixing through the JIT kernel when it is verified."""
+    if jit_enabled():
+        return enhanced_block_mixing_fast(block, position)
+    return enhanced_block_mixing(block, position)
+
 # Helper is top-level so it can be pickled by multiprocessing
 def _mix_block_for_position(args: tuple) -> tuple[int, bytes]:
     """Worker: apply enhanced_block_mixing for (position, block)."""
     position, block = args
-    mixed = enhanced_block_mixing(block, position)
+    mixed = _mix_block(block, position)
     return position, mixed
 
 def _mix_batch_for_positions(batch: list[tuple[int, bytes]]) -> list[tuple[int, bytes]]:
     """Worker: apply enhanced_block_mixing for a batch of (position, block)."""
+    full = [item for item in batch if len(item[1]) == 64]
+    if not jit_enabled() and len(full) > 1:
+        # Whole blocks as one (N, 64) matrix through the NumPy rows engine
+        rows = np.frombuffer(b''.join(block for _, block in full), dtype=np.uint8).reshape(-1, 64)
+        mixed = enhanced_block_mixing_rows(rows, np.array([position for position, _ in full]))
+        by_position = {position: row.tobytes() for (position, _), row in zip(full, mixed)}
+        return [(position, by_position.get(position) or _mix_block(block, position))
+                for position, block in batch]
     out: list[tuple[int, bytes]] = []
     for position, block in batch:
-        out.append((position, enhanced_block_mixing(block, position)))
+        out.append((position, _mix_block(block, position)))
     return out
 
 def enhanced_sha1_signature_file_fast(
@@ -1408,16 +1725,17 @@ def enhanced_sha1_signature_file_fast(
     show_progress: bool = True,
     parallel_workers: int | None = None,
     batch_blocks: int = 8192,
+    stats: StatsSink = None,
 ) -> str:
     """Streaming SHA1-E3 for files with optional parallel pre-mixing.
 
     This preserves output exactly. Only the per-block mixing is parallelized,
-    and results are consumed in order before updating SHA-1.
+    and results are consumed in order before updating SHA-1. Mixing runs on
+    the shared warm worker pool (see get_worker_pool) unless a different
+    parallel_workers count is requested. Timings are delivered to stats as
+    in enhanced_sha1_signature.
     """
-    import time, os
-    from concurrent.futures import ProcessPoolExecutor
-
-    start_time = time.time()
+    start_time = time.perf_counter()
     sha1 = hashlib.sha1()
     block_size = 64
     total_size = os.path.getsize(file_path)
@@ -1425,38 +1743,29 @@ def enhanced_sha1_signature_file_fast(
     if show_progress:
         print(f"\nProcessing file: {file_path} ({total_size} bytes) in {total_blocks} blocks [parallel]")
 
+    data_bytes = 0
+
     def block_iter():
+        nonlocal data_bytes
         position = 0
-        with open(file_path, 'rb') as f:
-            while True:
-                b = f.read(block_size)
-                if not b:
-                    break
-                yield (position, b)
+        for chunk in read_file_chunks(file_path):
+            data_bytes += len(chunk)
+            for i in range(0, len(chunk), block_size):
+                yield (position, bytes(chunk[i:i + block_size]))
                 position += 1
 
     blocks_processed = 0
-    estimated_time = None
-    t0 = time.time()
-    workers = parallel_workers or max(1, os.cpu_count() or 1)
+    workers = parallel_workers or get_worker_pool().max_workers
     if workers == 1:
         # Fallback to serial fast path (same as original streaming logic)
         for position, block in block_iter():
-            t_block = time.time()
-            mixed = enhanced_block_mixing(block, position)
+            mixed = _mix_block(block, position)
             sha1.update(mixed)
             blocks_processed += 1
             if show_progress and (blocks_processed == 1 or blocks_processed % max(1, total_blocks // 10) == 0):
-                dt = time.time() - t_block
-                if estimated_time is None:
-                    estimated_time = dt * total_blocks
-                    print(f"\nEstimated total time: {estimated_time:.1f} seconds")
-                progress = blocks_processed / max(1, total_blocks) * 100
-                elapsed = time.time() - start_time
-                remaining = (estimated_time - elapsed) if estimated_time else 0.0
-                print(f"Progress: {progress:.1f}% ({blocks_processed}/{total_blocks} blocks) - {remaining:.1f}s remaining")
+                _print_progress(blocks_processed, total_blocks, time.perf_counter() - start_time)
     else:
-        with ProcessPoolExecutor(max_workers=workers) as ex:
+        with _worker_pool_for(parallel_workers) as pool:
             # Batch multiple blocks per task to reduce IPC overhead while preserving order
             def batch_iter():
                 batch: list[tuple[int, bytes]] = []
@@ -1468,34 +1777,21 @@ def enhanced_sha1_signature_file_fast(
                 if batch:
                     yield batch
 
-            for batch in ex.map(_mix_batch_for_positions, batch_iter()):
+            for batch in pool.map(_mix_batch_for_positions, batch_iter()):
                 for position, mixed in batch:
                     sha1.update(mixed)
                     blocks_processed += 1
                     if show_progress and (blocks_processed == 1 or blocks_processed % max(1, total_blocks // 10) == 0):
-                        elapsed = time.time() - t0
-                        frac = blocks_processed / max(1, total_blocks)
-                        if frac > 0 and estimated_time is None:
-                            estimated_time = elapsed / frac
-                            print(f"\nEstimated total time: {estimated_time:.1f} seconds")
-                        remaining = (estimated_time - elapsed) if estimated_time else 0.0
-                        progress = frac * 100
-                        print(f"Progress: {progress:.1f}% ({blocks_processed}/{total_blocks} blocks) - {remaining:.1f}s remaining")
-
-    base_digest = sha1.hexdigest()
-    seed = int(base_digest[:8], 16)
-    sequence = strengthened_collatz_sequence(seed)
-    mixed_hash = bytearray.fromhex(base_digest)
-    for i, val in enumerate(sequence[:8]):
-        idx = i * 2
-        if idx + 1 < len(mixed_hash):
-            mixed_hash[idx], mixed_hash[idx + 1] = mix_bytes(
-                mixed_hash[idx],
-                mixed_hash[idx + 1],
-                val & 0xFF
-            )
-    final_hash = finalize_state(mixed_hash)
-    total_time = time.time() - start_time
+                        _print_progress(blocks_processed, total_blocks, time.perf_counter() - start_time)
+
+    result = SignatureStats(data_bytes=data_bytes, blocks=blocks_processed, workers=workers)
+    result.mixing_seconds = time.perf_counter() - start_time
+
+    final_hash = _finalize_base_digest(sha1.hexdigest(), result)
+
+    result.total_seconds = time.perf_counter() - start_time
     if show_progress:
-        print(f"Total time: {total_time:.4f}s")
+        _print_stats("Performance breakdown:", result)
+    _report_stats(stats, result)
+
     return final_hash.hex()
@@ -0,0 +1,502 @@
+"""
+Numba kernels for SHA1-E3.
+
+Nopython versions of global_mix, enhanced_block_mixing, the strengthened
+Collatz sequence and SHA-1 compression, value for value identical to the
+Python code in sha1_sponge_collatz_enhanced and sha1e3_resumable.
+Importing this module imports Numba, so those modules only load it on the
+first kernel call (sha1_sponge_collatz_enhanced._kernels).
+
+The entry points at the end are also compiled ahead of time by
+scripts/build_sha1e3_aot.py into _sha1e3_aot, which loads without Numba
+or any JIT compilation.
+"""
+
+import numpy as np
+from numba import njit
+
+from .sha1_sponge_collatz_enhanced import COLLATZ_MAX_VALUES, MULTIPLIERS, PRIMES, SBOX
+
+
+# Create JIT-compatible SBOX as numpy array
+SBOX_JIT = np.array(SBOX, dtype=np.uint8)
+MULTIPLIERS_JIT = np.array(MULTIPLIERS, dtype=np.uint8)
+PRIMES_JIT = np.array(PRIMES, dtype=np.uint8)
+
+
+@njit(cache=True)
+def _global_mix_inplace_jit(out: np.ndarray) -> None:
+    """global_mix applied in place to a uint8 array (or slice of one)."""
+    N = out.size
+    def sbox_scramble_nb(b: int) -> int:
+        return SBOX_JIT[b & 0xFF]
+    def rotl_nb(x: int, n: int) -> int:
+        n = n & 7
+        return ((x << n) | (x >> (8 - n))) & 0xFF
+    def rotr_nb(x: int, n: int) -> int:
+        n = n & 7
+        return ((x >> n) | (x << (8 - n))) & 0xFF
+    for r in range(2):
+        for i in range(N):
+            b = out[i]
+            b ^= rotl_nb(out[(i-1) % N], 2 + r)
+            b ^= rotr_nb(out[(i-2) % N], 3 + r)
+            b ^= sbox_scramble_nb(out[(i+1) % N])
+            b ^= rotl_nb(out[(i+2) % N], 1 + r)
+            b = sbox_scramble_nb(b)
+            out[i] = b
+        for i in range(N-1, -1, -1):
+            b = out[i]
+            b = rotl_nb(b, 3)
+            b ^= sbox_scramble_nb(out[(i+1) % N])
+            b ^= rotr_nb(out[(i-1) % N], 2)
+            b = (b * MULTIPLIERS_JIT[r % len(MULTIPLIERS_JIT)]) & 0xFF
+            out[i] = b
+
+
+@njit(cache=True)
+def _global_mix_jit(arr: np.ndarray) -> np.ndarray:
+    out = arr.copy()
+    _global_mix_inplace_jit(out)
+    return out
+
+
+@njit(cache=True)
+def _popcount8_jit(b: int) -> int:
+    count = 0
+    for j in range(8):
+        count += (b >> j) & 1
+    return count
+
+
+@njit(cache=True)
+def _balance_byte_jit(byte: int) -> int:
+    """balance_byte (target 4 bits) for the JIT kernels, same bit choices."""
+    b = byte & 0xFF
+    bits = _popcount8_jit(b)
+    if bits <= 5 and bits >= 3:
+        return b
+
+    orig = b
+    attempts = 0
+    while bits > 5 and attempts < 8:
+        # idx-th set bit in ascending order
+        idx = (b * np.int64(PRIMES_JIT[attempts % 8]) + bits) % bits
+        for k in range(8):
+            if b & (1 << k):
+                if idx == 0:
+                    b &= ~(1 << k)
+                    break
+                idx -= 1
+        bits = _popcount8_jit(b)
+        attempts += 1
+
+    while bits < 3 and attempts < 8:
+        # idx-th clear bit in ascending order
+        idx = (b * np.int64(PRIMES_JIT[(attempts + 3) % 8]) + bits) % (8 - bits)
+        for k in range(8):
+            if not (b & (1 << k)):
+                if idx == 0:
+                    b |= (1 << k)
+                    break
+                idx -= 1
+        bits = _popcount8_jit(b)
+        attempts += 1
+
+    if bits > 5 or bits < 3:
+        return orig
+    return b
+
+
+@njit(cache=True)
+def _break_long_runs_jit(out: np.ndarray, max_run: int) -> None:
+    """break_long_runs applied in place."""
+    current_bit = -1
+    run_length = 0
+    for i in range(out.size * 8):
+        byte_idx = i // 8
+        bit_pos = 7 - (i % 8)
+        current = (np.int64(out[byte_idx]) >> bit_pos) & 1
+
+        if current == current_bit:
+            run_length += 1
+        else:
+            current_bit = current
+            run_length = 1
+
+        if run_length > max_run:
+            flip_byte = np.int64(out[byte_idx])
+            flip_pattern = np.int64(PRIMES_JIT[(flip_byte + i) % 8])
+            if flip_pattern & (1 << (i % 3)):
+                out[byte_idx] ^= (1 << bit_pos)
+                current_bit ^= 1
+                run_length = 1
+
+
+# JIT-compiled enhanced block mixing for maximum performance
+@njit(cache=True)
+def _mix_block_into_jit(block_arr: np.ndarray, position: int, result: np.ndarray) -> None:
+    """
+    JIT-compiled enhanced_block_mixing writing into result.
+
+    result must hold max(16, block_arr.size) bytes; it may be a slice
+    of a larger output buffer. Chunk work happens in two 8-byte scratch
+    arrays, so no per-chunk allocations are made.
+    """
+    output_size = result.size
+    chunk_size = 8
+
+    # Position-dependent constants (using modular arithmetic for JIT compatibility)
+    k1 = PRIMES_JIT[(position * 3) % len(PRIMES_JIT)]
+    k2 = PRIMES_JIT[(position * 5 + 1) % len(PRIMES_JIT)]
+    k3 = MULTIPLIERS_JIT[(position * 7) % len(MULTIPLIERS_JIT)]
+
+    # Initialize buffer with padding if needed
+    if block_arr.size < output_size:
+        buffer = np.zeros(output_size, dtype=np.uint8)
+        buffer[:block_arr.size] = block_arr
+        pad_base = (k1 * k2 + position) & 0xFF
+        for i in range(block_arr.size, output_size):
+            pad = SBOX_JIT[(pad_base + i * k3) & 0xFF]
+            buffer[i] = pad
+    else:
+        buffer = block_arr
+
+    # Process in chunks with optimized loops
+    chunk = np.zeros(chunk_size, dtype=np.uint8)
+    prev_chunk = np.zeros(chunk_size, dtype=np.uint8)
+    result_idx = 0
+
+    for chunk_start in range(0, buffer.size, chunk_size):
+        chunk_end = min(chunk_start + chunk_size, buffer.size)
+        used = chunk_end - chunk_start
+        chunk[:used] = buffer[chunk_start:chunk_end]
+
+        # Pad chunk if needed
+        if used < chunk_size:
+            pad_val = (k1 + chunk_start) & 0xFF
+            for i in range(used, chunk_size):
+                pad_val = SBOX_JIT[(pad_val * k2 + k3) & 0xFF]
+                chunk[i] = pad_val
+
+        # Mix with previous chunk
+        if chunk_start > 0:
+            for i in range(chunk_size):
+                n = (position + i) & 7
+                rotated = ((prev_chunk[i] << n) | (prev_chunk[i] >> (8 - n))) & 0xFF
+                chunk[i] ^= rotated
+
+        # Apply global mixing (simplified for JIT)
+        _global_mix_inplace_jit(chunk)
+
+        # Position-dependent transformations
+        chunk_idx = chunk_start // chunk_size
+        for i in range(chunk_size):
+            x = chunk[i]
+            x = SBOX_JIT[x & 0xFF]  # sbox_scramble
+            n = (position + chunk_idx + i) & 7
+            x = ((x << n) | (x >> (8 - n))) & 0xFF  # rotl
+            x = (x * k3 + k1) & 0xFF
+            x = SBOX_JIT[x & 0xFF]  # sbox_scramble again
+            chunk[i] = x
+
+        # Another round of global mixing
+        _global_mix_inplace_jit(chunk)
+
+        # Store result
+        copy_size = min(chunk_size, output_size - result_idx)
+        result[result_idx:result_idx + copy_size] = chunk[:copy_size]
+        result_idx += copy_size
+        prev_chunk[:] = chunk
+
+        if result_idx >= output_size:
+            break
+
+    # Final mixing passes
+    _global_mix_inplace_jit(result)
+    _global_mix_inplace_jit(result)
+    _global_mix_inplace_jit(result)
+
+    # Enhanced cross-byte XOR passes
+    N = result.size
+
+    # Forward pass with near neighbor
+    for i in range(N):
+        n = 3
+        rotated = ((result[(i+1) % N] << n) | (result[(i+1) % N] >> (8 - n))) & 0xFF
+        result[i] ^= rotated
+
+    # Far forward pass
+    for i in range(N):
+        n = 5
+        rotated = ((result[(i+5) % N] << n) | (result[(i+5) % N] >> (8 - n))) & 0xFF
+        result[i] ^= rotated
+
+    # Backward pass
+    for i in range(N-1, -1, -1):
+        n = 4
+        rotated = ((result[(i-2) % N] << n) | (result[(i-2) % N] >> (8 - n))) & 0xFF
+        result[i] ^= rotated
+
+    # Final S-box pass
+    for i in range(N):
+        result[i] = SBOX_JIT[result[i] & 0xFF]
+
+    # One final global mixing
+    _global_mix_inplace_jit(result)
+
+    # Additional decorrelation passes
+    for i in range(N):
+        result[i] ^= SBOX_JIT[result[(i*7+3) % N] & 0xFF]
+
+    # XOR with reverse position
+    for i in range(N):
+        result[i] ^= result[N-1-i]
+
+    # Final decorrelation with inside-out shuffle and cross-S-box mixing
+    perm = np.arange(N)
+    for i in range(N-1, 0, -1):
+        j = (np.int64(result[i]) + np.int64(result[N-1-i])) % (i+1)
+        t = perm[i]
+        perm[i] = perm[j]
+        perm[j] = t
+    shuffled = np.empty(N, dtype=np.uint8)
+    for i in range(N):
+        shuffled[i] = result[perm[i]]
+    for i in range(N):
+        result[i] ^= SBOX_JIT[shuffled[i]]
+
+    # Check for long runs and break only if found
+    max_run = 0
+    current_run = 0
+    current_bit = -1
+
+    for i in range(N * 8):
+        byte_idx = i // 8
+        bit_pos = 7 - (i % 8)
+        bit = (result[byte_idx] >> bit_pos) & 1
+
+        if bit == current_bit:
+            current_run += 1
+            max_run = max(max_run, current_run)
+        else:
+            current_bit = bit
+            current_run = 1
+
+    if max_run > 14:
+        _break_long_runs_jit(result, 14)
+
+    # Very gentle final balance - only fix extreme outliers
+    for i in range(N):
+        result[i] = _balance_byte_jit(np.int64(result[i]))
+
+
+@njit(cache=True)
+def _enhanced_block_mixing_jit(block_arr: np.ndarray, position: int) -> np.ndarray:
+    """JIT-compiled version of enhanced_block_mixing for speed."""
+    result = np.empty(max(16, block_arr.size), dtype=np.uint8)
+    _mix_block_into_jit(block_arr, position, result)
+    return result
+
+
+@njit(cache=True)
+def _enhanced_block_mixing_buffer_jit(data: np.ndarray, block_size: int,
+                                      start_position: int, out: np.ndarray) -> None:
+    """Mix every block of data into out in one nopython call."""
+    out_idx = 0
+    position = start_position
+    for start in range(0, data.size, block_size):
+        block = data[start:min(start + block_size, data.size)]
+        size = max(16, block.size)
+        _mix_block_into_jit(block, position, out[out_idx:out_idx + size])
+        out_idx += size
+        position += 1
+
+
+# JIT-compiled Collatz sequence with eliminated string operations
+@njit(cache=True)
+def _mix_state_jit(val: int) -> int:
+    """mix_state of strengthened_collatz_sequence using bit operations only."""
+    # Initial mixing with controlled rotations
+    val = ((val << 7) | (val >> 25)) & 0xFFFFFFFF
+    val = (val * 0x6D2B79F5) & 0xFFFFFFFF
+    val = ((val << 13) | (val >> 19)) & 0xFFFFFFFF
+    val = (val * 0x1234567D) & 0xFFFFFFFF
+
+    # Break runs longer than 14 bits (positions counted from the MSB),
+    # using the runs of the value before any flip
+    orig = val
+    run_start = 0
+    for pos in range(1, 33):
+        if pos == 32 or ((orig >> (31 - pos)) & 1) != ((orig >> (31 - run_start)) & 1):
+            length = pos - run_start
+            if length > 14:
+                for j in range(run_start + 7, run_start + length, 7):
+                    if j < 32:
+                        val ^= (1 << (31 - j))
+            run_start = pos
+
+    # Byte-level bit balance
+    for i in range(0, 32, 8):
+        bit_count = _popcount8_jit((val >> i) & 0xFF)
+        if bit_count < 3:
+            val |= (0x55 << i)
+        elif bit_count > 5:
+            val &= ~(0x55 << i)
+
+    return val
+
+
+@njit(cache=True)
+def _balance_word_jit(val: int) -> int:
+    """Apply balance_byte to each of the 4 low bytes."""
+    for i in range(0, 32, 8):
+        val = (val & ~(0xFF << i)) | (_balance_byte_jit((val >> i) & 0xFF) << i)
+    return val
+
+
+@njit(cache=True)
+def _strengthened_collatz_into_jit(seed: int, sequence: np.ndarray) -> int:
+    """
+    JIT-compiled strengthened_collatz_sequence, value for value identical.
+
+    Writes the sequence into sequence (COLLATZ_MAX_VALUES slots) and
+    returns its length.
+    """
+    seq_len = 0
+    state = seed & 0xFFFFFFFF
+    previous_states = {state}  # The seed is the first value added anyway
+
+    sequence_length = 0
+    while state != 1 and sequence_length < 100:
+        sequence[seq_len] = state
+        seq_len += 1
+        sequence_length += 1
+        previous_states.add(state)
+        prev_state = state
+
+        state = _mix_state_jit(state)
+        if state % 2 == 0:
+            state = _mix_state_jit(state >> 1)
+        else:
+            state = _mix_state_jit((3 * state + 1) & 0xFFFFFFFF)
+
+        if state in previous_states:
+            state = _mix_state_jit(prev_state ^ sequence_length)
+
+        for i in range(0, 32, 8):
+            bit_count = _popcount8_jit((state >> i) & 0xFF)
+            if bit_count < 3 or bit_count > 5:
+                state ^= (1 << i)
+
+    sequence_length = 0
+    while state != 1 and sequence_length < 1000:
+        state = _balance_word_jit(state)
+
+        sequence[seq_len] = state
+        seq_len += 1
+        sequence_length += 1
+        previous_states.add(state)
+        prev_state = state
+
+        if state % 2 == 0:
+            shifted = ((state >> 1) ^ (state << 2)) & 0xFFFFFFFF
+        else:
+            base = (3 * state + 1) & 0xFFFFFFFF
+            shifted = ((base >> 3) ^ (base << 5)) & 0xFFFFFFFF
+        state = _balance_word_jit(_mix_state_jit(shifted))
+
+        # Periodic pattern breaking with the last 4 values
+        if sequence_length % 4 == 0:
+            history_mix = 0
+            first = max(0, seq_len - 4)
+            for k in range(first, seq_len):
+                prime = 0x6D2B79F5 if (k - first) % 2 == 0 else 0x1234567D
+                history_mix ^= (sequence[k] * prime) & 0xFFFFFFFF
+            state = _balance_word_jit(state ^ history_mix)
+
+        if state in previous_states:
+            new_state = ((prev_state * 0x6D2B79F5) + sequence_length) & 0xFFFFFFFF
+            if seq_len >= 4:
+                new_state ^= sequence[seq_len - 4:seq_len].sum()
+            else:
+                new_state ^= prev_state
+            state = _balance_word_jit(new_state)
+
+        state = _mix_state_jit(state)
+
+    return seq_len
+
+
+@njit(cache=True)
+def _strengthened_collatz_sequence_jit(seed: int) -> np.ndarray:
+    sequence = np.zeros(COLLATZ_MAX_VALUES, dtype=np.int64)
+    return sequence[:_strengthened_collatz_into_jit(seed, sequence)]
+
+
+@njit(cache=True)
+def _strengthened_collatz_batch_jit(seeds: np.ndarray, out: np.ndarray, lengths: np.ndarray) -> None:
+    """Sequences for all seeds in one call, one row of out per seed."""
+    for k in range(seeds.size):
+        lengths[k] = _strengthened_collatz_into_jit(seeds[k], out[k])
+
+
+@njit(cache=True)
+def _sha1_compress_blocks_jit(h: np.ndarray, data: np.ndarray) -> None:
+    """SHA-1 compression of every 64-byte block of data into h (int64[5])."""
+    w = np.empty(80, dtype=np.int64)
+    for off in range(0, data.size, 64):
+        for t in range(16):
+            i = off + 4 * t
+            w[t] = ((np.int64(data[i]) << 24) | (np.int64(data[i + 1]) << 16)
+                    | (np.int64(data[i + 2]) << 8) | np.int64(data[i + 3]))
+        for t in range(16, 80):
+            x = w[t - 3] ^ w[t - 8] ^ w[t - 14] ^ w[t - 16]
+            w[t] = ((x << 1) | (x >> 31)) & 0xFFFFFFFF
+
+        a, b, c, d, e = h[0], h[1], h[2], h[3], h[4]
+        for t in range(80):
+            if t < 20:
+                f = (b & c) | ((~b & 0xFFFFFFFF) & d)
+                k = 0x5A827999
+            elif t < 40:
+                f = b ^ c ^ d
+                k = 0x6ED9EBA1
+            elif t < 60:
+                f = (b & c) | (b & d) | (c & d)
+                k = 0x8F1BBCDC
+            else:
+                f = b ^ c ^ d
+                k = 0xCA62C1D6
+            temp = ((((a << 5) | (a >> 27)) & 0xFFFFFFFF) + f + e + k + w[t]) & 0xFFFFFFFF
+            e = d
+            d = c
+            c = ((b << 30) | (b >> 2)) & 0xFFFFFFFF
+            b = a
+            a = temp
+
+        h[0] = (h[0] + a) & 0xFFFFFFFF
+        h[1] = (h[1] + b) & 0xFFFFFFFF
+        h[2] = (h[2] + c) & 0xFFFFFFFF
+        h[3] = (h[3] + d) & 0xFFFFFFFF
+        h[4] = (h[4] + e) & 0xFFFFFFFF
+
+
+# Entry points and the signatures the AOT build exports them with. Input
+# arrays use the 'A' layout: AOT wrappers do not check contiguity, and
+# they accept read-only buffers
+global_mix = _global_mix_jit
+block_mixing = _enhanced_block_mixing_jit
+block_mixing_buffer = _enhanced_block_mixing_buffer_jit
+collatz_sequence = _strengthened_collatz_sequence_jit
+collatz_batch = _strengthened_collatz_batch_jit
+sha1_compress_blocks = _sha1_compress_blocks_jit
+
+AOT_SIGNATURES = {
+    'global_mix': 'uint8[::1](uint8[:])',
+    'block_mixing': 'uint8[::1](uint8[:], int64)',
+    'block_mixing_buffer': 'void(uint8[:], int64, int64, uint8[:])',
+    'collatz_sequence': 'int64[:](int64)',
+    'collatz_batch': 'void(int64[:], int64[:, :], int64[:])',
+    'sha1_compress_blocks': 'void(int64[:], uint8[:])',
+}
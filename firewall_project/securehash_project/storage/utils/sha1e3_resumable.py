@@ -0,0 +1,317 @@
+"""
+Resumable SHA1-E3: streaming hashers whose state can be saved and restored.
+
+hashlib objects cannot be serialized, so the sequential hasher carries its
+own SHA-1 (SHA1State, checked against hashlib in the tests) whose chaining
+values, pending bytes and length can be exported. Together with the block
+position and byte offset this lets a long job checkpoint to disk and
+continue in another process. Tree mode only needs its list of leaf digests.
+
+Checkpoints are JSON, written atomically (temporary file + os.replace), and
+record the size and mtime of the file being hashed so a changed file is
+never resumed.
+"""
+
+import json
+import logging
+import os
+import struct
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+from . import sha1_sponge_collatz_enhanced as sponge
+from .file_utils import PIPELINE_CHUNK_SIZE, read_file_chunks
+
+
+CHECKPOINT_VERSION = 1
+
+# Default distance between checkpoints of resumable_signature_file
+CHECKPOINT_EVERY_BYTES = 1024 * 1024 * 1024
+
+_SHA1_IV = (0x67452301, 0xEFCDAB89, 0x98BADCFE, 0x10325476, 0xC3D2E1F0)
+
+logger = logging.getLogger(__name__)
+
+
+def _sha1_compress_python(h: List[int], data, offset: int) -> None:
+    """SHA-1 compression of the 64-byte block at data[offset:] into h."""
+    w = list(struct.unpack_from('>16I', data, offset))
+    for t in range(16, 80):
+        x = w[t - 3] ^ w[t - 8] ^ w[t - 14] ^ w[t - 16]
+        w.append(((x << 1) | (x >> 31)) & 0xFFFFFFFF)
+
+    a, b, c, d, e = h
+    for t in range(80):
+        if t < 20:
+            f, k = (b & c) | (~b & d), 0x5A827999
+        elif t < 40:
+            f, k = b ^ c ^ d, 0x6ED9EBA1
+        elif t < 60:
+            f, k = (b & c) | (b & d) | (c & d), 0x8F1BBCDC
+        else:
+            f, k = b ^ c ^ d, 0xCA62C1D6
+        temp = (((a << 5) | (a >> 27)) + f + e + k + w[t]) & 0xFFFFFFFF
+        e, d, c, b, a = d, c, ((b << 30) | (b >> 2)) & 0xFFFFFFFF, a, temp
+
+    h[0] = (h[0] + a) & 0xFFFFFFFF
+    h[1] = (h[1] + b) & 0xFFFFFFFF
+    h[2] = (h[2] + c) & 0xFFFFFFFF
+    h[3] = (h[3] + d) & 0xFFFFFFFF
+    h[4] = (h[4] + e) & 0xFFFFFFFF
+
+
+class SHA1State:
+    """
+    SHA-1 with exportable state.
+
+    Produces the same digests as hashlib.sha1, but its chaining values,
+    unprocessed tail and message length can be exported to a dict and
+    restored in another process.
+    """
+
+    name = 'sha1'
+    digest_size = 20
+    block_size = 64
+
+    def __init__(self, data: bytes = b''):
+        self._h = list(_SHA1_IV)
+        self._pending = b''
+        self._length = 0
+        if data:
+            self.update(data)
+
+    def _compress(self, data) -> None:
+        """Compress whole 64-byte blocks of data into the chaining values."""
+        # Same gate as the other kernels: SHA1E3_USE_JIT and jit_self_check
+        kernels = sponge._kernels() if len(data) >= 1024 and sponge.jit_enabled() else None
+        if kernels is not None:
+            h = np.array(self._h, dtype=np.int64)
+            kernels.sha1_compress_blocks(h, np.frombuffer(data, dtype=np.uint8))
+            self._h = [int(x) for x in h]
+        else:
+            for offset in range(0, len(data), 64):
+                _sha1_compress_python(self._h, data, offset)
+
+    def update(self, data) -> None:
+        data = memoryview(data).cast('B')
+        self._length += len(data)
+        if self._pending:
+            need = 64 - len(self._pending)
+            self._pending += bytes(data[:need])
+            data = data[need:]
+            if len(self._pending) < 64:
+                return
+            self._compress(self._pending)
+            self._pending = b''
+        full = len(data) - len(data) % 64
+        if full:
+            self._compress(data[:full].toreadonly())
+        self._pending = bytes(data[full:])
+
+    def copy(self) -> 'SHA1State':
+        clone = SHA1State.__new__(SHA1State)
+        clone._h = list(self._h)
+        clone._pending = self._pending
+        clone._length = self._length
+        return clone
+
+    def digest(self) -> bytes:
+        tail = self._pending + b'\x80' + b'\x00' * ((55 - len(self._pending)) % 64)
+        tail += struct.pack('>Q', (self._length * 8) & 0xFFFFFFFFFFFFFFFF)
+        h = list(self._h)
+        for offset in range(0, len(tail), 64):
+            _sha1_compress_python(h, tail, offset)
+        return struct.pack('>5I', *h)
+
+    def hexdigest(self) -> str:
+        return self.digest().hex()
+
+    def export_state(self) -> Dict[str, Any]:
+        return {'h': list(self._h), 'pending': self._pending.hex(), 'length': self._length}
+
+    @classmethod
+    def from_state(cls, state: Dict[str, Any]) -> 'SHA1State':
+        h, pending = state['h'], bytes.fromhex(state['pending'])
+        if len(h) != 5 or len(pending) >= 64 or state['length'] % 64 != len(pending):
+            raise ValueError("invalid SHA-1 state")
+        sha1 = cls.__new__(cls)
+        sha1._h = [int(x) & 0xFFFFFFFF for x in h]
+        sha1._pending = pending
+        sha1._length = int(state['length'])
+        return sha1
+
+
+class SHA1E3StreamHasher:
+    """
+    Incremental, resumable form of enhanced_sha1_signature.
+
+    Input is mixed in whole 64-byte blocks as it arrives (JIT kernel or
+    NumPy rows engine); only a partial block is held back until more data
+    or the final digest. hexdigest() equals
+    enhanced_sha1_signature(all data) and leaves the hasher usable.
+    """
+
+    def __init__(self):
+        self.sha1 = SHA1State()
+        self.position = 0         # Blocks mixed so far
+        self.offset = 0           # Input bytes consumed so far
+        self._pending = b''       # Partial block not yet mixed
+
+    def _mix(self, blocks) -> None:
+        self.sha1.update(sponge.enhanced_block_mixing_buffer(blocks, self.position))
+        self.position += len(blocks) // 64
+
+    def update(self, data) -> None:
+        data = memoryview(data).cast('B')
+        self.offset += len(data)
+        if self._pending:
+            need = 64 - len(self._pending)
+            self._pending += bytes(data[:need])
+            data = data[need:]
+            if len(self._pending) < 64:
+                return
+            self._mix(self._pending)
+            self._pending = b''
+        full = len(data) - len(data) % 64
+        if full:
+            self._mix(data[:full].toreadonly())
+        self._pending = bytes(data[full:])
+
+    def hexdigest(self) -> str:
+        sha1 = self.sha1.copy()
+        if self._pending:
+            sha1.update(sponge.enhanced_block_mixing(self._pending, self.position))
+        return sponge._finalize_base_digest(sha1.hexdigest()).hex()
+
+    def export_state(self) -> Dict[str, Any]:
+        """JSON-serializable snapshot of the hasher."""
+        return {
+            'version': CHECKPOINT_VERSION,
+            'mode': 'stream',
+            'sha1': self.sha1.export_state(),
+            'position': self.position,
+            'offset': self.offset,
+            'pending': self._pending.hex(),
+        }
+
+    @classmethod
+    def from_state(cls, state: Dict[str, Any]) -> 'SHA1E3StreamHasher':
+        """Restore a hasher from export_state() output."""
+        if state.get('version') != CHECKPOINT_VERSION or state.get('mode') != 'stream':
+            raise ValueError("unsupported SHA1-E3 checkpoint")
+        hasher = cls()
+        hasher.sha1 = SHA1State.from_state(state['sha1'])
+        hasher.position = int(state['position'])
+        hasher.offset = int(state['offset'])
+        hasher._pending = bytes.fromhex(state['pending'])
+        if hasher.position * 64 + len(hasher._pending) != hasher.offset:
+            raise ValueError("inconsistent SHA1-E3 checkpoint")
+        return hasher
+
+
+def save_checkpoint(path: str, state: Dict[str, Any]) -> None:
+    """Write a checkpoint atomically."""
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'w') as f:
+        json.dump(state, f)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+
+def load_checkpoint(path: str) -> Optional[Dict[str, Any]]:
+    """Read a checkpoint, or None if there is none."""
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return None
+
+
+def _file_identity(file_path: str) -> Dict[str, int]:
+    st = os.stat(file_path)
+    return {'size': st.st_size, 'mtime_ns': st.st_mtime_ns}
+
+
+def _load_matching_checkpoint(checkpoint_path: str, file_path: str, mode: str) -> Optional[Dict[str, Any]]:
+    """Checkpoint for file_path in the given mode, ignoring stale or foreign ones."""
+    state = load_checkpoint(checkpoint_path)
+    if state is None:
+        return None
+    if state.get('mode') != mode or state.get('file') != _file_identity(file_path):
+        logger.warning("Ignoring checkpoint %s: it does not match %s", checkpoint_path, file_path)
+        return None
+    return state
+
+
+def resumable_signature_file(file_path: str, checkpoint_path: str,
+                             checkpoint_every: int = CHECKPOINT_EVERY_BYTES,
+                             show_progress: bool = False) -> str:
+    """
+    enhanced_sha1_signature_file that survives being killed.
+
+    The hasher state is saved to checkpoint_path every checkpoint_every
+    bytes. A later call with the same checkpoint_path continues from the
+    last checkpoint if the file is unchanged, and the checkpoint is removed
+    once the signature is complete.
+    """
+    state = _load_matching_checkpoint(checkpoint_path, file_path, 'stream')
+    hasher = SHA1E3StreamHasher.from_state(state) if state else SHA1E3StreamHasher()
+    if state and show_progress:
+        print(f"Resuming {file_path} at byte {hasher.offset}")
+
+    identity = _file_identity(file_path)
+    next_checkpoint = hasher.offset + checkpoint_every
+    for chunk in read_file_chunks(file_path, min(PIPELINE_CHUNK_SIZE, max(64, checkpoint_every)),
+                                  offset=hasher.offset):
+        hasher.update(chunk)
+        if hasher.offset >= next_checkpoint:
+            save_checkpoint(checkpoint_path, dict(hasher.export_state(), file=identity))
+            next_checkpoint = hasher.offset + checkpoint_every
+            if show_progress:
+                print(f"Checkpoint at byte {hasher.offset} of {identity['size']}")
+
+    signature = hasher.hexdigest()
+    if os.path.exists(checkpoint_path):
+        os.remove(checkpoint_path)
+    return signature
+
+
+def resumable_tree_signature_file(file_path: str, checkpoint_path: str,
+                                  leaf_size: Optional[int] = None,
+                                  max_workers: Optional[int] = None,
+                                  checkpoint_leaves: int = 1024) -> str:
+    """
+    Tree-mode signature of a file, checkpointing its leaf digests.
+
+    Leaves are hashed in batches of checkpoint_leaves; after each batch
+    the digests so far are saved, so a restarted job rehashes at most one
+    batch.
+    """
+    from . import sha1e3_tree as tree
+
+    leaf_size = leaf_size or tree.TREE_LEAF_SIZE
+    identity = _file_identity(file_path)
+    state = _load_matching_checkpoint(checkpoint_path, file_path, 'tree')
+    digests = []
+    if state and state.get('version') == CHECKPOINT_VERSION and state.get('leaf_size') == leaf_size:
+        digests = [bytes.fromhex(d) for d in state['digests']]
+
+    total = tree.leaf_count(identity['size'], leaf_size)
+    while len(digests) < total:
+        batch = tree.file_leaf_digests(file_path, leaf_size, max_workers, first_leaf=len(digests),
+                                       last_leaf=min(total, len(digests) + checkpoint_leaves))
+        digests.extend(batch)
+        save_checkpoint(checkpoint_path, {
+            'version': CHECKPOINT_VERSION,
+            'mode': 'tree',
+            'file': identity,
+            'leaf_size': leaf_size,
+            'digests': [d.hex() for d in digests],
+        })
+
+    signature = tree.signature_from_leaf_digests(digests, identity['size'], leaf_size)
+    if os.path.exists(checkpoint_path):
+        os.remove(checkpoint_path)
+    return signature
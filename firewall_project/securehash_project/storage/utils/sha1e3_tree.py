@@ -0,0 +1,171 @@
+"""
+SHA1-E3 tree mode: Merkle combination of independently hashed leaves.
+
+Plain SHA1-E3 feeds every mixed block into one SHA-1 chain, so only the
+mixing can run in parallel. Tree mode splits the input into fixed-size
+leaves, gives each leaf its own full SHA1-E3 signature (block positions
+restart at 0 in every leaf) and combines the leaf digests with
+merkle.build_merkle_root. Leaves hash on separate cores, a leaf range can
+be verified with a Merkle proof, and appending to a file only rehashes its
+last leaf onwards.
+
+Tree signatures are a different function from plain SHA1-E3 and are
+self-describing:
+
+    sha1e3-tree-v1:<leaf_size>:<data_length>:<merkle root hex>
+
+The data length is part of the signature, so inputs whose leaf lists only
+differ by the Merkle tree's duplicated last node do not collide.
+"""
+
+import os
+from typing import Iterable, List, Optional, Tuple
+
+from .merkle import build_merkle_root, build_proof, verify_proof
+from . import sha1_sponge_collatz_enhanced as sponge
+
+
+TREE_MODE_VERSION = 'sha1e3-tree-v1'
+
+# Default leaf size: large enough to amortize per-leaf finalization and
+# scheduling, small enough to spread a 100 MB file over every core
+TREE_LEAF_SIZE = 1024 * 1024
+
+
+def _check_leaf_size(leaf_size: int) -> None:
+    if leaf_size < 64 or leaf_size % 64:
+        raise ValueError("leaf_size must be a positive multiple of 64")
+
+
+def leaf_count(data_length: int, leaf_size: int = TREE_LEAF_SIZE) -> int:
+    """Number of leaves for data_length bytes (empty input is one empty leaf)."""
+    return max(1, -(-data_length // leaf_size))
+
+
+def leaf_digest(leaf: bytes) -> bytes:
+    """SHA1-E3 digest of a single leaf."""
+    return bytes.fromhex(sponge.enhanced_sha1_signature(leaf, show_progress=False))
+
+
+def _file_leaf_digest(file_path: str, offset: int, length: int) -> bytes:
+    """Worker: SHA1-E3 digest of the leaf at [offset, offset + length) of a file."""
+    with open(file_path, 'rb') as f:
+        f.seek(offset)
+        return leaf_digest(f.read(length))
+
+
+def _map_leaves(fn, args: List[Tuple], max_workers: Optional[int]) -> List[bytes]:
+    """Run fn over leaf arguments, on the SHA1-E3 worker pool when there is more than one."""
+    if len(args) <= 1 or max_workers == 1:
+        return [fn(*a) for a in args]
+    with sponge._worker_pool_for(max_workers) as pool:
+        if pool.max_workers == 1:
+            return [fn(*a) for a in args]
+        return list(pool.map(fn, *zip(*args)))
+
+
+def leaf_digests(data: bytes, leaf_size: int = TREE_LEAF_SIZE,
+                 max_workers: Optional[int] = None) -> List[bytes]:
+    """Digests of every leaf of data, in order."""
+    _check_leaf_size(leaf_size)
+    leaves = [(bytes(data[i:i + leaf_size]),)
+              for i in range(0, leaf_count(len(data), leaf_size) * leaf_size, leaf_size)]
+    return _map_leaves(leaf_digest, leaves, max_workers)
+
+
+def file_leaf_digests(file_path: str, leaf_size: int = TREE_LEAF_SIZE,
+                      max_workers: Optional[int] = None, first_leaf: int = 0,
+                      last_leaf: Optional[int] = None) -> List[bytes]:
+    """
+    Digests of the leaves [first_leaf, last_leaf) of a file (default: to the end).
+
+    Workers read their own leaf range, so only offsets cross process
+    boundaries.
+    """
+    _check_leaf_size(leaf_size)
+    count = leaf_count(os.path.getsize(file_path), leaf_size)
+    last_leaf = count if last_leaf is None else min(last_leaf, count)
+    ranges = [(file_path, index * leaf_size, leaf_size)
+              for index in range(first_leaf, last_leaf)]
+    return _map_leaves(_file_leaf_digest, ranges, max_workers)
+
+
+def signature_from_leaf_digests(digests: Iterable[bytes], data_length: int,
+                                leaf_size: int = TREE_LEAF_SIZE) -> str:
+    """Combine leaf digests into a tree signature."""
+    digests = list(digests)
+    if len(digests) != leaf_count(data_length, leaf_size):
+        raise ValueError("number of leaf digests does not match data_length")
+    root = build_merkle_root(digests)
+    return f"{TREE_MODE_VERSION}:{leaf_size}:{data_length}:{root.hex()}"
+
+
+def parse_tree_signature(signature: str) -> Tuple[int, int, bytes]:
+    """
+    Split a tree signature into its parts.
+
+    Returns:
+        (leaf_size, data_length, merkle root)
+
+    Raises:
+        ValueError: If signature is not a tree signature of a known version
+    """
+    try:
+        version, leaf_size, data_length, root = signature.strip().split(':')
+        if version != TREE_MODE_VERSION:
+            raise ValueError(f"unsupported tree mode version: {version}")
+        return int(leaf_size), int(data_length), bytes.fromhex(root)
+    except ValueError as e:
+        raise ValueError(f"invalid SHA1-E3 tree signature: {e}") from e
+
+
+def tree_signature(data: bytes, leaf_size: int = TREE_LEAF_SIZE,
+                   max_workers: Optional[int] = None) -> str:
+    """SHA1-E3 tree signature of data, with leaves hashed in parallel."""
+    return signature_from_leaf_digests(leaf_digests(data, leaf_size, max_workers), len(data), leaf_size)
+
+
+def tree_signature_file(file_path: str, leaf_size: int = TREE_LEAF_SIZE,
+                        max_workers: Optional[int] = None) -> str:
+    """SHA1-E3 tree signature of a file, with leaves read and hashed in parallel."""
+    return signature_from_leaf_digests(file_leaf_digests(file_path, leaf_size, max_workers),
+                                       os.path.getsize(file_path), leaf_size)
+
+
+def extend_leaf_digests(file_path: str, digests: List[bytes], previous_length: int,
+                        leaf_size: int = TREE_LEAF_SIZE,
+                        max_workers: Optional[int] = None) -> List[bytes]:
+    """
+    Update leaf digests after data was appended to a file.
+
+    Leaves that were complete at previous_length are kept; the last partial
+    leaf and any new leaves are rehashed.
+
+    Args:
+        file_path: Path to the grown file
+        digests: Leaf digests of the first previous_length bytes
+        previous_length: File size the digests were computed for
+        leaf_size: Leaf size the digests were computed with
+        max_workers: Worker processes for the rehashed leaves
+
+    Returns:
+        List[bytes]: Leaf digests of the whole file
+    """
+    if len(digests) != leaf_count(previous_length, leaf_size):
+        raise ValueError("number of leaf digests does not match previous_length")
+    if os.path.getsize(file_path) < previous_length:
+        raise ValueError("file is shorter than previous_length")
+    complete = previous_length // leaf_size
+    return list(digests[:complete]) + file_leaf_digests(file_path, leaf_size, max_workers,
+                                                        first_leaf=complete)
+
+
+def leaf_proof(digests: List[bytes], index: int) -> List[Tuple[bool, bytes]]:
+    """Merkle proof that leaf index belongs to the tree of digests."""
+    return build_proof(digests, index)
+
+
+def verify_leaf(leaf: bytes, proof: List[Tuple[bool, bytes]], signature: str) -> bool:
+    """Verify one leaf's bytes against a tree signature without the other leaves."""
+    _, _, root = parse_tree_signature(signature)
+    return verify_proof(leaf_digest(leaf), proof, root)